@@ -0,0 +1,88 @@
+"""Benchmark the Reader chunking strategies on a large document.
+
+Run: python cookbook/knowledge/chunking_benchmark.py
+"""
+
+import random
+import re
+from time import perf_counter
+from typing import Callable, List
+
+from phi.document import Document
+from phi.document.reader.base import Reader
+
+
+def legacy_chunk_document(document: Document, chunk_size: int) -> List[Document]:
+    """The previous implementation of Reader.chunk_document, kept as the baseline"""
+    cleaned_content = document.content
+    for pattern, replacement in [
+        (r"\n+", "\n"),
+        (r"\s+", " "),
+        (r"\t+", "\t"),
+        (r"\r+", "\r"),
+        (r"\f+", "\f"),
+        (r"\v+", "\v"),
+    ]:
+        cleaned_content = re.sub(pattern, replacement, cleaned_content)
+    content_length = len(cleaned_content)
+    chunked_documents: List[Document] = []
+    chunk_number = 1
+    start = 0
+    while start < content_length:
+        end = start + chunk_size
+        if end < content_length:
+            while end > start and cleaned_content[end] not in [" ", "\n", "\r", "\t"]:
+                end -= 1
+        if end == start:
+            end = start + chunk_size
+        if end > content_length:
+            end = content_length
+        chunk = cleaned_content[start:end]
+        meta_data = document.meta_data.copy()
+        meta_data["chunk"] = chunk_number
+        meta_data["chunk_size"] = len(chunk)
+        chunked_documents.append(
+            Document(id=f"{document.name}_{chunk_number}", name=document.name, meta_data=meta_data, content=chunk)
+        )
+        chunk_number += 1
+        start = end
+    return chunked_documents
+
+
+def get_document(num_paragraphs: int) -> Document:
+    random.seed(42)
+    words = ["lorem", "ipsum", "dolor", "sit", "amet", "consectetur", "adipiscing", "elit", "sed", "do", "eiusmod"]
+    paragraphs = []
+    for _ in range(num_paragraphs):
+        sentences = [" ".join(random.choices(words, k=random.randint(5, 25))) + "." for _ in range(10)]
+        paragraphs.append("\n".join(sentences))
+    return Document(name="benchmark", content="\n\n".join(paragraphs))
+
+
+def benchmark(name: str, chunk: Callable[[], List[Document]], repeat: int = 3) -> None:
+    best = float("inf")
+    num_chunks = 0
+    for _ in range(repeat):
+        start = perf_counter()
+        num_chunks = len(chunk())
+        best = min(best, perf_counter() - start)
+    print(f"{name:<32} {num_chunks:>8} chunks {best:>8.3f}s {num_chunks / best:>12,.0f} chunks/s")
+
+
+if __name__ == "__main__":
+    document = get_document(num_paragraphs=20000)
+    print(f"Document size: {len(document.content):,} characters")
+
+    for chunk_size in [500, 3000]:
+        print(f"\nchunk_size={chunk_size}")
+        benchmark("legacy", lambda: legacy_chunk_document(document, chunk_size))
+        benchmark("fixed", lambda: Reader(chunk_size=chunk_size).chunk_document(document))
+        benchmark(
+            "recursive", lambda: Reader(chunk_size=chunk_size, chunk_strategy="recursive").chunk_document(document)
+        )
+        benchmark(
+            "recursive (overlap=10%)",
+            lambda: Reader(
+                chunk_size=chunk_size, chunk_strategy="recursive", chunk_overlap=chunk_size // 10
+            ).chunk_document(document),
+        )
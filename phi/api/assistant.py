@@ -1,7 +1,7 @@
 from os import getenv
-from typing import Union, Dict, List
+from typing import Union, Dict, List, Optional
 
-from httpx import Response
+from httpx import Client as HttpxClient, Response
 
 from phi.api.api import api, invalid_response
 from phi.api.routes import ApiRoutes
@@ -14,65 +14,79 @@ from phi.cli.settings import phi_cli_settings
 from phi.utils.log import logger
 
 
-def create_assistant_run(run: AssistantRunCreate) -> bool:
+def create_assistant_run(run: AssistantRunCreate, api_client: Optional[HttpxClient] = None) -> bool:
+    """Creates an assistant run. Uses the api_client if provided, otherwise opens a new client."""
     if not phi_cli_settings.api_enabled:
         return True
 
     logger.debug("--o-o-- Creating Assistant Run")
-    with api.AuthenticatedClient() as api_client:
-        try:
-            r: Response = api_client.post(
-                ApiRoutes.ASSISTANT_RUN_CREATE,
-                headers={
-                    "Authorization": f"Bearer {getenv(PHI_API_KEY_ENV_VAR)}",
-                    "PHI-WORKSPACE": f"{getenv(PHI_WS_KEY_ENV_VAR)}",
-                },
-                json={
-                    "run": run.model_dump(exclude_none=True),
-                    # "workspace": assistant_workspace.model_dump(exclude_none=True),
-                },
-            )
-            if invalid_response(r):
-                return False
-
-            response_json: Union[Dict, List] = r.json()
-            if response_json is None:
-                return False
-
-            logger.debug(f"Response: {response_json}")
-            return True
-        except Exception as e:
-            logger.debug(f"Could not create assistant run: {e}")
+    if api_client is None:
+        with api.AuthenticatedClient() as _api_client:
+            return _create_assistant_run(run=run, api_client=_api_client)
+    return _create_assistant_run(run=run, api_client=api_client)
+
+
+def _create_assistant_run(run: AssistantRunCreate, api_client: HttpxClient) -> bool:
+    try:
+        r: Response = api_client.post(
+            ApiRoutes.ASSISTANT_RUN_CREATE,
+            headers={
+                "Authorization": f"Bearer {getenv(PHI_API_KEY_ENV_VAR)}",
+                "PHI-WORKSPACE": f"{getenv(PHI_WS_KEY_ENV_VAR)}",
+            },
+            json={
+                "run": run.model_dump(exclude_none=True),
+                # "workspace": assistant_workspace.model_dump(exclude_none=True),
+            },
+        )
+        if invalid_response(r):
+            return False
+
+        response_json: Union[Dict, List] = r.json()
+        if response_json is None:
+            return False
+
+        logger.debug(f"Response: {response_json}")
+        return True
+    except Exception as e:
+        logger.debug(f"Could not create assistant run: {e}")
     return False
 
 
-def create_assistant_event(event: AssistantEventCreate) -> bool:
+def create_assistant_event(event: AssistantEventCreate, api_client: Optional[HttpxClient] = None) -> bool:
+    """Creates an assistant event. Uses the api_client if provided, otherwise opens a new client."""
     if not phi_cli_settings.api_enabled:
         return True
 
     logger.debug("--o-o-- Creating Assistant Event")
-    with api.AuthenticatedClient() as api_client:
-        try:
-            r: Response = api_client.post(
-                ApiRoutes.ASSISTANT_EVENT_CREATE,
-                headers={
-                    "Authorization": f"Bearer {getenv(PHI_API_KEY_ENV_VAR)}",
-                    "PHI-WORKSPACE": f"{getenv(PHI_WS_KEY_ENV_VAR)}",
-                },
-                json={
-                    "event": event.model_dump(exclude_none=True),
-                    # "workspace": assistant_workspace.model_dump(exclude_none=True),
-                },
-            )
-            if invalid_response(r):
-                return False
-
-            response_json: Union[Dict, List] = r.json()
-            if response_json is None:
-                return False
-
-            logger.debug(f"Response: {response_json}")
-            return True
-        except Exception as e:
-            logger.debug(f"Could not create assistant event: {e}")
+    if api_client is None:
+        with api.AuthenticatedClient() as _api_client:
+            return _create_assistant_event(event=event, api_client=_api_client)
+    return _create_assistant_event(event=event, api_client=api_client)
+
+
+def _create_assistant_event(event: AssistantEventCreate, api_client: HttpxClient) -> bool:
+    try:
+        r: Response = api_client.post(
+            ApiRoutes.ASSISTANT_EVENT_CREATE,
+            headers={
+                "Authorization": f"Bearer {getenv(PHI_API_KEY_ENV_VAR)}",
+                "PHI-WORKSPACE": f"{getenv(PHI_WS_KEY_ENV_VAR)}",
+            },
+            json={
+                "event": event.model_dump(exclude_none=True),
+                # "workspace": assistant_workspace.model_dump(exclude_none=True),
+            },
+        )
+        if invalid_response(r):
+            return False
+
+        response_json: Union[Dict, List] = r.json()
+        if response_json is None:
+            return False
+
+        logger.debug(f"Response: {response_json}")
+        return True
+    except Exception as e:
+        logger.debug(f"Could not create assistant event: {e}")
     return False
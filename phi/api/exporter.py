@@ -0,0 +1,109 @@
+import atexit
+from queue import Queue, Empty, Full
+from threading import Thread, Lock
+from time import monotonic
+from typing import Callable, Any, List, Optional
+
+from httpx import Client as HttpxClient
+
+from phi.api.api import api
+from phi.utils.log import logger
+
+
+class ApiExporter:
+    """Sends requests to the phidata api from a background thread, so they are not on the request path.
+
+    Requests are functions which take a pooled, keep-alive client and send the request.
+    They are queued in a bounded queue and sent in batches by a worker thread.
+    When the queue is full new requests are dropped. On exit, queued requests are flushed for up to
+    `shutdown_timeout` seconds and the rest are dropped.
+    """
+
+    def __init__(self, max_queue_size: int = 1000, batch_size: int = 50, shutdown_timeout: float = 5.0):
+        self.max_queue_size: int = max_queue_size
+        self.batch_size: int = batch_size
+        self.shutdown_timeout: float = shutdown_timeout
+
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        self._worker: Optional[Thread] = None
+        self._lock: Lock = Lock()
+        self._shutdown: bool = False
+        self.num_dropped: int = 0
+
+    def submit(self, request: Callable[[HttpxClient], Any]) -> bool:
+        """Queues a request to be sent in the background.
+
+        Returns False if the request was dropped because the queue is full or the exporter is shut down.
+        """
+        if self._shutdown:
+            return False
+
+        self._start()
+        try:
+            self._queue.put_nowait(request)
+            return True
+        except Full:
+            self.num_dropped += 1
+            logger.debug(f"Api export queue is full, dropped request. Total dropped: {self.num_dropped}")
+            return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all queued requests are sent. Returns False if the timeout is reached first."""
+        deadline = None if timeout is None else monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self) -> None:
+        """Flushes the queued requests for up to shutdown_timeout seconds and stops the worker"""
+        if self._shutdown:
+            return
+        self._shutdown = True
+        if self._worker is None:
+            return
+
+        if not self.flush(timeout=self.shutdown_timeout):
+            logger.debug(f"Dropping {self._queue.unfinished_tasks} api requests on shutdown")
+        # Wake up the worker so it can exit
+        try:
+            self._queue.put_nowait(None)
+        except Full:
+            pass
+
+    def _start(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = Thread(target=self._run, name="phi-api-exporter", daemon=True)
+                self._worker.start()
+                atexit.register(self.shutdown)
+
+    def _run(self) -> None:
+        with api.AuthenticatedClient() as api_client:
+            while True:
+                # -*- Wait for a request, then send it along with the requests queued behind it
+                batch: List[Optional[Callable[[HttpxClient], Any]]] = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except Empty:
+                        break
+
+                for request in batch:
+                    if request is not None:
+                        try:
+                            request(api_client)
+                        except Exception as e:
+                            logger.debug(f"Could not send api request: {e}")
+                    self._queue.task_done()
+
+                if self._shutdown and self._queue.empty():
+                    return
+
+
+exporter = ApiExporter()
@@ -26,6 +26,9 @@ class AssistantRun(BaseModel):
     user_data: Optional[Dict[str, Any]] = None
     # Metadata associated with the assistant tasks
     task_data: Optional[Dict[str, Any]] = None
+    # Position of the first item of each memory list in memory, if only the last items were read from storage.
+    # Not stored, see AssistantStorage.incremental
+    memory_item_starts: Optional[Dict[str, int]] = None
     # The timestamp of when this run was created
     created_at: Optional[datetime] = None
     # The timestamp of when this run was last updated
@@ -34,13 +37,13 @@ class AssistantRun(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     def serializable_dict(self) -> Dict[str, Any]:
-        _dict = self.model_dump(exclude={"created_at", "updated_at"})
+        _dict = self.model_dump(exclude={"created_at", "updated_at", "memory_item_starts"})
         _dict["created_at"] = self.created_at.isoformat() if self.created_at else None
         _dict["updated_at"] = self.updated_at.isoformat() if self.updated_at else None
         return _dict
 
     def assistant_dict(self) -> Dict[str, Any]:
-        _dict = self.model_dump(exclude={"created_at", "updated_at", "task_data"})
+        _dict = self.model_dump(exclude={"created_at", "updated_at", "task_data", "memory_item_starts"})
         _dict["created_at"] = self.created_at.isoformat() if self.created_at else None
         _dict["updated_at"] = self.updated_at.isoformat() if self.updated_at else None
         return _dict
@@ -1,3 +1,4 @@
+from hashlib import md5
 from typing import Optional, Dict, Any, List
 
 from pydantic import BaseModel, ConfigDict
@@ -15,9 +16,18 @@ class Document(BaseModel):
     embedder: Optional[Embedder] = None
     embedding: Optional[List[float]] = None
     usage: Optional[Dict[str, Any]] = None
+    # Score of a search result, only set when requested from VectorDb.search()
+    score: Optional[float] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    @property
+    def content_hash(self) -> str:
+        """Returns the md5 hash of the content, as stored in the content_hash column of the vector dbs"""
+
+        cleaned_content = self.content.replace("\x00", "\ufffd")
+        return md5(cleaned_content.encode()).hexdigest()
+
     def embed(self, embedder: Optional[Embedder] = None) -> None:
         """Embed the document using the provided embedder"""
 
@@ -27,6 +37,47 @@ class Document(BaseModel):
 
         self.embedding, self.usage = _embedder.get_embedding_and_usage(self.content)
 
+    @staticmethod
+    def embed_documents(documents: List["Document"], embedder: Embedder) -> None:
+        """Embed a list of documents using batched requests to the embedder.
+        Documents which were already embedded by this embedder are not embedded again.
+        """
+
+        documents_to_embed = [
+            document for document in documents if document.embedding is None or document.embedder is not embedder
+        ]
+        if len(documents_to_embed) == 0:
+            return
+
+        embeddings, usage = embedder.get_embeddings_and_usage([document.content for document in documents_to_embed])
+        for document, embedding, _usage in zip(documents_to_embed, embeddings, usage):
+            document.embedding, document.usage, document.embedder = embedding, _usage, embedder
+
+    @classmethod
+    def from_search_result(
+        cls,
+        content: str,
+        name: Optional[str] = None,
+        meta_data: Optional[Dict[str, Any]] = None,
+        embedder: Optional[Embedder] = None,
+        embedding: Optional[List[float]] = None,
+        usage: Optional[Dict[str, Any]] = None,
+        score: Optional[float] = None,
+        id: Optional[str] = None,
+    ) -> "Document":
+        """Returns a Document for a search result without validating it, as the values come from the vector db"""
+
+        return cls.model_construct(
+            content=content,
+            id=id,
+            name=name,
+            meta_data=meta_data if meta_data is not None else {},
+            embedder=embedder,
+            embedding=embedding,
+            usage=usage,
+            score=score,
+        )
+
     def to_dict(self) -> Dict[str, Any]:
         """Returns a dictionary representation of the document"""
 
@@ -1,45 +1,76 @@
-from typing import Any, List
+import re
+from typing import Any, Callable, List, Iterator, Optional
 
 from pydantic import BaseModel
+from typing_extensions import Literal
 
 from phi.document.base import Document
 
+# Matches runs of whitespace, which clean_text collapses into a single space
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 
 class Reader(BaseModel):
     chunk: bool = True
     chunk_size: int = 3000
-    separators: List[str] = ["\n", "\n\n", "\r", "\r\n", "\n\r", "\t", " ", "  "]
+    # "fixed" splits the cleaned text into chunks of chunk_size at the last space before the limit.
+    # "recursive" splits the text on separators, trying them in order, and merges the pieces into chunks.
+    chunk_strategy: Literal["fixed", "recursive"] = "fixed"
+    # Length of the overlap between consecutive chunks. Only used by the "recursive" strategy.
+    chunk_overlap: int = 0
+    # Function used to measure the length of a text, e.g. to size chunks by tokens.
+    # Defaults to the number of characters. Only used by the "recursive" strategy.
+    length_function: Optional[Callable[[str], int]] = None
+    # Separators used by the "recursive" strategy, in order of priority
+    separators: List[str] = ["\n\n", "\r\n", "\n\r", "\n", "\r", "\t", "  ", " "]
 
     def read(self, obj: Any) -> List[Document]:
         raise NotImplementedError
 
+    def iter_read(self, *args, **kwargs) -> Iterator[Document]:
+        """Iterate over the documents read from a source.
+        Readers which can read a source incrementally should override this to bound memory usage.
+        """
+        yield from self.read(*args, **kwargs)
+
     def clean_text(self, text: str) -> str:
-        """Clean the text by replacing multiple newlines with a single newline"""
-        import re
-
-        # Replace multiple newlines with a single newline
-        cleaned_text = re.sub(r"\n+", "\n", text)
-        # Replace multiple spaces with a single space
-        cleaned_text = re.sub(r"\s+", " ", cleaned_text)
-        # Replace multiple tabs with a single tab
-        cleaned_text = re.sub(r"\t+", "\t", cleaned_text)
-        # Replace multiple carriage returns with a single carriage return
-        cleaned_text = re.sub(r"\r+", "\r", cleaned_text)
-        # Replace multiple form feeds with a single form feed
-        cleaned_text = re.sub(r"\f+", "\f", cleaned_text)
-        # Replace multiple vertical tabs with a single vertical tab
-        cleaned_text = re.sub(r"\v+", "\v", cleaned_text)
-
-        return cleaned_text
+        """Clean the text by replacing runs of whitespace (newlines, spaces, tabs, etc.) with a single space"""
+
+        return WHITESPACE_PATTERN.sub(" ", text)
+
+    def get_chunk_document(self, document: Document, chunk: str, chunk_number: int) -> Document:
+        """Returns the document for a chunk of the document content"""
+        meta_data = document.meta_data.copy()
+        meta_data["chunk"] = chunk_number
+        chunk_id = None
+        if document.id:
+            chunk_id = f"{document.id}_{chunk_number}"
+        elif document.name:
+            chunk_id = f"{document.name}_{chunk_number}"
+        meta_data["chunk_size"] = len(chunk)
+        # The fields are known to be valid, so skip pydantic validation
+        return Document.model_construct(
+            id=chunk_id,
+            name=document.name,
+            meta_data=meta_data,
+            content=chunk,
+        )
 
     def chunk_document(self, document: Document) -> List[Document]:
         """Chunk the document content into smaller documents"""
-        content = document.content
-        cleaned_content = self.clean_text(content)
-        content_length = len(cleaned_content)
-        chunked_documents: List[Document] = []
-        chunk_number = 1
-        chunk_meta_data = document.meta_data
+        if self.chunk_strategy == "recursive":
+            chunks = self.split_text_recursive(document.content)
+        else:
+            chunks = self.split_text_fixed(self.clean_text(document.content))
+        return [
+            self.get_chunk_document(document=document, chunk=chunk, chunk_number=chunk_number)
+            for chunk_number, chunk in enumerate(chunks, start=1)
+        ]
+
+    def split_text_fixed(self, text: str) -> List[str]:
+        """Split the text into chunks of at most chunk_size characters, without splitting words where possible"""
+        content_length = len(text)
+        chunks: List[str] = []
 
         start = 0
         while start < content_length:
@@ -47,8 +78,7 @@ class Reader(BaseModel):
 
             # Ensure we're not splitting a word in half
             if end < content_length:
-                while end > start and cleaned_content[end] not in [" ", "\n", "\r", "\t"]:
-                    end -= 1
+                end = max(text.rfind(" ", start + 1, end + 1), start)
 
             # If the entire chunk is a word, then just split it at self.chunk_size
             if end == start:
@@ -58,23 +88,71 @@ class Reader(BaseModel):
             if end > content_length:
                 end = content_length
 
-            chunk = cleaned_content[start:end]
-            meta_data = chunk_meta_data.copy()
-            meta_data["chunk"] = chunk_number
-            chunk_id = None
-            if document.id:
-                chunk_id = f"{document.id}_{chunk_number}"
-            elif document.name:
-                chunk_id = f"{document.name}_{chunk_number}"
-            meta_data["chunk_size"] = len(chunk)
-            chunked_documents.append(
-                Document(
-                    id=chunk_id,
-                    name=document.name,
-                    meta_data=meta_data,
-                    content=chunk,
-                )
-            )
-            chunk_number += 1
+            chunks.append(text[start:end])
             start = end
-        return chunked_documents
+        return chunks
+
+    def split_text_recursive(self, text: str) -> List[str]:
+        """Split the text into chunks of at most chunk_size, measured using length_function.
+
+        The text is split on the first separator it contains, pieces which are still too long are split on the
+        next separators, and the pieces are then merged into chunks with chunk_overlap between them.
+        """
+        length_function = self.length_function or len
+        pieces: List[str] = []
+        lengths: List[int] = []
+        self._split_pieces(text, 0, length_function, pieces, lengths)
+
+        # The current chunk is pieces[start:i], each piece is added and dropped once so merging is linear
+        chunks: List[str] = []
+        start = 0
+        current_length = 0
+        for i, piece_length in enumerate(lengths):
+            if current_length + piece_length > self.chunk_size and start < i:
+                chunk = "".join(pieces[start:i]).strip()
+                if chunk:
+                    chunks.append(chunk)
+                # Keep the trailing pieces of the chunk which fit in the overlap
+                while start < i and (
+                    current_length > self.chunk_overlap or current_length + piece_length > self.chunk_size
+                ):
+                    current_length -= lengths[start]
+                    start += 1
+            current_length += piece_length
+
+        chunk = "".join(pieces[start:]).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _split_pieces(
+        self,
+        text: str,
+        separator_index: int,
+        length_function: Callable[[str], int],
+        pieces: List[str],
+        lengths: List[int],
+    ) -> None:
+        """Appends pieces of the text no longer than chunk_size to pieces, along with their lengths"""
+        text_length = length_function(text)
+        if text_length <= self.chunk_size:
+            if text:
+                pieces.append(text)
+                lengths.append(text_length)
+            return
+
+        for i in range(separator_index, len(self.separators)):
+            separator = self.separators[i]
+            if separator and separator in text:
+                splits = text.split(separator)
+                for split in splits[:-1]:
+                    # Keep the separator with the piece so no text is lost when merging
+                    self._split_pieces(split + separator, i + 1, length_function, pieces, lengths)
+                self._split_pieces(splits[-1], i + 1, length_function, pieces, lengths)
+                return
+
+        # No separator left to split on, split the text every chunk_size characters
+        for start in range(0, len(text), self.chunk_size):
+            piece = text[start : start + self.chunk_size]
+            pieces.append(piece)
+            lengths.append(length_function(piece))
@@ -1,15 +1,35 @@
 from pathlib import Path
-from typing import List, Union, IO, Any
+from tempfile import SpooledTemporaryFile
+from typing import List, Union, IO, Any, Iterator
 
 from phi.document.base import Document
 from phi.document.reader.base import Reader
 from phi.utils.log import logger
 
 
+def download_to_spooled_file(url: str, max_size: int) -> IO[bytes]:
+    """Streams the body of a url into a temporary file, which is only written to disk once larger than max_size"""
+    try:
+        import httpx
+    except ImportError:
+        raise ImportError("`httpx` not installed")
+
+    spooled_file: IO[bytes] = SpooledTemporaryFile(max_size=max_size)  # type: ignore
+    with httpx.stream("GET", url) as response:
+        for chunk in response.iter_bytes():
+            spooled_file.write(chunk)
+    spooled_file.seek(0)
+    return spooled_file
+
+
 class PDFReader(Reader):
     """Reader for PDF files"""
 
     def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
+        return list(self.iter_read(pdf=pdf))
+
+    def iter_read(self, pdf: Union[str, Path, IO[Any]]) -> Iterator[Document]:
+        """Reads the PDF page by page, yielding the (chunked) documents for each page"""
         if not pdf:
             raise ValueError("No pdf provided")
 
@@ -30,69 +50,63 @@ class PDFReader(Reader):
         logger.info(f"Reading: {doc_name}")
         doc_reader = DocumentReader(pdf)
 
-        documents = [
-            Document(
+        for page_number, page in enumerate(doc_reader.pages, start=1):
+            document = Document(
                 name=doc_name,
                 id=f"{doc_name}_{page_number}",
                 meta_data={"page": page_number},
                 content=page.extract_text(),
             )
-            for page_number, page in enumerate(doc_reader.pages, start=1)
-        ]
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-        return documents
+            if self.chunk:
+                yield from self.chunk_document(document)
+            else:
+                yield document
 
 
 class PDFUrlReader(Reader):
     """Reader for PDF files from URL"""
 
+    # Size of the download held in memory before it is written to a temporary file
+    spool_max_size: int = 16 * 1024 * 1024
+
     def read(self, url: str) -> List[Document]:
+        return list(self.iter_read(url=url))
+
+    def iter_read(self, url: str) -> Iterator[Document]:
+        """Streams the PDF from the URL and reads it page by page, yielding the (chunked) documents for each page"""
         if not url:
             raise ValueError("No url provided")
 
-        from io import BytesIO
-
-        try:
-            import httpx
-        except ImportError:
-            raise ImportError("`httpx` not installed")
-
         try:
             from pypdf import PdfReader as DocumentReader  # noqa: F401
         except ImportError:
             raise ImportError("`pypdf` not installed")
 
         logger.info(f"Reading: {url}")
-        response = httpx.get(url)
-
         doc_name = url.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
-        doc_reader = DocumentReader(BytesIO(response.content))
-
-        documents = [
-            Document(
-                name=doc_name,
-                id=f"{doc_name}_{page_number}",
-                meta_data={"page": page_number},
-                content=page.extract_text(),
-            )
-            for page_number, page in enumerate(doc_reader.pages, start=1)
-        ]
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-        return documents
+        with download_to_spooled_file(url, max_size=self.spool_max_size) as pdf_file:
+            doc_reader = DocumentReader(pdf_file)
+            for page_number, page in enumerate(doc_reader.pages, start=1):
+                document = Document(
+                    name=doc_name,
+                    id=f"{doc_name}_{page_number}",
+                    meta_data={"page": page_number},
+                    content=page.extract_text(),
+                )
+                if self.chunk:
+                    yield from self.chunk_document(document)
+                else:
+                    yield document
 
 
 class PDFImageReader(Reader):
     """Reader for PDF files with text and images extraction"""
 
     def read(self, pdf: Union[str, Path, IO[Any]]) -> List[Document]:
+        return list(self.iter_read(pdf=pdf))
+
+    def iter_read(self, pdf: Union[str, Path, IO[Any]]) -> Iterator[Document]:
+        """Reads the PDF page by page, yielding the (chunked) documents for each page"""
         if not pdf:
             raise ValueError("No pdf provided")
 
@@ -117,7 +131,6 @@ class PDFImageReader(Reader):
         # Initialize RapidOCR
         ocr = rapidocr.RapidOCR()
 
-        documents = []
         for page_number, page in enumerate(doc_reader.pages, start=1):
             page_text = page.extract_text() or ""
             images_text_list: List = []
@@ -135,35 +148,33 @@ class PDFImageReader(Reader):
             images_text: str = "\n".join(images_text_list)
             content = page_text + "\n" + images_text
 
-            documents.append(
-                Document(
-                    name=doc_name,
-                    id=f"{doc_name}_{page_number}",
-                    meta_data={"page": page_number},
-                    content=content,
-                )
+            document = Document(
+                name=doc_name,
+                id=f"{doc_name}_{page_number}",
+                meta_data={"page": page_number},
+                content=content,
             )
-
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-
-        return documents
+            if self.chunk:
+                yield from self.chunk_document(document)
+            else:
+                yield document
 
 
 class PDFUrlImageReader(Reader):
     """Reader for PDF files from URL with text and images extraction"""
 
+    # Size of the download held in memory before it is written to a temporary file
+    spool_max_size: int = 16 * 1024 * 1024
+
     def read(self, url: str) -> List[Document]:
+        return list(self.iter_read(url=url))
+
+    def iter_read(self, url: str) -> Iterator[Document]:
+        """Streams the PDF from the URL and reads it page by page, yielding the (chunked) documents for each page"""
         if not url:
             raise ValueError("No url provided")
 
-        from io import BytesIO
-
         try:
-            import httpx
             from pypdf import PdfReader as DocumentReader
             import rapidocr_onnxruntime as rapidocr
         except ImportError:
@@ -171,49 +182,41 @@ class PDFUrlImageReader(Reader):
 
         # Read the PDF from the URL
         logger.info(f"Reading: {url}")
-        response = httpx.get(url)
-
         doc_name = url.split("/")[-1].split(".")[0].replace(" ", "_")
-        doc_reader = DocumentReader(BytesIO(response.content))
 
         # Initialize RapidOCR
         ocr = rapidocr.RapidOCR()
 
-        # Process each page of the PDF
-        documents = []
-        for page_number, page in enumerate(doc_reader.pages, start=1):
-            page_text = page.extract_text() or ""
-            images_text_list = []
+        with download_to_spooled_file(url, max_size=self.spool_max_size) as pdf_file:
+            doc_reader = DocumentReader(pdf_file)
 
-            # Extract and process images
-            for image_object in page.images:
-                image_data = image_object.data
+            # Process each page of the PDF
+            for page_number, page in enumerate(doc_reader.pages, start=1):
+                page_text = page.extract_text() or ""
+                images_text_list = []
 
-                # Perform OCR on the image
-                ocr_result, elapse = ocr(image_data)
+                # Extract and process images
+                for image_object in page.images:
+                    image_data = image_object.data
 
-                # Extract text from OCR result
-                if ocr_result:
-                    images_text_list += [item[1] for item in ocr_result]
+                    # Perform OCR on the image
+                    ocr_result, elapse = ocr(image_data)
 
-            images_text = "\n".join(images_text_list)
-            content = page_text + "\n" + images_text
+                    # Extract text from OCR result
+                    if ocr_result:
+                        images_text_list += [item[1] for item in ocr_result]
+
+                images_text = "\n".join(images_text_list)
+                content = page_text + "\n" + images_text
 
-            # Append the document
-            documents.append(
-                Document(
+                document = Document(
                     name=doc_name,
                     id=f"{doc_name}_{page_number}",
                     meta_data={"page": page_number},
                     content=content,
                 )
-            )
-
-        # Optionally chunk documents
-        if self.chunk:
-            chunked_documents = []
-            for document in documents:
-                chunked_documents.extend(self.chunk_document(document))
-            return chunked_documents
-
-        return documents
+                # Optionally chunk documents
+                if self.chunk:
+                    yield from self.chunk_document(document)
+                else:
+                    yield document
@@ -1,4 +1,5 @@
-from typing import List
+from tempfile import SpooledTemporaryFile
+from typing import List, Iterator
 
 from phi.document.base import Document
 from phi.document.reader.base import Reader
@@ -9,9 +10,14 @@ from phi.utils.log import logger
 class S3PDFReader(Reader):
     """Reader for PDF files on S3"""
 
+    # Size of the object held in memory before it is written to a temporary file
+    spool_max_size: int = 16 * 1024 * 1024
+
     def read(self, s3_object: S3Object) -> List[Document]:
-        from io import BytesIO
+        return list(self.iter_read(s3_object=s3_object))
 
+    def iter_read(self, s3_object: S3Object) -> Iterator[Document]:
+        """Streams the PDF from S3 and reads it page by page, yielding the (chunked) documents for each page"""
         if not s3_object:
             raise ValueError("No s3_object provided")
 
@@ -20,27 +26,25 @@ class S3PDFReader(Reader):
         except ImportError:
             raise ImportError("`pypdf` not installed")
 
-        try:
-            logger.info(f"Reading: {s3_object.uri}")
-
-            object_resource = s3_object.get_resource()
-            object_body = object_resource.get()["Body"]
-            doc_name = s3_object.name.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
-            doc_reader = DocumentReader(BytesIO(object_body.read()))
-            documents = [
-                Document(
+        logger.info(f"Reading: {s3_object.uri}")
+
+        object_resource = s3_object.get_resource()
+        object_body = object_resource.get()["Body"]
+        doc_name = s3_object.name.split("/")[-1].split(".")[0].replace("/", "_").replace(" ", "_")
+        with SpooledTemporaryFile(max_size=self.spool_max_size) as pdf_file:
+            for chunk in object_body.iter_chunks():
+                pdf_file.write(chunk)
+            pdf_file.seek(0)
+
+            doc_reader = DocumentReader(pdf_file)
+            for page_number, page in enumerate(doc_reader.pages, start=1):
+                document = Document(
                     name=doc_name,
                     id=f"{doc_name}_{page_number}",
                     meta_data={"page": page_number},
                     content=page.extract_text(),
                 )
-                for page_number, page in enumerate(doc_reader.pages, start=1)
-            ]
-            if self.chunk:
-                chunked_documents = []
-                for document in documents:
-                    chunked_documents.extend(self.chunk_document(document))
-                return chunked_documents
-            return documents
-        except Exception:
-            raise
+                if self.chunk:
+                    yield from self.chunk_document(document)
+                else:
+                    yield document
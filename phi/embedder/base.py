@@ -1,4 +1,4 @@
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Iterator
 
 from pydantic import BaseModel, ConfigDict
 
@@ -7,6 +7,10 @@ class Embedder(BaseModel):
     """Base class for managing embedders"""
 
     dimensions: int = 1536
+    # Maximum number of texts to embed in a single request
+    batch_size: int = 100
+    # Maximum number of (approximate) tokens to embed in a single request
+    batch_max_tokens: Optional[int] = None
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -15,3 +19,53 @@ class Embedder(BaseModel):
 
     def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
         raise NotImplementedError
+
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        embeddings, _ = self.get_embeddings_and_usage(texts)
+        return embeddings
+
+    def get_embeddings_and_usage(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Embed a list of texts, sending them to the provider in batches.
+
+        Returns the embeddings in the same order as the texts, along with the usage for each text.
+        Providers which only report usage per request return the usage of the batch for each text in it.
+        """
+        embeddings: List[List[float]] = []
+        usage: List[Optional[Dict]] = []
+        for batch in self.get_batches(texts):
+            batch_embeddings, batch_usage = self._batch_embeddings_and_usage(batch)
+            embeddings.extend(batch_embeddings)
+            usage.extend(batch_usage)
+        return embeddings, usage
+
+    def get_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts into batches bounded by `batch_size` and `batch_max_tokens`"""
+        batch: List[str] = []
+        batch_tokens = 0
+        for text in texts:
+            text_tokens = self.estimate_tokens(text)
+            if len(batch) > 0 and (
+                len(batch) >= self.batch_size
+                or (self.batch_max_tokens is not None and batch_tokens + text_tokens > self.batch_max_tokens)
+            ):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += text_tokens
+        if len(batch) > 0:
+            yield batch
+
+    def estimate_tokens(self, text: str) -> int:
+        # Roughly 4 characters per token for english text
+        return len(text) // 4 + 1
+
+    def _batch_embeddings_and_usage(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        """Embed a single batch of texts. Embedders with a bulk endpoint should override this."""
+        embeddings: List[List[float]] = []
+        usage: List[Optional[Dict]] = []
+        for text in texts:
+            embedding, _usage = self.get_embedding_and_usage(text)
+            embeddings.append(embedding)
+            usage.append(_usage)
+        return embeddings, usage
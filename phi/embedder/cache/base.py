@@ -0,0 +1,41 @@
+from abc import ABC, abstractmethod
+from hashlib import md5
+from typing import Optional, List, Dict
+
+
+class EmbeddingCache(ABC):
+    """Base class for caching embeddings by content"""
+
+    @staticmethod
+    def get_key(embedder: str, model: Optional[str], dimensions: int, content: str) -> str:
+        """Returns the cache key for a content embedded by an embedder.
+
+        The content is hashed the same way the vector dbs compute the `content_hash`.
+        """
+        cleaned_content = content.replace("\x00", "\ufffd")
+        content_hash = md5(cleaned_content.encode()).hexdigest()
+        return f"{embedder}:{model}:{dimensions}:{content_hash}"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[List[float]]:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        embeddings: Dict[str, List[float]] = {}
+        for key in keys:
+            embedding = self.get(key)
+            if embedding is not None:
+                embeddings[key] = embedding
+        return embeddings
+
+    @abstractmethod
+    def set(self, key: str, embedding: List[float]) -> None:
+        raise NotImplementedError
+
+    def set_many(self, embeddings: Dict[str, List[float]]) -> None:
+        for key, embedding in embeddings.items():
+            self.set(key, embedding)
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
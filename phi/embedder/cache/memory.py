@@ -0,0 +1,39 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, List
+
+from phi.embedder.cache.base import EmbeddingCache
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    def __init__(self, max_size: int = 10000):
+        """
+        This class provides a least recently used cache of embeddings held in memory.
+
+        Args:
+            max_size (int): The maximum number of embeddings to keep. Defaults to 10000.
+        """
+        self.max_size: int = max_size
+        self._embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._embeddings.get(key)
+            if embedding is not None:
+                self._embeddings.move_to_end(key)
+            return embedding
+
+    def set(self, key: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._embeddings[key] = embedding
+            self._embeddings.move_to_end(key)
+            while len(self._embeddings) > self.max_size:
+                self._embeddings.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._embeddings.clear()
+
+    def __len__(self) -> int:
+        return len(self._embeddings)
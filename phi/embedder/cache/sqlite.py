@@ -0,0 +1,123 @@
+import sqlite3
+from array import array
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Optional, List, Dict, Union
+
+from phi.embedder.cache.base import EmbeddingCache
+from phi.embedder.cache.memory import InMemoryEmbeddingCache
+from phi.utils.log import logger
+
+
+class SqliteEmbeddingCache(EmbeddingCache):
+    def __init__(
+        self,
+        db_file: Union[str, Path] = "embeddings.db",
+        max_size_bytes: Optional[int] = 1024 * 1024 * 1024,
+        memory_cache: Optional[InMemoryEmbeddingCache] = None,
+    ):
+        """
+        This class provides a cache of embeddings persisted to a sqlite database on disk.
+
+        Embeddings are stored as float32 blobs. When the total size of the stored embeddings exceeds
+        max_size_bytes, the least recently used embeddings are evicted.
+        Reads go through an in-memory LRU cache first.
+
+        Args:
+            db_file (Union[str, Path]): The sqlite database file. Defaults to "embeddings.db".
+            max_size_bytes (Optional[int]): The maximum size of the stored embeddings. Defaults to 1GB.
+            memory_cache (Optional[InMemoryEmbeddingCache]): The in-memory cache in front of the database.
+        """
+        self.db_file: Path = Path(db_file)
+        self.max_size_bytes: Optional[int] = max_size_bytes
+        self.memory_cache: InMemoryEmbeddingCache = memory_cache or InMemoryEmbeddingCache()
+
+        self._lock: Lock = Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings "
+            "(key TEXT PRIMARY KEY, embedding BLOB NOT NULL, size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings (accessed_at)")
+        self._connection.commit()
+        self._size_bytes: int = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def _to_blob(embedding: List[float]) -> bytes:
+        return array("f", embedding).tobytes()
+
+    @staticmethod
+    def _from_blob(blob: bytes) -> List[float]:
+        embedding = array("f")
+        embedding.frombytes(blob)
+        return embedding.tolist()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        embeddings = self.memory_cache.get_many(keys)
+        missing_keys = [key for key in keys if key not in embeddings]
+        if len(missing_keys) == 0:
+            return embeddings
+
+        with self._lock:
+            # Stay below the default sqlite limit on the number of host parameters
+            for i in range(0, len(missing_keys), 500):
+                batch = missing_keys[i : i + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = self._connection.execute(
+                    f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    embeddings[key] = self._from_blob(blob)
+                self._connection.executemany(
+                    "UPDATE embeddings SET accessed_at = ? WHERE key = ?", [(time(), key) for key, _ in rows]
+                )
+            self._connection.commit()
+
+        for key in missing_keys:
+            if key in embeddings:
+                self.memory_cache.set(key, embeddings[key])
+        return embeddings
+
+    def set(self, key: str, embedding: List[float]) -> None:
+        self.set_many({key: embedding})
+
+    def set_many(self, embeddings: Dict[str, List[float]]) -> None:
+        self.memory_cache.set_many(embeddings)
+        with self._lock:
+            for key, embedding in embeddings.items():
+                blob = self._to_blob(embedding)
+                existing = self._connection.execute("SELECT size FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if existing is not None:
+                    self._size_bytes -= existing[0]
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, embedding, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), time()),
+                )
+                self._size_bytes += len(blob)
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        if self.max_size_bytes is None or self._size_bytes <= self.max_size_bytes:
+            return
+
+        logger.debug(f"Evicting embeddings, cache size: {self._size_bytes} bytes")
+        cursor = self._connection.execute("SELECT key, size FROM embeddings ORDER BY accessed_at ASC")
+        keys_to_evict: List[str] = []
+        for key, size in cursor:
+            if self._size_bytes <= self.max_size_bytes:
+                break
+            keys_to_evict.append(key)
+            self._size_bytes -= size
+        self._connection.executemany("DELETE FROM embeddings WHERE key = ?", [(key,) for key in keys_to_evict])
+
+    def clear(self) -> None:
+        self.memory_cache.clear()
+        with self._lock:
+            self._connection.execute("DELETE FROM embeddings")
+            self._connection.commit()
+            self._size_bytes = 0
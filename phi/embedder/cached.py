@@ -0,0 +1,68 @@
+from typing import Optional, Dict, List, Tuple, Any
+
+from phi.embedder.base import Embedder
+from phi.embedder.cache import EmbeddingCache, InMemoryEmbeddingCache
+
+
+class CachedEmbedder(Embedder):
+    """Embedder which caches the embeddings of another embedder by content.
+
+    The same cache can be shared between embedders and vector dbs, so re-indexing
+    documents and repeated queries skip the embedding request.
+    Cache keys include the embedder class, model and dimensions, so by default
+    all cached embedders share one in-memory cache.
+    """
+
+    embedder: Embedder
+    cache: EmbeddingCache = InMemoryEmbeddingCache()
+
+    def model_post_init(self, __context: Any) -> None:
+        self.dimensions = self.embedder.dimensions
+        self.batch_size = self.embedder.batch_size
+        self.batch_max_tokens = self.embedder.batch_max_tokens
+
+    def get_cache_key(self, text: str) -> str:
+        return self.cache.get_key(
+            embedder=self.embedder.__class__.__name__,
+            model=getattr(self.embedder, "model", None),
+            dimensions=self.embedder.dimensions,
+            content=text,
+        )
+
+    def get_embedding(self, text: str) -> List[float]:
+        embedding, _ = self.get_embedding_and_usage(text)
+        return embedding
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self.get_cache_key(text)
+        embedding = self.cache.get(key)
+        if embedding is not None:
+            return embedding, None
+
+        embedding, usage = self.embedder.get_embedding_and_usage(text)
+        if embedding:
+            self.cache.set(key, embedding)
+        return embedding, usage
+
+    def get_embeddings_and_usage(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        keys = [self.get_cache_key(text) for text in texts]
+        cached_embeddings = self.cache.get_many(keys)
+
+        # Embed each missing text once, even if it is repeated
+        texts_to_embed: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached_embeddings and key not in texts_to_embed:
+                texts_to_embed[key] = text
+
+        usage_by_key: Dict[str, Optional[Dict]] = {}
+        if len(texts_to_embed) > 0:
+            new_embeddings, new_usage = self.embedder.get_embeddings_and_usage(list(texts_to_embed.values()))
+            embeddings_to_cache: Dict[str, List[float]] = {}
+            for key, embedding, usage in zip(texts_to_embed.keys(), new_embeddings, new_usage):
+                cached_embeddings[key] = embedding
+                usage_by_key[key] = usage
+                if embedding:
+                    embeddings_to_cache[key] = embedding
+            self.cache.set_many(embeddings_to_cache)
+
+        return [cached_embeddings.get(key, []) for key in keys], [usage_by_key.get(key) for key in keys]
@@ -60,3 +60,27 @@ class OllamaEmbedder(Embedder):
         except Exception as e:
             logger.warning(e)
         return embedding, usage
+
+    def _batch_embeddings_and_usage(self, texts: List[str]) -> Tuple[List[List[float]], List[Optional[Dict]]]:
+        # The bulk `embed` endpoint is only available in newer versions of the ollama client
+        client = self.client
+        if not hasattr(client, "embed"):
+            return super()._batch_embeddings_and_usage(texts)
+
+        kwargs: Dict[str, Any] = {}
+        if self.options is not None:
+            kwargs["options"] = self.options
+
+        embeddings: List[List[float]] = []
+        usage: Optional[Dict] = None
+        try:
+            response = client.embed(input=texts, model=self.model, **kwargs)  # type: ignore
+            if response is not None:
+                embeddings = response.get("embeddings", [])
+                if response.get("prompt_eval_count") is not None:
+                    usage = {"prompt_tokens": response.get("prompt_eval_count")}
+        except Exception as e:
+            logger.warning(e)
+        if len(embeddings) != len(texts):
+            embeddings = [[] for _ in texts]
+        return embeddings, [usage] * len(texts)
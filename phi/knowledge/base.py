@@ -1,11 +1,20 @@
-from typing import List, Optional, Iterator, Dict, Any
+from collections import Counter, deque
+from hashlib import md5
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, List, Optional, Iterator, Dict, Any, Tuple, Set, Union
 
 from pydantic import BaseModel, ConfigDict
 
 from phi.document import Document
-from phi.document.reader.base import Reader
+from phi.document.reader.base import Reader, WHITESPACE_PATTERN
+from phi.embedder import Embedder
+from phi.knowledge.manifest import KnowledgeManifest, SourceManifest
+from phi.knowledge.reranker.base import Reranker
 from phi.vectordb import VectorDb
 from phi.utils.log import logger
+from phi.utils.tokens import count_tokens as count_text_tokens
 
 
 class AssistantKnowledge(BaseModel):
@@ -20,6 +29,33 @@ class AssistantKnowledge(BaseModel):
     # Number of documents to optimize the vector db on
     optimize_on: Optional[int] = 1000
 
+    # -*- Pipelined loading
+    # Number of workers used to read and embed documents concurrently when loading the knowledge base.
+    # If None, documents are read, embedded and inserted serially.
+    num_workers: Optional[int] = None
+    # Read sources in a process pool instead of a thread pool. Useful for CPU bound readers like PDFs.
+    read_in_processes: bool = False
+    # Number of documents to embed and insert into the vector db at a time when loading concurrently
+    load_batch_size: int = 100
+
+    # -*- Incremental sync
+    # File to store the manifest of sources loaded by sync()
+    manifest_file: Optional[Union[str, Path]] = None
+
+    # -*- Search results
+    # Filter the documents returned by search on their meta_data, e.g. {"user_id": "u1"}.
+    # The filters are applied by the vector db, see VectorDb.search()
+    filters: Optional[Dict[str, Any]] = None
+    # Reranker used to reorder the candidate documents returned by the vector db
+    reranker: Optional[Reranker] = None
+    # Number of candidate documents fetched from the vector db when reranking or deduplicating results.
+    # Defaults to 4 times the number of documents returned.
+    num_candidates: Optional[int] = None
+    # If True, remove documents whose content is identical after normalizing whitespace and case
+    deduplicate: bool = False
+    # Maximum number of tokens in the content of the documents returned by search
+    max_tokens: Optional[int] = None
+
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     @property
@@ -29,20 +65,137 @@ class AssistantKnowledge(BaseModel):
         """
         raise NotImplementedError
 
-    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
-        """Returns relevant documents matching the query"""
+    @property
+    def document_sources(self) -> Optional[List[Tuple[Reader, Dict[str, Any]]]]:
+        """Returns the sources in the knowledge base as (reader, keyword arguments to reader.read) pairs.
+        Sources can be read independently of each other, which allows reading them concurrently.
+        Returns None if the knowledge base can only be read using document_lists.
+        """
+        return None
+
+    def get_source_version(self, reader_kwargs: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """Returns the id and version of a source, given the keyword arguments passed to reader.read
+        Sources without a version are read on every sync.
+        """
+        source = next(iter(reader_kwargs.values()))
+        if isinstance(source, Path):
+            stat = source.stat()
+            return str(source.resolve()), f"{stat.st_mtime_ns}-{stat.st_size}"
+        return str(source), None
+
+    def search(
+        self,
+        query: str,
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> List[Document]:
+        """Returns relevant documents matching the query, and the filters if provided or self.filters
+
+        count_tokens is the function used to fit the documents in max_tokens, e.g. Assistant.count_tokens
+        to count the tokens for the llm model. Defaults to phi.utils.tokens.count_tokens
+        """
         try:
             if self.vector_db is None:
                 logger.warning("No vector db provided")
                 return []
 
             _num_documents = num_documents or self.num_documents
+            _filters = filters if filters is not None else self.filters
             logger.debug(f"Getting {_num_documents} relevant documents for query: {query}")
-            return self.vector_db.search(query=query, limit=_num_documents)
+            documents = self.vector_db.search(
+                query=query, limit=self.get_search_limit(_num_documents), filters=_filters
+            )
+            return self.process_search_results(query, documents, _num_documents, count_tokens=count_tokens)
         except Exception as e:
             logger.error(f"Error searching for documents: {e}")
             return []
 
+    def search_batch(
+        self,
+        queries: List[str],
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> List[List[Document]]:
+        """Returns relevant documents for each query, in the order of the queries.
+        Vector dbs embed and search all the queries in as few requests as they can, see VectorDb.search_batch()
+        """
+        if self.vector_db is None:
+            # Knowledge bases without a vector db, e.g. retriever based ones, search each query
+            return [
+                self.search(query=query, num_documents=num_documents, filters=filters, count_tokens=count_tokens)
+                for query in queries
+            ]
+
+        try:
+            _num_documents = num_documents or self.num_documents
+            _filters = filters if filters is not None else self.filters
+            logger.debug(f"Getting {_num_documents} relevant documents for {len(queries)} queries")
+            batch_documents = self.vector_db.search_batch(
+                queries=queries, limit=self.get_search_limit(_num_documents), filters=_filters
+            )
+            return [
+                self.process_search_results(query, documents, _num_documents, count_tokens=count_tokens)
+                for query, documents in zip(queries, batch_documents)
+            ]
+        except Exception as e:
+            logger.error(f"Error searching for documents: {e}")
+            return [[] for _ in queries]
+
+    def get_search_limit(self, num_documents: int) -> int:
+        """Returns the number of documents to fetch from the vector db"""
+        if self.reranker is None and not self.deduplicate:
+            return num_documents
+        # Over-fetch candidates, so there are enough documents left after reranking and deduplicating
+        return max(self.num_candidates or 4 * num_documents, num_documents)
+
+    def process_search_results(
+        self,
+        query: str,
+        documents: List[Document],
+        num_documents: int,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> List[Document]:
+        """Deduplicates and reranks the documents returned by the vector db, then keeps num_documents of them"""
+        if self.deduplicate:
+            documents = self.deduplicate_documents(documents)
+        if self.reranker is not None:
+            documents = self.reranker.rerank(query=query, documents=documents)
+        return self.trim_to_max_tokens(documents[:num_documents], count_tokens=count_tokens)
+
+    def deduplicate_documents(self, documents: List[Document]) -> List[Document]:
+        """Removes documents whose content is identical after normalizing whitespace and case, keeping the first"""
+        seen_hashes: Set[str] = set()
+        unique_documents: List[Document] = []
+        for document in documents:
+            normalized_content = WHITESPACE_PATTERN.sub(" ", document.content).strip().lower()
+            content_hash = md5(normalized_content.encode()).hexdigest()
+            if content_hash not in seen_hashes:
+                seen_hashes.add(content_hash)
+                unique_documents.append(document)
+        return unique_documents
+
+    def trim_to_max_tokens(
+        self, documents: List[Document], count_tokens: Optional[Callable[[str], int]] = None
+    ) -> List[Document]:
+        """Returns the leading documents whose content fits in max_tokens.
+        The first document is always returned, even if it alone is longer than max_tokens.
+        """
+        if self.max_tokens is None:
+            return documents
+
+        _count_tokens = count_tokens or count_text_tokens
+        num_tokens = 0
+        for i, document in enumerate(documents):
+            num_tokens += _count_tokens(document.content)
+            if num_tokens > self.max_tokens:
+                if i == 0:
+                    logger.debug(f"The first document has {num_tokens} tokens, more than max_tokens: {self.max_tokens}")
+                    return documents[:1]
+                return documents[:i]
+        return documents
+
     def load(self, recreate: bool = False, upsert: bool = False, skip_existing: bool = True) -> None:
         """Load the knowledge base to the vector db
 
@@ -64,6 +217,17 @@ class AssistantKnowledge(BaseModel):
         self.vector_db.create()
 
         logger.info("Loading knowledge base")
+        pipelined = self.num_workers is not None and self.num_workers > 1
+        if pipelined and getattr(self.vector_db, "embedder", None) is None:
+            logger.warning("Vector db does not provide an embedder, loading the knowledge base serially")
+            pipelined = False
+        if pipelined:
+            num_documents = self._load_pipelined(upsert=upsert, skip_existing=skip_existing)
+            if self.optimize_on is not None and num_documents > self.optimize_on:
+                logger.info("Optimizing Vector DB")
+                self.vector_db.optimize()
+            return
+
         num_documents = 0
         for document_list in self.document_lists:
             documents_to_load = document_list
@@ -74,9 +238,7 @@ class AssistantKnowledge(BaseModel):
             else:
                 # Filter out documents which already exist in the vector db
                 if skip_existing:
-                    documents_to_load = [
-                        document for document in document_list if not self.vector_db.doc_exists(document)
-                    ]
+                    documents_to_load = self.filter_existing_documents(document_list)
                 self.vector_db.insert(documents=documents_to_load)
             num_documents += len(documents_to_load)
             logger.info(f"Added {len(documents_to_load)} documents to knowledge base")
@@ -85,6 +247,239 @@ class AssistantKnowledge(BaseModel):
             logger.info("Optimizing Vector DB")
             self.vector_db.optimize()
 
+    def filter_existing_documents(self, documents: List[Document]) -> List[Document]:
+        """Returns the documents which do not already exist in the vector db"""
+        if self.vector_db is None or len(documents) == 0:
+            return documents
+
+        content_hashes = [document.content_hash for document in documents]
+        try:
+            existing_hashes = self.vector_db.existing_hashes(content_hashes)
+        except NotImplementedError:
+            # Check each document if the vector db does not support bulk existence checks
+            return [document for document in documents if not self.vector_db.doc_exists(document)]
+        return [
+            document for document, content_hash in zip(documents, content_hashes) if content_hash not in existing_hashes
+        ]
+
+    def _load_pipelined(self, upsert: bool = False, skip_existing: bool = True) -> int:
+        """Load the knowledge base using concurrent read, embed and write stages.
+
+        Sources are read in a thread or process pool, documents are embedded in batches in a thread pool
+        and the embedded documents are written to the vector db in batches by the calling thread.
+        Each stage holds at most 2 * num_workers pending tasks, so readers wait for the embedders and writer.
+
+        Returns:
+            int: Number of documents loaded
+        """
+        if self.vector_db is None:
+            return 0
+
+        vector_db = self.vector_db
+        num_workers = self.num_workers or 1
+        max_pending = 2 * num_workers
+        use_upsert = upsert and vector_db.upsert_available()
+        embedder: Optional[Embedder] = getattr(vector_db, "embedder", None)
+        if embedder is None:
+            raise ValueError("Pipelined loading needs a vector db with an embedder")
+
+        sources = self.document_sources
+        if sources is None:
+            logger.debug("Knowledge base does not provide document sources, reading documents serially")
+        num_sources = len(sources) if sources is not None else None
+        source_iterator = iter(sources) if sources is not None else None
+        document_list_iterator = iter(self.document_lists) if sources is None else None
+
+        read_executor: Executor = (
+            ProcessPoolExecutor(max_workers=num_workers)
+            if self.read_in_processes
+            else ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="knowledge-read")
+        )
+        embed_executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="knowledge-embed")
+        pending_reads: Set[Future] = set()
+        pending_embeds: Set[Future] = set()
+        documents_to_write: deque = deque()
+
+        num_sources_read = 0
+        num_documents = 0
+        start_time = perf_counter()
+
+        def embed_documents(documents: List[Document]) -> List[Document]:
+            Document.embed_documents(documents, embedder=embedder)
+            return documents
+
+        def on_documents_read(documents: List[Document]) -> None:
+            # Filter out documents which already exist in the vector db
+            if skip_existing and not use_upsert:
+                documents = self.filter_existing_documents(documents)
+            for i in range(0, len(documents), self.load_batch_size):
+                batch = documents[i : i + self.load_batch_size]
+                pending_embeds.add(embed_executor.submit(embed_documents, batch))
+
+        def write_documents(flush: bool = False) -> None:
+            nonlocal num_documents
+            while len(documents_to_write) >= self.load_batch_size or (flush and len(documents_to_write) > 0):
+                batch_size = min(self.load_batch_size, len(documents_to_write))
+                batch = [documents_to_write.popleft() for _ in range(batch_size)]
+                if use_upsert:
+                    vector_db.upsert(documents=batch)
+                else:
+                    vector_db.insert(documents=batch)
+                num_documents += len(batch)
+            elapsed = perf_counter() - start_time
+            logger.info(
+                f"Loaded {num_documents} documents from {num_sources_read}"
+                + (f"/{num_sources}" if num_sources is not None else "")
+                + f" sources ({num_documents / elapsed if elapsed > 0 else 0:.1f} documents/s)"
+            )
+
+        try:
+            sources_exhausted = False
+            while True:
+                # Only read new sources while the embed stage has capacity
+                while not sources_exhausted and len(pending_reads) < max_pending and len(pending_embeds) < max_pending:
+                    if source_iterator is not None:
+                        try:
+                            reader, reader_kwargs = next(source_iterator)
+                            pending_reads.add(read_executor.submit(reader.read, **reader_kwargs))
+                        except StopIteration:
+                            sources_exhausted = True
+                    elif document_list_iterator is not None:
+                        try:
+                            document_list = next(document_list_iterator)
+                            num_sources_read += 1
+                            on_documents_read(document_list)
+                        except StopIteration:
+                            sources_exhausted = True
+
+                if len(pending_reads) > 0 or len(pending_embeds) > 0:
+                    done, _ = wait(pending_reads | pending_embeds, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in pending_reads:
+                            pending_reads.discard(future)
+                            num_sources_read += 1
+                            on_documents_read(future.result())
+                        else:
+                            pending_embeds.discard(future)
+                            documents_to_write.extend(future.result())
+
+                if len(documents_to_write) >= self.load_batch_size:
+                    write_documents()
+
+                if sources_exhausted and len(pending_reads) == 0 and len(pending_embeds) == 0:
+                    break
+            write_documents(flush=True)
+        finally:
+            read_executor.shutdown(wait=True)
+            embed_executor.shutdown(wait=True)
+
+        return num_documents
+
+    def sync(self, manifest_file: Optional[Union[str, Path]] = None) -> None:
+        """Incrementally sync the knowledge base to the vector db
+
+        Only sources which changed since the last sync are read again. The documents of a changed source replace
+        its previous documents, and the documents of deleted sources are removed from the vector db.
+        A manifest of the sources, their versions and content hashes is kept in the manifest file.
+
+        Args:
+            manifest_file (Optional[Union[str, Path]]): File to store the manifest in. Defaults to self.manifest_file.
+        """
+        if self.vector_db is None:
+            logger.warning("No vector db provided")
+            return
+
+        _manifest_file = manifest_file or self.manifest_file
+        if _manifest_file is None:
+            raise ValueError("No manifest_file provided")
+        _manifest_path = Path(_manifest_file) if isinstance(_manifest_file, str) else _manifest_file
+
+        sources = self.document_sources
+        if sources is None:
+            raise NotImplementedError(f"{self.__class__.__name__} does not support sync")
+
+        logger.debug("Creating collection")
+        self.vector_db.create()
+
+        manifest = KnowledgeManifest.read(_manifest_path)
+        # Number of sources each content hash was read from
+        hash_references: Counter = Counter(
+            content_hash
+            for source_manifest in manifest.sources.values()
+            for content_hash in set(source_manifest.content_hashes)
+        )
+        hashes_to_delete: Set[str] = set()
+        # Hashes whose documents were already deleted from the vector db
+        deleted_hashes: Set[str] = set()
+
+        def remove_references(content_hashes: Set[str]) -> None:
+            for content_hash in content_hashes:
+                hash_references[content_hash] -= 1
+                if hash_references[content_hash] <= 0:
+                    hashes_to_delete.add(content_hash)
+
+        def add_references(content_hashes: Set[str]) -> None:
+            for content_hash in content_hashes:
+                hash_references[content_hash] += 1
+                hashes_to_delete.discard(content_hash)
+
+        num_sources_read = 0
+        num_documents = 0
+        seen_source_ids: Set[str] = set()
+        for reader, reader_kwargs in sources:
+            source_id, version = self.get_source_version(reader_kwargs)
+            seen_source_ids.add(source_id)
+            previous = manifest.sources.get(source_id)
+            if previous is not None and version is not None and previous.version == version:
+                continue
+
+            documents = reader.read(**reader_kwargs)
+            num_sources_read += 1
+            content_hashes = {document.content_hash for document in documents}
+            previous_hashes = set(previous.content_hashes) if previous is not None else set()
+            if previous is None:
+                # A new source, whose documents may already have been loaded by load()
+                documents_to_load = self.filter_existing_documents(documents)
+            else:
+                # Documents of a changed source are keyed by their position, e.g. {name}_{chunk}, so content which
+                # moved would be overwritten by an upsert onto its old id. Delete the previous documents of the
+                # source and load all of its documents again, keeping the documents shared with other sources.
+                source_hashes = sorted(h for h in previous_hashes - deleted_hashes if hash_references[h] <= 1)
+                if len(source_hashes) > 0:
+                    self.vector_db.delete_hashes(source_hashes)
+                    deleted_hashes.update(source_hashes)
+                documents_to_load = (
+                    documents if self.vector_db.upsert_available() else self.filter_existing_documents(documents)
+                )
+            if len(documents_to_load) > 0:
+                if self.vector_db.upsert_available():
+                    self.vector_db.upsert(documents=documents_to_load)
+                else:
+                    self.vector_db.insert(documents=documents_to_load)
+                num_documents += len(documents_to_load)
+                deleted_hashes.difference_update(document.content_hash for document in documents_to_load)
+
+            add_references(content_hashes - previous_hashes)
+            remove_references(previous_hashes - content_hashes)
+            manifest.sources[source_id] = SourceManifest(version=version, content_hashes=sorted(content_hashes))
+
+        # Remove sources which no longer exist
+        for source_id in list(manifest.sources.keys()):
+            if source_id not in seen_source_ids:
+                logger.debug(f"Source removed: {source_id}")
+                remove_references(set(manifest.sources.pop(source_id).content_hashes))
+
+        if len(hashes_to_delete - deleted_hashes) > 0:
+            self.vector_db.delete_hashes(sorted(hashes_to_delete - deleted_hashes))
+
+        # Only write the manifest once all changes are applied, so a failed sync is retried in full
+        manifest.write(_manifest_path)
+
+        logger.info(
+            f"Synced knowledge base: read {num_sources_read} sources, added {num_documents} documents, "
+            f"deleted {len(hashes_to_delete)} documents"
+        )
+
     def load_documents(self, documents: List[Document], upsert: bool = False, skip_existing: bool = True) -> None:
         """Load documents to the knowledge base
 
@@ -109,11 +504,7 @@ class AssistantKnowledge(BaseModel):
             return
 
         # Filter out documents which already exist in the vector db
-        documents_to_load = (
-            [document for document in documents if not self.vector_db.doc_exists(document)]
-            if skip_existing
-            else documents
-        )
+        documents_to_load = self.filter_existing_documents(documents) if skip_existing else documents
 
         # Insert documents
         if len(documents_to_load) > 0:
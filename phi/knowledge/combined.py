@@ -1,6 +1,7 @@
-from typing import List, Iterator
+from typing import List, Iterator, Optional, Tuple, Dict, Any
 
 from phi.document import Document
+from phi.document.reader.base import Reader
 from phi.knowledge.base import AssistantKnowledge
 from phi.utils.log import logger
 
@@ -20,3 +21,15 @@ class CombinedKnowledgeBase(AssistantKnowledge):
         for kb in self.sources:
             logger.debug(f"Loading documents from {kb.__class__.__name__}")
             yield from kb.document_lists
+
+    @property
+    def document_sources(self) -> Optional[List[Tuple[Reader, Dict[str, Any]]]]:
+        """Returns the sources of all knowledge bases, or None if any knowledge base does not provide sources"""
+
+        document_sources: List[Tuple[Reader, Dict[str, Any]]] = []
+        for kb in self.sources:
+            kb_sources = kb.document_sources
+            if kb_sources is None:
+                return None
+            document_sources.extend(kb_sources)
+        return document_sources
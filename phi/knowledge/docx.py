@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Tuple, Dict, Any
 
 from phi.document import Document
+from phi.document.reader.base import Reader
 from phi.document.reader.docx import DocxReader
 from phi.knowledge.base import AssistantKnowledge
 
@@ -20,11 +21,17 @@ class DocxKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        for reader, reader_kwargs in self.document_sources:
+            yield reader.read(**reader_kwargs)
+
+    @property
+    def document_sources(self) -> List[Tuple[Reader, Dict[str, Any]]]:
+        """Returns the files in the path as (reader, reader arguments) pairs"""
+
         _file_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _file_path.exists() and _file_path.is_dir():
-            for _file in _file_path.glob("**/*"):
-                if _file.suffix in self.formats:
-                    yield self.reader.read(path=_file)
+            return [(self.reader, {"path": _file}) for _file in _file_path.glob("**/*") if _file.suffix in self.formats]
         elif _file_path.exists() and _file_path.is_file() and _file_path.suffix in self.formats:
-            yield self.reader.read(path=_file_path)
+            return [(self.reader, {"path": _file_path})]
+        return []
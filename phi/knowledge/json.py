@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Tuple, Dict, Any
 
 from phi.document import Document
+from phi.document.reader.base import Reader
 from phi.document.reader.json import JSONReader
 from phi.knowledge.base import AssistantKnowledge
 
@@ -19,10 +20,17 @@ class JSONKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        for reader, reader_kwargs in self.document_sources:
+            yield reader.read(**reader_kwargs)
+
+    @property
+    def document_sources(self) -> List[Tuple[Reader, Dict[str, Any]]]:
+        """Returns the Json files in the path as (reader, reader arguments) pairs"""
+
         _json_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _json_path.exists() and _json_path.is_dir():
-            for _pdf in _json_path.glob("*.json"):
-                yield self.reader.read(path=_pdf)
+            return [(self.reader, {"path": _json}) for _json in _json_path.glob("*.json")]
         elif _json_path.exists() and _json_path.is_file() and _json_path.suffix == ".json":
-            yield self.reader.read(path=_json_path)
+            return [(self.reader, {"path": _json_path})]
+        return []
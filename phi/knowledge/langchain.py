@@ -1,4 +1,4 @@
-from typing import List, Optional, Callable, Any
+from typing import List, Optional, Callable, Any, Dict
 
 from phi.document import Document
 from phi.knowledge.base import AssistantKnowledge
@@ -13,8 +13,16 @@ class LangChainKnowledgeBase(AssistantKnowledge):
 
     retriever: Optional[Any] = None
 
-    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
-        """Returns relevant documents matching the query"""
+    def search(
+        self,
+        query: str,
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> List[Document]:
+        """Returns relevant documents matching the query.
+        filters are not supported, use search_kwargs to configure the filters on the retriever.
+        """
 
         try:
             from langchain_core.vectorstores import VectorStoreRetriever
@@ -48,7 +56,7 @@ class LangChainKnowledgeBase(AssistantKnowledge):
                     meta_data=lc_doc.metadata,
                 )
             )
-        return documents
+        return self.trim_to_max_tokens(documents, count_tokens=count_tokens)
 
     def load(self, recreate: bool = False, upsert: bool = True, skip_existing: bool = True) -> None:
         if self.loader is None:
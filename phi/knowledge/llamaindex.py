@@ -1,4 +1,4 @@
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Dict, Any
 
 from phi.document import Document
 from phi.knowledge.base import AssistantKnowledge
@@ -15,13 +15,21 @@ class LlamaIndexKnowledgeBase(AssistantKnowledge):
     retriever: BaseRetriever
     loader: Optional[Callable] = None
 
-    def search(self, query: str, num_documents: Optional[int] = None) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        num_documents: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> List[Document]:
         """
         Returns relevant documents matching the query.
 
         Args:
             query (str): The query string to search for.
             num_documents (Optional[int]): The maximum number of documents to return. Defaults to None.
+            filters (Optional[Dict[str, Any]]): Not supported, configure the filters on the retriever instead.
+            count_tokens (Optional[Callable[[str], int]]): Function to count tokens, used to fit the documents in max_tokens.
 
         Returns:
             List[Document]: A list of relevant documents matching the query.
@@ -42,7 +50,7 @@ class LlamaIndexKnowledgeBase(AssistantKnowledge):
                     meta_data=lc_doc.metadata,
                 )
             )
-        return documents
+        return self.trim_to_max_tokens(documents, count_tokens=count_tokens)
 
     def load(self, recreate: bool = False, upsert: bool = True, skip_existing: bool = True) -> None:
         if self.loader is None:
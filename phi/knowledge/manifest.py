@@ -0,0 +1,34 @@
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from pydantic import BaseModel
+
+from phi.utils.log import logger
+
+
+class SourceManifest(BaseModel):
+    """Version and content hashes of a source loaded to the knowledge base"""
+
+    # Version of the source when it was loaded, like the file modification time or the S3 ETag
+    version: Optional[str] = None
+    # Content hashes of the documents read from the source
+    content_hashes: List[str] = []
+
+
+class KnowledgeManifest(BaseModel):
+    """Manifest of the sources loaded to a knowledge base, used to sync the knowledge base incrementally"""
+
+    # Source id -> SourceManifest
+    sources: Dict[str, SourceManifest] = {}
+
+    @classmethod
+    def read(cls, path: Path) -> "KnowledgeManifest":
+        if path.exists() and path.is_file():
+            logger.debug(f"Reading manifest: {path}")
+            return cls.model_validate_json(path.read_text())
+        return cls()
+
+    def write(self, path: Path) -> None:
+        logger.debug(f"Writing manifest: {path}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.model_dump_json())
@@ -1,14 +1,19 @@
 from pathlib import Path
-from typing import Union, List, Iterator
+from typing import Union, List, Iterator, Tuple, Dict, Any, Optional
 
 from phi.document import Document
+from phi.document.reader.base import Reader
 from phi.document.reader.pdf import PDFReader, PDFUrlReader, PDFImageReader, PDFUrlImageReader
 from phi.knowledge.base import AssistantKnowledge
+from phi.utils.common import batched
 
 
 class PDFKnowledgeBase(AssistantKnowledge):
     path: Union[str, Path]
     reader: Union[PDFReader, PDFImageReader] = PDFReader()
+    # Maximum number of documents in each list yielded by document_lists.
+    # If set, PDFs are read page by page instead of loading all pages of a PDF into memory.
+    max_documents_per_list: Optional[int] = None
 
     @property
     def document_lists(self) -> Iterator[List[Document]]:
@@ -19,18 +24,31 @@ class PDFKnowledgeBase(AssistantKnowledge):
             Iterator[List[Document]]: Iterator yielding list of documents
         """
 
+        for reader, reader_kwargs in self.document_sources:
+            if self.max_documents_per_list is not None:
+                yield from batched(reader.iter_read(**reader_kwargs), self.max_documents_per_list)
+            else:
+                yield reader.read(**reader_kwargs)
+
+    @property
+    def document_sources(self) -> List[Tuple[Reader, Dict[str, Any]]]:
+        """Returns the PDFs in the path as (reader, reader arguments) pairs"""
+
         _pdf_path: Path = Path(self.path) if isinstance(self.path, str) else self.path
 
         if _pdf_path.exists() and _pdf_path.is_dir():
-            for _pdf in _pdf_path.glob("**/*.pdf"):
-                yield self.reader.read(pdf=_pdf)
+            return [(self.reader, {"pdf": _pdf}) for _pdf in _pdf_path.glob("**/*.pdf")]
         elif _pdf_path.exists() and _pdf_path.is_file() and _pdf_path.suffix == ".pdf":
-            yield self.reader.read(pdf=_pdf_path)
+            return [(self.reader, {"pdf": _pdf_path})]
+        return []
 
 
 class PDFUrlKnowledgeBase(AssistantKnowledge):
     urls: List[str] = []
     reader: Union[PDFUrlReader, PDFUrlImageReader] = PDFUrlReader()
+    # Maximum number of documents in each list yielded by document_lists.
+    # If set, PDFs are read page by page instead of loading all pages of a PDF into memory.
+    max_documents_per_list: Optional[int] = None
 
     @property
     def document_lists(self) -> Iterator[List[Document]]:
@@ -42,4 +60,13 @@ class PDFUrlKnowledgeBase(AssistantKnowledge):
         """
 
         for url in self.urls:
-            yield self.reader.read(url=url)
+            if self.max_documents_per_list is not None:
+                yield from batched(self.reader.iter_read(url=url), self.max_documents_per_list)
+            else:
+                yield self.reader.read(url=url)
+
+    @property
+    def document_sources(self) -> List[Tuple[Reader, Dict[str, Any]]]:
+        """Returns the PDF urls as (reader, reader arguments) pairs"""
+
+        return [(self.reader, {"url": url}) for url in self.urls]
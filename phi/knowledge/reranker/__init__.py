@@ -0,0 +1,3 @@
+from phi.knowledge.reranker.base import Reranker
+from phi.knowledge.reranker.bm25 import BM25Reranker
+from phi.knowledge.reranker.rrf import RRFReranker
@@ -0,0 +1,27 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+from phi.document import Document
+
+
+class Reranker(BaseModel):
+    """Base class for rerankers, which reorder the documents returned by a vector db search.
+
+    Subclasses implement score() to return a relevance score for each document, e.g. using a cross-encoder.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+        """Returns a relevance score for each document, higher is more relevant"""
+        raise NotImplementedError
+
+    def rerank(self, query: str, documents: List[Document]) -> List[Document]:
+        """Returns the documents ordered by score, documents with equal scores keep their order"""
+        if len(documents) == 0:
+            return []
+
+        scores = self.score(query, documents)
+        order = sorted(range(len(documents)), key=lambda i: scores[i], reverse=True)
+        return [documents[i] for i in order]
@@ -0,0 +1,55 @@
+import math
+import re
+from collections import Counter
+from typing import List
+
+from phi.document import Document
+from phi.knowledge.reranker.base import Reranker
+
+# Matches the words in a text, which are the terms used by BM25
+TERM_PATTERN = re.compile(r"\w+")
+
+
+class BM25Reranker(Reranker):
+    """Reranks documents by their BM25 score for the query.
+
+    The term statistics are computed over the documents being reranked, so no index is needed.
+    """
+
+    # Term frequency saturation
+    k1: float = 1.5
+    # Document length normalization
+    b: float = 0.75
+
+    def get_terms(self, text: str) -> List[str]:
+        return TERM_PATTERN.findall(text.lower())
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+        query_terms = set(self.get_terms(query))
+        if len(query_terms) == 0 or len(documents) == 0:
+            return [0.0] * len(documents)
+
+        term_counts: List[Counter] = []
+        document_lengths: List[int] = []
+        document_frequencies: Counter = Counter()
+        for document in documents:
+            terms = self.get_terms(document.content)
+            counts = Counter(term for term in terms if term in query_terms)
+            term_counts.append(counts)
+            document_lengths.append(len(terms))
+            document_frequencies.update(counts.keys())
+
+        num_documents = len(documents)
+        average_length = (sum(document_lengths) / num_documents) or 1.0
+        idf = {
+            term: math.log((num_documents - frequency + 0.5) / (frequency + 0.5) + 1)
+            for term, frequency in document_frequencies.items()
+        }
+
+        scores: List[float] = []
+        for counts, length in zip(term_counts, document_lengths):
+            length_norm = self.k1 * (1 - self.b + self.b * length / average_length)
+            scores.append(
+                sum(idf[term] * count * (self.k1 + 1) / (count + length_norm) for term, count in counts.items())
+            )
+        return scores
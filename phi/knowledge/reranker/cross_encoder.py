@@ -0,0 +1,30 @@
+from typing import Any, Dict, List, Optional
+
+from phi.document import Document
+from phi.knowledge.reranker.base import Reranker
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:
+    raise ImportError("`sentence-transformers` not installed")
+
+
+class CrossEncoderReranker(Reranker):
+    """Reranks documents using a sentence-transformers cross-encoder, which scores each (query, document) pair"""
+
+    model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    batch_size: int = 32
+    model_params: Optional[Dict[str, Any]] = None
+    cross_encoder: Optional[CrossEncoder] = None
+
+    @property
+    def client(self) -> CrossEncoder:
+        if self.cross_encoder is None:
+            self.cross_encoder = CrossEncoder(self.model, **(self.model_params or {}))
+        return self.cross_encoder
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+        if len(documents) == 0:
+            return []
+        scores = self.client.predict([(query, document.content) for document in documents], batch_size=self.batch_size)
+        return [float(score) for score in scores]
@@ -0,0 +1,32 @@
+from typing import Dict, List
+
+from phi.document import Document
+from phi.knowledge.reranker.base import Reranker
+
+
+class RRFReranker(Reranker):
+    """Combines the rankings of several rerankers using reciprocal rank fusion.
+
+    Each document scores sum(1 / (k + rank)) over the rankings it appears in, where rank starts at 1.
+    """
+
+    # Rerankers whose rankings are fused
+    rerankers: List[Reranker] = []
+    # Include the order the documents were returned in, i.e. the vector similarity ranking
+    include_original_order: bool = True
+    # Dampens the weight of the top ranks, 60 is the value used in the original paper
+    k: int = 60
+
+    def score(self, query: str, documents: List[Document]) -> List[float]:
+        rankings: List[List[Document]] = []
+        if self.include_original_order:
+            rankings.append(documents)
+        for reranker in self.rerankers:
+            rankings.append(reranker.rerank(query, documents))
+
+        # Documents are identified by object, as documents from a search may not have ids
+        fused_scores: Dict[int, float] = {id(document): 0.0 for document in documents}
+        for ranking in rankings:
+            for rank, document in enumerate(ranking, start=1):
+                fused_scores[id(document)] += 1.0 / (self.k + rank)
+        return [fused_scores[id(document)] for document in documents]
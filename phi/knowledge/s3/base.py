@@ -1,4 +1,4 @@
-from typing import List, Iterator, Optional
+from typing import List, Iterator, Optional, Dict, Any, Tuple
 
 from phi.document import Document
 from phi.aws.resource.s3.bucket import S3Bucket
@@ -58,3 +58,10 @@ class S3KnowledgeBase(AssistantKnowledge):
                 s3_objects_to_read.extend(self.bucket.get_objects())
 
         return s3_objects_to_read
+
+    def get_source_version(self, reader_kwargs: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+        """Returns the uri and ETag of an s3 object"""
+        s3_object = reader_kwargs.get("s3_object")
+        if isinstance(s3_object, S3Object):
+            return s3_object.uri, s3_object.get_resource().e_tag
+        return super().get_source_version(reader_kwargs)
@@ -1,12 +1,17 @@
-from typing import List, Iterator
+from typing import List, Iterator, Tuple, Dict, Any, Optional
 
 from phi.document import Document
+from phi.document.reader.base import Reader
 from phi.document.reader.s3.pdf import S3PDFReader
 from phi.knowledge.s3.base import S3KnowledgeBase
+from phi.utils.common import batched
 
 
 class S3PDFKnowledgeBase(S3KnowledgeBase):
     reader: S3PDFReader = S3PDFReader()
+    # Maximum number of documents in each list yielded by document_lists.
+    # If set, PDFs are read page by page instead of loading all pages of a PDF into memory.
+    max_documents_per_list: Optional[int] = None
 
     @property
     def document_lists(self) -> Iterator[List[Document]]:
@@ -18,4 +23,15 @@ class S3PDFKnowledgeBase(S3KnowledgeBase):
         """
         for s3_object in self.s3_objects:
             if s3_object.name.endswith(".pdf"):
-                yield self.reader.read(s3_object=s3_object)
+                if self.max_documents_per_list is not None:
+                    yield from batched(self.reader.iter_read(s3_object=s3_object), self.max_documents_per_list)
+                else:
+                    yield self.reader.read(s3_object=s3_object)
+
+    @property
+    def document_sources(self) -> List[Tuple[Reader, Dict[str, Any]]]:
+        """Returns the PDFs in the s3 bucket as (reader, reader arguments) pairs"""
+
+        return [
+            (self.reader, {"s3_object": s3_object}) for s3_object in self.s3_objects if s3_object.name.endswith(".pdf")
+        ]
@@ -1,6 +1,7 @@
-from typing import List, Iterator
+from typing import List, Iterator, Tuple, Dict, Any
 
 from phi.document import Document
+from phi.document.reader.base import Reader
 from phi.document.reader.s3.text import S3TextReader
 from phi.knowledge.s3.base import S3KnowledgeBase
 
@@ -21,3 +22,13 @@ class S3TextKnowledgeBase(S3KnowledgeBase):
         for s3_object in self.s3_objects:
             if s3_object.name.endswith(tuple(self.formats)):
                 yield self.reader.read(s3_object=s3_object)
+
+    @property
+    def document_sources(self) -> List[Tuple[Reader, Dict[str, Any]]]:
+        """Returns the text files in the s3 bucket as (reader, reader arguments) pairs"""
+
+        return [
+            (self.reader, {"s3_object": s3_object})
+            for s3_object in self.s3_objects
+            if s3_object.name.endswith(tuple(self.formats))
+        ]
@@ -5,11 +5,9 @@ from typing import Optional, List, Iterator, Dict, Any
 
 from phi.llm.base import LLM
 from phi.llm.message import Message
-from phi.tools.function import FunctionCall
 from phi.utils.log import logger
 from phi.utils.timer import Timer
 from phi.utils.tools import (
-    get_function_call_for_tool_call,
     extract_tool_from_xml,
     remove_function_calls_from_string,
 )
@@ -32,6 +30,8 @@ class Claude(LLM):
     top_p: Optional[float] = None
     top_k: Optional[int] = None
     request_params: Optional[Dict[str, Any]] = None
+    # If True, mark the static prefix of the system prompt with cache_control so Anthropic caches it across requests
+    cache_system_prompt: bool = False
     # -*- Client parameters
     api_key: Optional[str] = None
     client_params: Optional[Dict[str, Any]] = None
@@ -70,13 +70,33 @@ class Claude(LLM):
             _request_params.update(self.request_params)
         return _request_params
 
+    def get_system_for_api(self, message: Message) -> Any:
+        """
+        Returns the system prompt for the api.
+        If cache_system_prompt is True, the static prefix of the system prompt is marked for caching.
+        """
+        if not self.cache_system_prompt or not isinstance(message.content, str) or not message.cache_prefix_length:
+            return message.content
+
+        system_blocks: List[Dict[str, Any]] = [
+            {
+                "type": "text",
+                "text": message.content[: message.cache_prefix_length],
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+        system_suffix = message.content[message.cache_prefix_length :]
+        if system_suffix.strip() != "":
+            system_blocks.append({"type": "text", "text": system_suffix})
+        return system_blocks
+
     def invoke(self, messages: List[Message]) -> AnthropicMessage:
         api_kwargs: Dict[str, Any] = self.api_kwargs
         api_messages: List[dict] = []
 
         for m in messages:
             if m.role == "system":
-                api_kwargs["system"] = m.content
+                api_kwargs["system"] = self.get_system_for_api(m)
             else:
                 api_messages.append({"role": m.role, "content": m.content or ""})
 
@@ -92,7 +112,7 @@ class Claude(LLM):
 
         for m in messages:
             if m.role == "system":
-                api_kwargs["system"] = m.content
+                api_kwargs["system"] = self.get_system_for_api(m)
             else:
                 api_messages.append({"role": m.role, "content": m.content or ""})
 
@@ -102,12 +122,7 @@ class Claude(LLM):
             **api_kwargs,
         )
 
-    def response(self, messages: List[Message]) -> str:
-        logger.debug("---------- Claude Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def response_round(self, messages: List[Message]) -> Message:
         response_timer = Timer()
         response_timer.start()
         response: AnthropicMessage = self.invoke(messages=messages)
@@ -170,58 +185,9 @@ class Claude(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        if assistant_message.tool_calls is not None and self.run_tools:
-            # Remove the tool call from the response content
-            final_response = remove_function_calls_from_string(assistant_message.content)  # type: ignore
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(Message(role="user", content="Could not find function to call."))
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="user", content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    final_response += f" - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    final_response += "Running:"
-                    for _f in function_calls_to_run:
-                        final_response += f"\n - {_f.get_call_str()}"
-                    final_response += "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run, role="user")
-            if len(function_call_results) > 0:
-                fc_responses = "<function_results>"
-
-                for _fc_message in function_call_results:
-                    fc_responses += "<result>"
-                    fc_responses += "<tool_name>" + _fc_message.tool_call_name + "</tool_name>"  # type: ignore
-                    fc_responses += "<stdout>" + _fc_message.content + "</stdout>"  # type: ignore
-                    fc_responses += "</result>"
-                fc_responses += "</function_results>"
-
-                messages.append(Message(role="user", content=fc_responses))
-
-            # -*- Yield new response using results of tool calls
-            final_response += self.response(messages=messages)
-            return final_response
-        logger.debug("---------- Claude Response End ----------")
-        # -*- Return content if no function calls are present
-        if assistant_message.content is not None:
-            return assistant_message.get_content_string()
-        return "Something went wrong, please try again."
-
-    def response_stream(self, messages: List[Message]) -> Iterator[str]:
-        logger.debug("---------- Claude Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
+        return assistant_message
 
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
         assistant_message_content = ""
         tool_calls_counter = 0
         response_is_tool_call = False
@@ -326,45 +292,29 @@ class Claude(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        if assistant_message.tool_calls is not None and self.run_tools:
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(Message(role="user", content="Could not find function to call."))
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="user", content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    yield f"- Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    yield "Running:"
-                    for _f in function_calls_to_run:
-                        yield f"\n - {_f.get_call_str()}"
-                    yield "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run, role="user")
-            # Add results of the function calls to the messages
-            if len(function_call_results) > 0:
-                fc_responses = "<function_results>"
-
-                for _fc_message in function_call_results:
-                    fc_responses += "<result>"
-                    fc_responses += "<tool_name>" + _fc_message.tool_call_name + "</tool_name>"  # type: ignore
-                    fc_responses += "<stdout>" + _fc_message.content + "</stdout>"  # type: ignore
-                    fc_responses += "</result>"
-                fc_responses += "</function_results>"
-
-                messages.append(Message(role="user", content=fc_responses))
-
-            # -*- Yield new response using results of tool calls
-            yield from self.response_stream(messages=messages)
-        logger.debug("---------- Claude Response End ----------")
+    def get_content_before_tool_calls(self, assistant_message: Message) -> str:
+        # Remove the tool call from the response content
+        return remove_function_calls_from_string(assistant_message.content)  # type: ignore
+
+    def run_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Iterator[str]:
+        function_calls_to_run = self.get_function_calls_to_run(
+            assistant_message=assistant_message, messages=messages, role="user"
+        )
+        yield from self.get_tool_calls_response(function_calls_to_run)
+
+        function_call_results = self.run_function_calls(function_calls_to_run, role="user")
+        # Add results of the function calls to the messages
+        if len(function_call_results) > 0:
+            fc_responses = "<function_results>"
+
+            for _fc_message in function_call_results:
+                fc_responses += "<result>"
+                fc_responses += "<tool_name>" + _fc_message.tool_call_name + "</tool_name>"  # type: ignore
+                fc_responses += "<stdout>" + _fc_message.content + "</stdout>"  # type: ignore
+                fc_responses += "</result>"
+            fc_responses += "</function_results>"
+
+            messages.append(Message(role="user", content=fc_responses))
 
     def get_tool_call_prompt(self) -> Optional[str]:
         if self.functions is not None and len(self.functions) > 0:
@@ -1,4 +1,4 @@
-from typing import List, Iterator, Optional, Dict, Any, Callable, Union
+from typing import List, Iterator, AsyncIterator, Optional, Dict, Any, Callable, Union
 
 from pydantic import BaseModel, ConfigDict
 
@@ -7,6 +7,7 @@ from phi.tools import Tool, Toolkit
 from phi.tools.function import Function, FunctionCall
 from phi.utils.timer import Timer
 from phi.utils.log import logger
+from phi.utils.tools import get_function_call_for_tool_call
 
 
 class LLM(BaseModel):
@@ -43,6 +44,11 @@ class LLM(BaseModel):
     function_call_limit: int = 10
     # Function call stack.
     function_call_stack: Optional[List[FunctionCall]] = None
+    # If True, runs the function calls from a single response concurrently.
+    # Sync functions are run in a thread pool and async functions are run using asyncio.gather
+    run_function_calls_concurrently: bool = False
+    # Maximum number of function calls to run at the same time. Defaults to running all at once.
+    max_concurrent_function_calls: Optional[int] = None
 
     system_prompt: Optional[str] = None
     instructions: Optional[List[str]] = None
@@ -68,18 +74,165 @@ class LLM(BaseModel):
     async def ainvoke_stream(self, *args, **kwargs) -> Any:
         raise NotImplementedError
 
+    # -*- Tool loop
+    # response(), aresponse(), response_stream() and aresponse_stream() call the model and run the tool calls it
+    # makes in a loop, until the model responds without tool calls. LLMs using the loop implement a single round:
+    #   - response_round() and the async + stream variants call the model once,
+    #     then add the assistant message to the messages and log it.
+    #   - run_tool_calls() and arun_tool_calls() run the tool calls in the assistant message and add the results
+    #     to the messages, yielding the response to show for the tool calls before running them.
     def response(self, messages: List[Message]) -> str:
-        raise NotImplementedError
+        logger.debug(f"---------- {self.__class__.__name__} Response Start ----------")
+        final_response = ""
+        num_messages_logged = 0
+        while True:
+            # -*- Log the messages added since the last round
+            num_messages_logged = self.log_messages(messages, start=num_messages_logged)
+            assistant_message = self.response_round(messages=messages)
+            num_messages_logged = len(messages)
+            if not self.has_tool_calls_to_run(assistant_message):
+                break
+            final_response += self.get_content_before_tool_calls(assistant_message)
+            for tool_calls_response in self.run_tool_calls(assistant_message=assistant_message, messages=messages):
+                final_response += tool_calls_response
+        logger.debug(f"---------- {self.__class__.__name__} Response End ----------")
+        return final_response + self.get_response_content(assistant_message)
 
     async def aresponse(self, messages: List[Message]) -> str:
-        raise NotImplementedError
+        logger.debug(f"---------- {self.__class__.__name__} Async Response Start ----------")
+        final_response = ""
+        num_messages_logged = 0
+        while True:
+            # -*- Log the messages added since the last round
+            num_messages_logged = self.log_messages(messages, start=num_messages_logged)
+            assistant_message = await self.aresponse_round(messages=messages)
+            num_messages_logged = len(messages)
+            if not self.has_tool_calls_to_run(assistant_message):
+                break
+            final_response += self.get_content_before_tool_calls(assistant_message)
+            async for tool_calls_response in self.arun_tool_calls(
+                assistant_message=assistant_message, messages=messages
+            ):
+                final_response += tool_calls_response
+        logger.debug(f"---------- {self.__class__.__name__} Async Response End ----------")
+        return final_response + self.get_response_content(assistant_message)
 
     def response_stream(self, messages: List[Message]) -> Iterator[str]:
-        raise NotImplementedError
+        logger.debug(f"---------- {self.__class__.__name__} Response Start ----------")
+        num_messages_logged = 0
+        while True:
+            # -*- Log the messages added since the last round
+            num_messages_logged = self.log_messages(messages, start=num_messages_logged)
+            yield from self.response_stream_round(messages=messages)
+            num_messages_logged = len(messages)
+            assistant_message = messages[-1]
+            if not self.has_tool_calls_to_run(assistant_message):
+                break
+            yield from self.run_tool_calls(assistant_message=assistant_message, messages=messages)
+        logger.debug(f"---------- {self.__class__.__name__} Response End ----------")
 
     async def aresponse_stream(self, messages: List[Message]) -> Any:
+        logger.debug(f"---------- {self.__class__.__name__} Async Response Start ----------")
+        num_messages_logged = 0
+        while True:
+            # -*- Log the messages added since the last round
+            num_messages_logged = self.log_messages(messages, start=num_messages_logged)
+            async for response_content in self.aresponse_stream_round(messages=messages):
+                yield response_content
+            num_messages_logged = len(messages)
+            assistant_message = messages[-1]
+            if not self.has_tool_calls_to_run(assistant_message):
+                break
+            async for tool_calls_response in self.arun_tool_calls(
+                assistant_message=assistant_message, messages=messages
+            ):
+                yield tool_calls_response
+        logger.debug(f"---------- {self.__class__.__name__} Async Response End ----------")
+
+    def response_round(self, messages: List[Message]) -> Message:
+        """Calls the model once, adds the assistant message to the messages and returns it"""
+        raise NotImplementedError
+
+    async def aresponse_round(self, messages: List[Message]) -> Message:
+        raise NotImplementedError
+
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
+        """Calls the model once, yielding the response content and adding the assistant message to the messages"""
         raise NotImplementedError
 
+    def aresponse_stream_round(self, messages: List[Message]) -> AsyncIterator[str]:
+        """Async version of response_stream_round(), implemented as an async generator"""
+        raise NotImplementedError
+
+    def has_tool_calls_to_run(self, assistant_message: Message) -> bool:
+        return self.run_tools and assistant_message.tool_calls is not None and len(assistant_message.tool_calls) > 0
+
+    def run_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Iterator[str]:
+        """Runs the tool calls in the assistant message and adds the results to the messages"""
+        function_calls_to_run = self.get_function_calls_to_run(assistant_message=assistant_message, messages=messages)
+        yield from self.get_tool_calls_response(function_calls_to_run)
+
+        function_call_results = self.run_function_calls(function_calls_to_run)
+        if len(function_call_results) > 0:
+            messages.extend(function_call_results)
+
+    async def arun_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Any:
+        function_calls_to_run = self.get_function_calls_to_run(assistant_message=assistant_message, messages=messages)
+        for tool_calls_response in self.get_tool_calls_response(function_calls_to_run):
+            yield tool_calls_response
+
+        function_call_results = await self.arun_function_calls(function_calls_to_run)
+        if len(function_call_results) > 0:
+            messages.extend(function_call_results)
+
+    def get_function_calls_to_run(
+        self, assistant_message: Message, messages: List[Message], role: str = "tool"
+    ) -> List[FunctionCall]:
+        """Returns the function calls for the tool calls in the assistant message.
+        Tool calls which cannot be run add an error message to the messages.
+        """
+        function_calls_to_run: List[FunctionCall] = []
+        for tool_call in assistant_message.tool_calls or []:
+            _tool_call_id = tool_call.get("id")
+            _function_call = get_function_call_for_tool_call(tool_call, self.functions)
+            if _function_call is None:
+                messages.append(
+                    Message(role=role, tool_call_id=_tool_call_id, content="Could not find function to call.")
+                )
+                continue
+            if _function_call.error is not None:
+                messages.append(Message(role=role, tool_call_id=_tool_call_id, content=_function_call.error))
+                continue
+            function_calls_to_run.append(_function_call)
+        return function_calls_to_run
+
+    def get_tool_calls_response(self, function_calls: List[FunctionCall]) -> Iterator[str]:
+        """Yields the response to show for the function calls, if show_tool_calls is True"""
+        if self.show_tool_calls:
+            if len(function_calls) == 1:
+                yield f"\n - Running: {function_calls[0].get_call_str()}\n\n"
+            elif len(function_calls) > 1:
+                yield "\nRunning:"
+                for _f in function_calls:
+                    yield f"\n - {_f.get_call_str()}"
+                yield "\n\n"
+
+    def get_content_before_tool_calls(self, assistant_message: Message) -> str:
+        """Returns the content of an assistant message with tool calls to add to the final response"""
+        return ""
+
+    def get_response_content(self, assistant_message: Message) -> str:
+        """Returns the content of the final assistant message"""
+        if assistant_message.content is not None:
+            return assistant_message.get_content_string()
+        return "Something went wrong, please try again."
+
+    def log_messages(self, messages: List[Message], start: int = 0) -> int:
+        """Logs the messages from the start index and returns the number of messages"""
+        for m in messages[start:]:
+            m.log()
+        return len(messages)
+
     def generate(self, messages: List[Message]) -> Dict:
         raise NotImplementedError
 
@@ -152,38 +305,129 @@ class LLM(BaseModel):
         self.tool_choice = "none"
 
     def run_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+        if self.run_function_calls_concurrently and len(function_calls) > 1:
+            return self._run_function_calls_concurrently(function_calls=function_calls, role=role)
+
         function_call_results: List[Message] = []
         for function_call in function_calls:
-            if self.function_call_stack is None:
-                self.function_call_stack = []
-
             # -*- Run function call
             _function_call_timer = Timer()
             _function_call_timer.start()
             function_call.execute()
             _function_call_timer.stop()
-            _function_call_result = Message(
-                role=role,
-                content=function_call.result,
-                tool_call_id=function_call.call_id,
-                tool_call_name=function_call.function.name,
-                metrics={"time": _function_call_timer.elapsed},
+            function_call_results.append(
+                self._add_function_call_result(function_call, elapsed=_function_call_timer.elapsed, role=role)
             )
-            if "tool_call_times" not in self.metrics:
-                self.metrics["tool_call_times"] = {}
-            if function_call.function.name not in self.metrics["tool_call_times"]:
-                self.metrics["tool_call_times"][function_call.function.name] = []
-            self.metrics["tool_call_times"][function_call.function.name].append(_function_call_timer.elapsed)
-            function_call_results.append(_function_call_result)
-            self.function_call_stack.append(function_call)
 
             # -*- Check function call limit
-            if len(self.function_call_stack) >= self.function_call_limit:
+            if len(self.function_call_stack or []) >= self.function_call_limit:
                 self.deactivate_function_calls()
                 break  # Exit early if we reach the function call limit
 
         return function_call_results
 
+    async def arun_function_calls(self, function_calls: List[FunctionCall], role: str = "tool") -> List[Message]:
+        function_calls = self._get_function_calls_within_limit(function_calls)
+        if self.run_function_calls_concurrently:
+            elapsed = await self._arun_function_calls(function_calls)
+        else:
+            elapsed = [(await self._arun_function_calls([function_call]))[0] for function_call in function_calls]
+        return self._add_function_call_results(function_calls, elapsed=elapsed, role=role)
+
+    def _get_function_calls_within_limit(self, function_calls: List[FunctionCall]) -> List[FunctionCall]:
+        """Returns the function calls which can run before reaching the function call limit.
+        Like the sequential path, at least one function call is run.
+        """
+        num_remaining = self.function_call_limit - len(self.function_call_stack or [])
+        return function_calls[: max(num_remaining, 1)]
+
+    def _run_function_calls_concurrently(self, function_calls: List[FunctionCall], role: str) -> List[Message]:
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        function_calls = self._get_function_calls_within_limit(function_calls)
+        elapsed: List[float] = [0.0] * len(function_calls)
+        sync_indices = [i for i, fc in enumerate(function_calls) if not fc.function.is_async]
+        async_indices = [i for i, fc in enumerate(function_calls) if fc.function.is_async]
+
+        max_workers = min(self.max_concurrent_function_calls or len(function_calls), len(function_calls))
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+            sync_futures = {i: executor.submit(self._timed_execute, function_calls[i]) for i in sync_indices}
+            # Async functions run together on an event loop in a worker thread,
+            # so this also works when called from a running event loop.
+            async_future = None
+            if len(async_indices) > 0:
+                async_future = executor.submit(
+                    asyncio.run, self._arun_function_calls([function_calls[i] for i in async_indices])
+                )
+            for i, future in sync_futures.items():
+                elapsed[i] = future.result()
+            if async_future is not None:
+                for i, _elapsed in zip(async_indices, async_future.result()):
+                    elapsed[i] = _elapsed
+
+        return self._add_function_call_results(function_calls, elapsed=elapsed, role=role)
+
+    async def _arun_function_calls(self, function_calls: List[FunctionCall]) -> List[float]:
+        """Runs the function calls using asyncio.gather, returning the time taken by each function call"""
+        import asyncio
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_function_calls or len(function_calls) or 1)
+
+        async def _run(function_call: FunctionCall) -> float:
+            async with semaphore:
+                _function_call_timer = Timer()
+                _function_call_timer.start()
+                if function_call.function.is_async:
+                    await function_call.aexecute()
+                else:
+                    await asyncio.get_running_loop().run_in_executor(None, function_call.execute)
+                _function_call_timer.stop()
+                return _function_call_timer.elapsed
+
+        return list(await asyncio.gather(*[_run(function_call) for function_call in function_calls]))
+
+    @staticmethod
+    def _timed_execute(function_call: FunctionCall) -> float:
+        _function_call_timer = Timer()
+        _function_call_timer.start()
+        function_call.execute()
+        _function_call_timer.stop()
+        return _function_call_timer.elapsed
+
+    def _add_function_call_results(
+        self, function_calls: List[FunctionCall], elapsed: List[float], role: str
+    ) -> List[Message]:
+        """Records the function calls in the order of the tool calls and checks the function call limit"""
+        function_call_results = [
+            self._add_function_call_result(function_call, elapsed=_elapsed, role=role)
+            for function_call, _elapsed in zip(function_calls, elapsed)
+        ]
+        # -*- Check function call limit
+        if len(self.function_call_stack or []) >= self.function_call_limit:
+            self.deactivate_function_calls()
+        return function_call_results
+
+    def _add_function_call_result(self, function_call: FunctionCall, elapsed: float, role: str) -> Message:
+        """Records the function call on the stack and in the metrics, and returns its result message"""
+        if self.function_call_stack is None:
+            self.function_call_stack = []
+
+        _function_call_result = Message(
+            role=role,
+            content=function_call.result,
+            tool_call_id=function_call.call_id,
+            tool_call_name=function_call.function.name,
+            metrics={"time": elapsed},
+        )
+        if "tool_call_times" not in self.metrics:
+            self.metrics["tool_call_times"] = {}
+        if function_call.function.name not in self.metrics["tool_call_times"]:
+            self.metrics["tool_call_times"][function_call.function.name] = []
+        self.metrics["tool_call_times"][function_call.function.name].append(elapsed)
+        self.function_call_stack.append(function_call)
+        return _function_call_result
+
     def get_system_prompt_from_llm(self) -> Optional[str]:
         return self.system_prompt
 
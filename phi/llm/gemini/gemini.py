@@ -3,11 +3,10 @@ from typing import Optional, List, Iterator, Dict, Any, Union, Callable
 
 from phi.llm.base import LLM
 from phi.llm.message import Message
-from phi.tools.function import Function, FunctionCall
+from phi.tools.function import Function
 from phi.tools import Tool, Toolkit
 from phi.utils.log import logger
 from phi.utils.timer import Timer
-from phi.utils.tools import get_function_call_for_tool_call
 
 try:
     from vertexai.generative_models import (
@@ -138,12 +137,7 @@ class Gemini(LLM):
             stream=True,
         )
 
-    def response(self, messages: List[Message]) -> str:
-        logger.debug("---------- VertexAI Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def response_round(self, messages: List[Message]) -> Message:
         response_timer = Timer()
         response_timer.start()
         response: GenerationResponse = self.invoke(messages=messages)
@@ -162,7 +156,8 @@ class Gemini(LLM):
 
         if len(response_parts) > 1:
             logger.warning("Multiple content parts are not yet supported.")
-            return "More than one response part found."
+            # This message is not added to the messages
+            return Message(role=response_role or "assistant", content="More than one response part found.")
 
         _part_dict = response_parts[0].to_dict()
         if "text" in _part_dict:
@@ -201,47 +196,12 @@ class Gemini(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function calls
-        if assistant_message.tool_calls is not None:
-            final_response = ""
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _tool_call_id = tool_call.get("id")
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(
-                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
-                    )
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
+        return assistant_message
 
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    final_response += "\nRunning:"
-                    for _f in function_calls_to_run:
-                        final_response += f"\n - {_f.get_call_str()}"
-                    final_response += "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run)
-            if len(function_call_results) > 0:
-                messages.extend(function_call_results)
-            # -*- Get new response using result of tool call
-            final_response += self.response(messages=messages)
-            return final_response
-        logger.debug("---------- VertexAI Response End ----------")
+    def get_response_content(self, assistant_message: Message) -> str:
         return assistant_message.get_content_string()
 
-    def response_stream(self, messages: List[Message]) -> Iterator[str]:
-        logger.debug("---------- VertexAI Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
         response_role: Optional[str] = None
         response_function_calls: Optional[List[Dict[str, Any]]] = None
         assistant_message_content = ""
@@ -294,35 +254,3 @@ class Gemini(LLM):
         # -*- Add assistant message to messages
         messages.append(assistant_message)
         assistant_message.log()
-
-        # -*- Parse and run function calls
-        if assistant_message.tool_calls is not None:
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _tool_call_id = tool_call.get("id")
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(
-                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
-                    )
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    yield "\nRunning:"
-                    for _f in function_calls_to_run:
-                        yield f"\n - {_f.get_call_str()}"
-                    yield "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run)
-            if len(function_call_results) > 0:
-                messages.extend(function_call_results)
-            # -*- Yield new response using results of tool calls
-            yield from self.response_stream(messages=messages)
-        logger.debug("---------- VertexAI Response End ----------")
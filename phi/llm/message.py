@@ -1,8 +1,9 @@
 import json
-from typing import Optional, Any, Dict, List, Union
-from pydantic import BaseModel, ConfigDict
+from typing import Optional, Any, Callable, Dict, List, Tuple, Union
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from phi.utils.log import logger
+from phi.utils.tokens import count_tokens as count_text_tokens
 
 
 class Message(BaseModel):
@@ -27,12 +28,18 @@ class Message(BaseModel):
     metrics: Dict[str, Any] = {}
     # Internal identifier for the message.
     internal_id: Optional[str] = None
+    # Length of the start of the content which is the same for every run, e.g. the static part of the system prompt.
+    # LLMs which support prompt caching can cache this prefix.
+    cache_prefix_length: Optional[int] = None
 
     # DEPRECATED: The name and arguments of a function that should be called, as generated by the model.
     function_call: Optional[Dict[str, Any]] = None
 
     model_config = ConfigDict(extra="allow")
 
+    # Number of tokens in the message and the function which counted them, see get_num_tokens()
+    _num_tokens: Optional[Tuple[Callable[[str], int], int]] = PrivateAttr(default=None)
+
     def get_content_string(self) -> str:
         """Returns the content as a string."""
         if isinstance(self.content, str):
@@ -43,8 +50,27 @@ class Message(BaseModel):
             return json.dumps(self.content)
         return ""
 
+    def get_num_tokens(self, count_tokens: Optional[Callable[[str], int]] = None) -> int:
+        """Returns the number of tokens in the message content and tool calls.
+
+        The count is cached on the message along with the function which counted it, so messages should not
+        be updated after they are counted. Counting with another function, e.g. for another model, counts again.
+        Use phi.utils.tokens.get_token_counter() to get the same function for each model.
+
+        @param count_tokens: Function to count the tokens in a text. Defaults to phi.utils.tokens.count_tokens
+        """
+        _count_tokens = count_tokens or count_text_tokens
+        if self._num_tokens is None or self._num_tokens[0] is not _count_tokens:
+            text = self.get_content_string()
+            if self.tool_calls:
+                text += json.dumps(self.tool_calls)
+            self._num_tokens = (_count_tokens, _count_tokens(text))
+        return self._num_tokens[1]
+
     def to_dict(self) -> Dict[str, Any]:
-        _dict = self.model_dump(exclude_none=True, exclude={"metrics", "tool_call_name", "internal_id"})
+        _dict = self.model_dump(
+            exclude_none=True, exclude={"metrics", "tool_call_name", "internal_id", "cache_prefix_length"}
+        )
         # Manually add the content field if it is None
         if self.content is None:
             _dict["content"] = None
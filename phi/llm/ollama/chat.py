@@ -4,10 +4,8 @@ from typing import Optional, List, Iterator, Dict, Any, Mapping, Union
 
 from phi.llm.base import LLM
 from phi.llm.message import Message
-from phi.tools.function import FunctionCall
 from phi.utils.log import logger
 from phi.utils.timer import Timer
-from phi.utils.tools import get_function_call_for_tool_call
 
 try:
     from ollama import Client as OllamaClient
@@ -104,12 +102,7 @@ class Ollama(LLM):
         # This is triggered when the function call limit is reached.
         self.format = ""
 
-    def response(self, messages: List[Message]) -> str:
-        logger.debug("---------- Ollama Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def response_round(self, messages: List[Message]) -> Message:
         response_timer = Timer()
         response_timer.start()
         response: Mapping[str, Any] = self.invoke(messages=messages)
@@ -169,55 +162,9 @@ class Ollama(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        if assistant_message.tool_calls is not None and self.run_tools:
-            final_response = ""
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(Message(role="user", content="Could not find function to call."))
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="user", content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    final_response += "\nRunning:"
-                    for _f in function_calls_to_run:
-                        final_response += f"\n - {_f.get_call_str()}"
-                    final_response += "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run, role="user")
-            if len(function_call_results) > 0:
-                messages.extend(function_call_results)
-                # Reconfigure messages so the LLM is reminded of the original task
-                if self.add_user_message_after_tool_call:
-                    messages = self.add_original_user_message(messages)
-
-            # Deactivate tool calls by turning off JSON mode after 1 tool call
-            if self.deactivate_tools_after_use:
-                self.deactivate_function_calls()
-
-            # -*- Yield new response using results of tool calls
-            final_response += self.response(messages=messages)
-            return final_response
-        logger.debug("---------- Ollama Response End ----------")
-        # -*- Return content if no function calls are present
-        if assistant_message.content is not None:
-            return assistant_message.get_content_string()
-        return "Something went wrong, please try again."
-
-    def response_stream(self, messages: List[Message]) -> Iterator[str]:
-        logger.debug("---------- Ollama Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
+        return assistant_message
 
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
         assistant_message_content = ""
         response_is_tool_call = False
         tool_call_bracket_count = 0
@@ -335,43 +282,23 @@ class Ollama(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        if assistant_message.tool_calls is not None and self.run_tools:
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(Message(role="user", content="Could not find function to call."))
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="user", content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    yield "\nRunning:"
-                    for _f in function_calls_to_run:
-                        yield f"\n - {_f.get_call_str()}"
-                    yield "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run, role="user")
-            # Add results of the function calls to the messages
-            if len(function_call_results) > 0:
-                messages.extend(function_call_results)
-                # Reconfigure messages so the LLM is reminded of the original task
-                if self.add_user_message_after_tool_call:
-                    messages = self.add_original_user_message(messages)
-
-            # Deactivate tool calls by turning off JSON mode after 1 tool call
-            if self.deactivate_tools_after_use:
-                self.deactivate_function_calls()
-
-            # -*- Yield new response using results of tool calls
-            yield from self.response_stream(messages=messages)
-        logger.debug("---------- Ollama Response End ----------")
+    def run_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Iterator[str]:
+        function_calls_to_run = self.get_function_calls_to_run(
+            assistant_message=assistant_message, messages=messages, role="user"
+        )
+        yield from self.get_tool_calls_response(function_calls_to_run)
+
+        function_call_results = self.run_function_calls(function_calls_to_run, role="user")
+        # Add results of the function calls to the messages
+        if len(function_call_results) > 0:
+            messages.extend(function_call_results)
+            # Reconfigure messages so the LLM is reminded of the original task
+            if self.add_user_message_after_tool_call:
+                self.add_original_user_message(messages)
+
+        # Deactivate tool calls by turning off JSON mode after 1 tool call
+        if self.deactivate_tools_after_use:
+            self.deactivate_function_calls()
 
     def add_original_user_message(self, messages: List[Message]) -> List[Message]:
         # Add the original user message to the messages to remind the LLM of the original task
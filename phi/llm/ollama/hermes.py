@@ -4,11 +4,9 @@ from typing import Optional, List, Iterator, Dict, Any, Mapping, Union
 
 from phi.llm.base import LLM
 from phi.llm.message import Message
-from phi.tools.function import FunctionCall
 from phi.utils.log import logger
 from phi.utils.timer import Timer
 from phi.utils.tools import (
-    get_function_call_for_tool_call,
     extract_tool_call_from_string,
     remove_tool_calls_from_string,
 )
@@ -106,12 +104,7 @@ class Hermes(LLM):
         # This is triggered when the function call limit is reached.
         self.format = ""
 
-    def response(self, messages: List[Message]) -> str:
-        logger.debug("---------- Hermes Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def response_round(self, messages: List[Message]) -> Message:
         response_timer = Timer()
         response_timer.start()
         response: Mapping[str, Any] = self.invoke(messages=messages)
@@ -183,67 +176,9 @@ class Hermes(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        if assistant_message.tool_calls is not None and self.run_tools:
-            # Remove the tool call from the response content
-            final_response = remove_tool_calls_from_string(assistant_message.get_content_string())
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(Message(role="user", content="Could not find function to call."))
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="user", content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    final_response += f" - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    final_response += "Running:"
-                    for _f in function_calls_to_run:
-                        final_response += f"\n - {_f.get_call_str()}"
-                    final_response += "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run, role="user")
-            if len(function_call_results) > 0:
-                fc_responses = []
-                for _fc_message in function_call_results:
-                    fc_responses.append(
-                        json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content})
-                    )
-
-                tool_response_message_content = "<tool_response>\n" + "\n".join(fc_responses) + "\n</tool_response>"
-                messages.append(Message(role="user", content=tool_response_message_content))
-
-                for _fc_message in function_call_results:
-                    _fc_message.content = (
-                        "<tool_response>\n"
-                        + json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content})
-                        + "\n</tool_response>"
-                    )
-                    messages.append(_fc_message)
-                # Reconfigure messages so the LLM is reminded of the original task
-                if self.add_user_message_after_tool_call:
-                    messages = self.add_original_user_message(messages)
-
-            # -*- Yield new response using results of tool calls
-            final_response += self.response(messages=messages)
-            return final_response
-        logger.debug("---------- Hermes Response End ----------")
-        # -*- Return content if no function calls are present
-        if assistant_message.content is not None:
-            return assistant_message.get_content_string()
-        return "Something went wrong, please try again."
-
-    def response_stream(self, messages: List[Message]) -> Iterator[str]:
-        logger.debug("---------- Hermes Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
+        return assistant_message
 
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
         assistant_message_content = ""
         tool_calls_counter = 0
         response_is_tool_call = False
@@ -358,46 +293,28 @@ class Hermes(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        if assistant_message.tool_calls is not None and self.run_tools:
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(Message(role="user", content="Could not find function to call."))
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="user", content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    yield f"- Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    yield "Running:"
-                    for _f in function_calls_to_run:
-                        yield f"\n - {_f.get_call_str()}"
-                    yield "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run, role="user")
-            # Add results of the function calls to the messages
-            if len(function_call_results) > 0:
-                fc_responses = []
-                for _fc_message in function_call_results:
-                    fc_responses.append(
-                        json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content})
-                    )
-
-                tool_response_message_content = "<tool_response>\n" + "\n".join(fc_responses) + "\n</tool_response>"
-                messages.append(Message(role="user", content=tool_response_message_content))
-                # Reconfigure messages so the LLM is reminded of the original task
-                if self.add_user_message_after_tool_call:
-                    messages = self.add_original_user_message(messages)
-
-            # -*- Yield new response using results of tool calls
-            yield from self.response_stream(messages=messages)
-        logger.debug("---------- Hermes Response End ----------")
+    def get_content_before_tool_calls(self, assistant_message: Message) -> str:
+        # Remove the tool call from the response content
+        return remove_tool_calls_from_string(assistant_message.get_content_string())
+
+    def run_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Iterator[str]:
+        function_calls_to_run = self.get_function_calls_to_run(
+            assistant_message=assistant_message, messages=messages, role="user"
+        )
+        yield from self.get_tool_calls_response(function_calls_to_run)
+
+        function_call_results = self.run_function_calls(function_calls_to_run, role="user")
+        # Add results of the function calls to the messages
+        if len(function_call_results) > 0:
+            fc_responses = []
+            for _fc_message in function_call_results:
+                fc_responses.append(json.dumps({"name": _fc_message.tool_call_name, "content": _fc_message.content}))
+
+            tool_response_message_content = "<tool_response>\n" + "\n".join(fc_responses) + "\n</tool_response>"
+            messages.append(Message(role="user", content=tool_response_message_content))
+            # Reconfigure messages so the LLM is reminded of the original task
+            if self.add_user_message_after_tool_call:
+                self.add_original_user_message(messages)
 
     def add_original_user_message(self, messages: List[Message]) -> List[Message]:
         # Add the original user message to the messages to remind the LLM of the original task
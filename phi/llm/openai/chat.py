@@ -1,5 +1,5 @@
 import httpx
-from typing import Optional, List, Iterator, Dict, Any, Union, Tuple
+from typing import Optional, List, Iterator, AsyncIterator, Dict, Any, Union, Tuple
 
 from phi.llm.base import LLM
 from phi.llm.message import Message
@@ -7,7 +7,6 @@ from phi.tools.function import FunctionCall
 from phi.utils.log import logger
 from phi.utils.timer import Timer
 from phi.utils.functions import get_function_call
-from phi.utils.tools import get_function_call_for_tool_call
 
 try:
     from openai import OpenAI as OpenAIClient, AsyncOpenAI as AsyncOpenAIClient
@@ -278,12 +277,31 @@ class OpenAIChat(LLM):
             return _function_call_message, _function_call
         return Message(role="function", content="Function name is None."), None
 
-    def response(self, messages: List[Message]) -> str:
-        logger.debug("---------- OpenAI Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def has_tool_calls_to_run(self, assistant_message: Message) -> bool:
+        if self.run_tools and assistant_message.function_call is not None:
+            return True
+        return super().has_tool_calls_to_run(assistant_message)
+
+    def run_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Iterator[str]:
+        if assistant_message.function_call is not None:
+            function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
+            messages.append(function_call_message)
+            if self.show_tool_calls and function_call is not None:
+                yield f"\n - Running: {function_call.get_call_str()}\n\n"
+            return
+        yield from super().run_tool_calls(assistant_message=assistant_message, messages=messages)
+
+    async def arun_tool_calls(self, assistant_message: Message, messages: List[Message]) -> Any:
+        if assistant_message.function_call is not None:
+            for tool_calls_response in self.run_tool_calls(assistant_message=assistant_message, messages=messages):
+                yield tool_calls_response
+            return
+        async for tool_calls_response in super().arun_tool_calls(
+            assistant_message=assistant_message, messages=messages
+        ):
+            yield tool_calls_response
+
+    def response_round(self, messages: List[Message]) -> Message:
         response_timer = Timer()
         response_timer.start()
         response: ChatCompletion = self.invoke(messages=messages)
@@ -344,71 +362,9 @@ class OpenAIChat(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        need_to_run_functions = assistant_message.function_call is not None or assistant_message.tool_calls is not None
-        if need_to_run_functions and self.run_tools:
-            if assistant_message.function_call is not None:
-                function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
-                messages.append(function_call_message)
-                # -*- Get new response using result of function call
-                final_response = ""
-                if self.show_tool_calls and function_call is not None:
-                    final_response += f"\n - Running: {function_call.get_call_str()}\n\n"
-                final_response += self.response(messages=messages)
-                return final_response
-            elif assistant_message.tool_calls is not None:
-                final_response = ""
-                function_calls_to_run: List[FunctionCall] = []
-                for tool_call in assistant_message.tool_calls:
-                    _tool_call_id = tool_call.get("id")
-                    _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                    if _function_call is None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content="Could not find function to call.",
-                            )
-                        )
-                        continue
-                    if _function_call.error is not None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content=_function_call.error,
-                            )
-                        )
-                        continue
-                    function_calls_to_run.append(_function_call)
-
-                if self.show_tool_calls:
-                    if len(function_calls_to_run) == 1:
-                        final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                    elif len(function_calls_to_run) > 1:
-                        final_response += "\nRunning:"
-                        for _f in function_calls_to_run:
-                            final_response += f"\n - {_f.get_call_str()}"
-                        final_response += "\n\n"
-
-                function_call_results = self.run_function_calls(function_calls_to_run)
-                if len(function_call_results) > 0:
-                    messages.extend(function_call_results)
-                # -*- Get new response using result of tool call
-                final_response += self.response(messages=messages)
-                return final_response
-        logger.debug("---------- OpenAI Response End ----------")
-        # -*- Return content if no function calls are present
-        if assistant_message.content is not None:
-            return assistant_message.get_content_string()
-        return "Something went wrong, please try again."
-
-    async def aresponse(self, messages: List[Message]) -> str:
-        logger.debug("---------- OpenAI Async Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
+        return assistant_message
 
+    async def aresponse_round(self, messages: List[Message]) -> Message:
         response_timer = Timer()
         response_timer.start()
         response: ChatCompletion = await self.ainvoke(messages=messages)
@@ -469,64 +425,7 @@ class OpenAIChat(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        need_to_run_functions = assistant_message.function_call is not None or assistant_message.tool_calls is not None
-        if need_to_run_functions and self.run_tools:
-            if assistant_message.function_call is not None:
-                function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
-                messages.append(function_call_message)
-                # -*- Get new response using result of function call
-                final_response = ""
-                if self.show_tool_calls and function_call is not None:
-                    final_response += f"\n - Running: {function_call.get_call_str()}\n\n"
-                final_response += self.response(messages=messages)
-                return final_response
-            elif assistant_message.tool_calls is not None:
-                final_response = ""
-                function_calls_to_run: List[FunctionCall] = []
-                for tool_call in assistant_message.tool_calls:
-                    _tool_call_id = tool_call.get("id")
-                    _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                    if _function_call is None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content="Could not find function to call.",
-                            )
-                        )
-                        continue
-                    if _function_call.error is not None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content=_function_call.error,
-                            )
-                        )
-                        continue
-                    function_calls_to_run.append(_function_call)
-
-                if self.show_tool_calls:
-                    if len(function_calls_to_run) == 1:
-                        final_response += f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                    elif len(function_calls_to_run) > 1:
-                        final_response += "\nRunning:"
-                        for _f in function_calls_to_run:
-                            final_response += f"\n - {_f.get_call_str()}"
-                        final_response += "\n\n"
-
-                function_call_results = self.run_function_calls(function_calls_to_run)
-                if len(function_call_results) > 0:
-                    messages.extend(function_call_results)
-                # -*- Get new response using result of tool call
-                final_response += await self.aresponse(messages=messages)
-                return final_response
-        logger.debug("---------- OpenAI Async Response End ----------")
-        # -*- Return content if no function calls are present
-        if assistant_message.content is not None:
-            return assistant_message.get_content_string()
-        return "Something went wrong, please try again."
+        return assistant_message
 
     def generate(self, messages: List[Message]) -> Dict:
         logger.debug("---------- OpenAI Response Start ----------")
@@ -599,12 +498,7 @@ class OpenAIChat(LLM):
         logger.debug("---------- OpenAI Response End ----------")
         return response_message_dict
 
-    def response_stream(self, messages: List[Message]) -> Iterator[str]:
-        logger.debug("---------- OpenAI Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
         assistant_message_content = ""
         assistant_message_function_name = ""
         assistant_message_function_arguments_str = ""
@@ -756,68 +650,7 @@ class OpenAIChat(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        need_to_run_functions = assistant_message.function_call is not None or assistant_message.tool_calls is not None
-        if need_to_run_functions and self.run_tools:
-            if assistant_message.function_call is not None:
-                function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
-                messages.append(function_call_message)
-                if self.show_tool_calls and function_call is not None:
-                    yield f"\n - Running: {function_call.get_call_str()}\n\n"
-                # -*- Yield new response using result of function call
-                yield from self.response_stream(messages=messages)
-            elif assistant_message.tool_calls is not None:
-                function_calls_to_run: List[FunctionCall] = []
-                for tool_call in assistant_message.tool_calls:
-                    _tool_call_id = tool_call.get("id")
-                    _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                    if _function_call is None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content="Could not find function to call.",
-                            )
-                        )
-                        continue
-                    if _function_call.error is not None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content=_function_call.error,
-                            )
-                        )
-                        continue
-                    function_calls_to_run.append(_function_call)
-
-                if self.show_tool_calls:
-                    if len(function_calls_to_run) == 1:
-                        yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                    elif len(function_calls_to_run) > 1:
-                        yield "\nRunning:"
-                        for _f in function_calls_to_run:
-                            yield f"\n - {_f.get_call_str()}"
-                        yield "\n\n"
-
-                function_call_results = self.run_function_calls(function_calls_to_run)
-                if len(function_call_results) > 0:
-                    messages.extend(function_call_results)
-                    # Code to show function call results
-                    # for f in function_call_results:
-                    #     yield "\n"
-                    #     yield f.get_content_string()
-                    #     yield "\n"
-                # -*- Yield new response using results of tool calls
-                yield from self.response_stream(messages=messages)
-        logger.debug("---------- OpenAI Response End ----------")
-
-    async def aresponse_stream(self, messages: List[Message]) -> Any:
-        logger.debug("---------- OpenAI Async Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
+    async def aresponse_stream_round(self, messages: List[Message]) -> AsyncIterator[str]:
         assistant_message_content = ""
         assistant_message_function_name = ""
         assistant_message_function_arguments_str = ""
@@ -949,68 +782,6 @@ class OpenAIChat(LLM):
         messages.append(assistant_message)
         assistant_message.log()
 
-        # -*- Parse and run function call
-        need_to_run_functions = assistant_message.function_call is not None or assistant_message.tool_calls is not None
-        if need_to_run_functions and self.run_tools:
-            if assistant_message.function_call is not None:
-                function_call_message, function_call = self.run_function(function_call=assistant_message.function_call)
-                messages.append(function_call_message)
-                if self.show_tool_calls and function_call is not None:
-                    yield f"\n - Running: {function_call.get_call_str()}\n\n"
-                # -*- Yield new response using result of function call
-                fc_stream = self.aresponse_stream(messages=messages)
-                async for fc in fc_stream:
-                    yield fc
-                # yield from self.response_stream(messages=messages)
-            elif assistant_message.tool_calls is not None:
-                function_calls_to_run: List[FunctionCall] = []
-                for tool_call in assistant_message.tool_calls:
-                    _tool_call_id = tool_call.get("id")
-                    _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                    if _function_call is None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content="Could not find function to call.",
-                            )
-                        )
-                        continue
-                    if _function_call.error is not None:
-                        messages.append(
-                            Message(
-                                role="tool",
-                                tool_call_id=_tool_call_id,
-                                content=_function_call.error,
-                            )
-                        )
-                        continue
-                    function_calls_to_run.append(_function_call)
-
-                if self.show_tool_calls:
-                    if len(function_calls_to_run) == 1:
-                        yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                    elif len(function_calls_to_run) > 1:
-                        yield "\nRunning:"
-                        for _f in function_calls_to_run:
-                            yield f"\n - {_f.get_call_str()}"
-                        yield "\n\n"
-
-                function_call_results = self.run_function_calls(function_calls_to_run)
-                if len(function_call_results) > 0:
-                    messages.extend(function_call_results)
-                    # Code to show function call results
-                    # for f in function_call_results:
-                    #     yield "\n"
-                    #     yield f.get_content_string()
-                    #     yield "\n"
-                # -*- Yield new response using results of tool calls
-                fc_stream = self.aresponse_stream(messages=messages)
-                async for fc in fc_stream:
-                    yield fc
-                # yield from self.response_stream(messages=messages)
-        logger.debug("---------- OpenAI Async Response End ----------")
-
     def generate_stream(self, messages: List[Message]) -> Iterator[Dict]:
         logger.debug("---------- OpenAI Response Start ----------")
         # -*- Log messages for debugging
@@ -4,10 +4,8 @@ from typing import Optional, List, Iterator, Dict, Any
 
 from phi.llm.message import Message
 from phi.llm.openai.like import OpenAILike
-from phi.tools.function import FunctionCall
 from phi.utils.log import logger
 from phi.utils.timer import Timer
-from phi.utils.tools import get_function_call_for_tool_call
 
 
 class Together(OpenAILike):
@@ -17,16 +15,11 @@ class Together(OpenAILike):
     base_url: str = "https://api.together.xyz/v1"
     monkey_patch: bool = False
 
-    def response_stream(self, messages: List[Message]) -> Iterator[str]:
+    def response_stream_round(self, messages: List[Message]) -> Iterator[str]:
         if not self.monkey_patch:
-            yield from super().response_stream(messages)
+            yield from super().response_stream_round(messages)
             return
 
-        logger.debug("---------- Together Response Start ----------")
-        # -*- Log messages for debugging
-        for m in messages:
-            m.log()
-
         assistant_message_content = ""
         response_is_tool_call = False
         completion_tokens = 0
@@ -111,36 +104,3 @@ class Together(OpenAILike):
         # -*- Add assistant message to messages
         messages.append(assistant_message)
         assistant_message.log()
-
-        # -*- Parse and run tool calls
-        if assistant_message.tool_calls is not None:
-            function_calls_to_run: List[FunctionCall] = []
-            for tool_call in assistant_message.tool_calls:
-                _tool_call_id = tool_call.get("id")
-                _function_call = get_function_call_for_tool_call(tool_call, self.functions)
-                if _function_call is None:
-                    messages.append(
-                        Message(role="tool", tool_call_id=_tool_call_id, content="Could not find function to call.")
-                    )
-                    continue
-                if _function_call.error is not None:
-                    messages.append(Message(role="tool", tool_call_id=_tool_call_id, content=_function_call.error))
-                    continue
-                function_calls_to_run.append(_function_call)
-
-            if self.show_tool_calls:
-                if len(function_calls_to_run) == 1:
-                    yield f"\n - Running: {function_calls_to_run[0].get_call_str()}\n\n"
-                elif len(function_calls_to_run) > 1:
-                    yield "\nRunning:"
-                    for _f in function_calls_to_run:
-                        yield f"\n - {_f.get_call_str()}"
-                    yield "\n\n"
-
-            function_call_results = self.run_function_calls(function_calls_to_run)
-            # Add results of the function calls to the messages
-            if len(function_call_results) > 0:
-                messages.extend(function_call_results)
-            # -*- Yield new response using results of tool calls
-            yield from self.response_stream(messages=messages)
-        logger.debug("---------- Together Response End ----------")
@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Set, Tuple
 
 from pydantic import BaseModel, ConfigDict
 
@@ -26,6 +26,13 @@ class AssistantMemory(BaseModel):
     llm_messages: List[Message] = []
     # References from the vector database.
     references: List[References] = []
+    # Maximum number of llm_messages kept in memory. The oldest messages are removed by trim_llm_messages().
+    # Assistants only trim the llm_messages without storage or with an incremental storage.
+    max_llm_messages: Optional[int] = None
+    # Number of llm_messages removed from the start of the list by trim_llm_messages(), or not read from storage
+    llm_messages_start: int = 0
+    # Number of messages at the start of the chat_history which were not read from storage
+    chat_history_start: int = 0
 
     # Create personalized memories for this user
     db: Optional[MemoryDb] = None
@@ -39,10 +46,20 @@ class AssistantMemory(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def to_dict(self) -> Dict[str, Any]:
-        _memory_dict = self.model_dump(
-            exclude_none=True, exclude={"db", "updating", "memories", "classifier", "manager"}
-        )
+    def to_dict(self, exclude: Optional[Set[str]] = None) -> Dict[str, Any]:
+        _exclude = {
+            "db",
+            "updating",
+            "memories",
+            "classifier",
+            "manager",
+            "max_llm_messages",
+            "llm_messages_start",
+            "chat_history_start",
+        }
+        if exclude is not None:
+            _exclude.update(exclude)
+        _memory_dict = self.model_dump(exclude_none=True, exclude=_exclude)
         if self.memories:
             _memory_dict["memories"] = [memory.to_dict() for memory in self.memories]
         return _memory_dict
@@ -74,28 +91,69 @@ class AssistantMemory(BaseModel):
         """
         return [message.model_dump(exclude_none=True) for message in self.chat_history]
 
-    def get_last_n_messages(self, last_n: Optional[int] = None) -> List[Message]:
+    def trim_llm_messages(self) -> None:
+        """Removes the oldest llm_messages so that at most max_llm_messages are kept in memory."""
+        if self.max_llm_messages is None or len(self.llm_messages) <= self.max_llm_messages:
+            return
+
+        num_removed = len(self.llm_messages) - self.max_llm_messages
+        self.llm_messages = self.llm_messages[num_removed:]
+        self.llm_messages_start += num_removed
+
+    def get_list_start(self, key: str) -> int:
+        """Returns the position of the first item kept in memory, in the full list of items added to a memory list."""
+        if key == "llm_messages":
+            return self.llm_messages_start
+        if key == "chat_history":
+            return self.chat_history_start
+        return 0
+
+    def get_last_n_messages(
+        self,
+        last_n: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> List[Message]:
         """Returns the last n messages in the chat_history.
 
         :param last_n: The number of messages to return from the end of the conversation.
             If None, returns all messages.
+        :param max_tokens: The maximum number of tokens in the messages returned.
+            The most recent messages which fit are returned. If None, the messages are not limited by tokens.
+        :param count_tokens: Function to count the tokens in a text, see Message.get_num_tokens()
         :return: A list of Messages in the chat_history.
         """
-        return self.chat_history[-last_n:] if last_n else self.chat_history
+        messages = self.chat_history[-last_n:] if last_n else self.chat_history
+        if max_tokens is None:
+            return messages
+
+        num_tokens = 0
+        start = len(messages)
+        while start > 0:
+            num_tokens += messages[start - 1].get_num_tokens(count_tokens)
+            if num_tokens > max_tokens:
+                break
+            start -= 1
+        return messages[start:]
 
     def get_llm_messages(self) -> List[Dict[str, Any]]:
         """Returns the llm_messages as a list of dictionaries."""
         return [message.model_dump(exclude_none=True) for message in self.llm_messages]
 
-    def get_formatted_chat_history(self, num_messages: Optional[int] = None) -> str:
+    def get_formatted_chat_history(
+        self,
+        num_messages: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        count_tokens: Optional[Callable[[str], int]] = None,
+    ) -> str:
         """Returns the chat_history as a formatted string."""
 
-        messages = self.get_last_n_messages(num_messages)
+        messages = self.get_last_n_messages(num_messages, max_tokens=max_tokens, count_tokens=count_tokens)
         if len(messages) == 0:
             return ""
 
         history = ""
-        for message in self.get_last_n_messages(num_messages):
+        for message in messages:
             if message.role == "user":
                 history += "\n---\n"
             history += f"{message.role.upper()}: {message.content}\n"
@@ -2,7 +2,7 @@ from typing import Optional, List
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
@@ -13,6 +13,7 @@ except ImportError:
 
 from phi.memory.db import MemoryDb
 from phi.memory.row import MemoryRow
+from phi.utils.engine import get_engine
 from phi.utils.log import logger
 
 
@@ -29,7 +30,7 @@ class PgMemoryDb(MemoryDb):
 
         The following order is used to determine the database connection:
             1. Use the db_engine if provided
-            2. Use the db_url to create the engine
+            2. Use the db_url to get the engine shared by all components using it, see phi.utils.engine
 
         Args:
             table_name (str): The name of the table to store memory rows.
@@ -39,7 +40,7 @@ class PgMemoryDb(MemoryDb):
         """
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
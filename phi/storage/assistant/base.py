@@ -1,10 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Tuple
 
 from phi.assistant.run import AssistantRun
 
 
 class AssistantStorage(ABC):
+    # If True, the memory lists in incremental_memory_keys are stored in a separate table, one row per item,
+    # and each write only appends the new items. See upsert_incremental()
+    # The lists of runs written before the storage was incremental are moved to that table on their first write.
+    incremental: bool = False
+    # Memory lists which are stored incrementally
+    incremental_memory_keys: Tuple[str, ...] = ("chat_history", "llm_messages", "references")
+
     @abstractmethod
     def create(self) -> None:
         raise NotImplementedError
@@ -28,3 +35,16 @@ class AssistantStorage(ABC):
     @abstractmethod
     def delete(self) -> None:
         raise NotImplementedError
+
+    def upsert_incremental(
+        self, row: AssistantRun, memory_items: Dict[str, List[Dict[str, Any]]], memory_offsets: Dict[str, int]
+    ) -> Optional[AssistantRun]:
+        """
+        Upsert the run and append the new memory items, without reading the run back.
+
+        :param row: The run to upsert. row.memory should not contain the incremental_memory_keys.
+        :param memory_items: The new items for each memory list, e.g. {"chat_history": [...]}
+        :param memory_offsets: The position of the first new item in each memory list.
+            Stored items at or after this position are replaced.
+        """
+        raise NotImplementedError
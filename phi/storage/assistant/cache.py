@@ -0,0 +1,107 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Optional, List, Tuple
+
+from pydantic import BaseModel
+
+from phi.assistant.run import AssistantRun
+from phi.llm.message import Message
+from phi.llm.references import References
+from phi.memory.memory import Memory
+
+
+class CachedRun(BaseModel):
+    """An AssistantRun along with its parsed memory, so a cache hit skips validating the memory again"""
+
+    # The run, without the memory lists below in row.memory
+    row: AssistantRun
+    chat_history: List[Message] = []
+    # Number of chat_history messages not read from storage
+    chat_history_start: int = 0
+    llm_messages: List[Message] = []
+    # Number of llm_messages removed from memory or not read from storage, see AssistantMemory.trim_llm_messages()
+    llm_messages_start: int = 0
+    references: List[References] = []
+    memories: Optional[List[Memory]] = None
+
+
+class RunCache(ABC):
+    """Cache of assistant runs keyed by run_id, checked by the Assistant before reading from storage.
+
+    Subclass this to use an external cache, e.g. redis, storing CachedRun.model_dump_json()
+    and loading it with CachedRun.model_validate_json().
+    """
+
+    @abstractmethod
+    def get(self, run_id: str) -> Optional[CachedRun]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, run_id: str, run: CachedRun) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, run_id: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class InMemoryRunCache(RunCache):
+    def __init__(self, max_size: int = 1000, ttl: Optional[float] = 300):
+        """
+        A thread-safe, in-process LRU cache of assistant runs.
+
+        Runs are only updated in the cache by the assistants using it, so if runs are also written
+        by other processes, use a ttl to bound how long a stale run can be served.
+
+        :param max_size: The maximum number of runs to keep, the least recently used run is evicted first.
+        :param ttl: The number of seconds a run is kept after it is set. None to keep runs until evicted.
+        """
+        self.max_size: int = max_size
+        self.ttl: Optional[float] = ttl
+
+        self._runs: OrderedDict[str, Tuple[float, CachedRun]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def get(self, run_id: str) -> Optional[CachedRun]:
+        with self._lock:
+            cached = self._runs.get(run_id)
+            if cached is None:
+                return None
+            expires_at, run = cached
+            if monotonic() >= expires_at:
+                del self._runs[run_id]
+                return None
+            self._runs.move_to_end(run_id)
+        # The assistant updates the run data in place, so return a copy of the row.
+        # The memory lists are copied but the messages are shared, as they are not updated once added.
+        return CachedRun.model_construct(
+            row=run.row.model_copy(deep=True),
+            chat_history=list(run.chat_history),
+            chat_history_start=run.chat_history_start,
+            llm_messages=list(run.llm_messages),
+            llm_messages_start=run.llm_messages_start,
+            references=list(run.references),
+            memories=list(run.memories) if run.memories is not None else None,
+        )
+
+    def set(self, run_id: str, run: CachedRun) -> None:
+        expires_at = monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._runs[run_id] = (expires_at, run)
+            self._runs.move_to_end(run_id)
+            while len(self._runs) > self.max_size:
+                self._runs.popitem(last=False)
+
+    def delete(self, run_id: str) -> None:
+        with self._lock:
+            self._runs.pop(run_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._runs.clear()
@@ -1,4 +1,4 @@
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Dict
 import json
 
 try:
@@ -8,8 +8,8 @@ try:
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, select
-    from sqlalchemy.types import DateTime
+    from sqlalchemy.sql.expression import text, select, func, and_, or_
+    from sqlalchemy.types import DateTime, Integer
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
 
@@ -25,6 +25,7 @@ class S2AssistantStorage(AssistantStorage):
         schema: Optional[str] = "ai",
         db_url: Optional[str] = None,
         db_engine: Optional[Engine] = None,
+        incremental: bool = False,
     ):
         """
         This class provides assistant storage using a singlestore table.
@@ -37,6 +38,8 @@ class S2AssistantStorage(AssistantStorage):
         :param schema: The schema to store the table in.
         :param db_url: The database URL to connect to.
         :param db_engine: The database engine to use.
+        :param incremental: If True, store the chat_history, llm_messages and references in a separate
+            `{table_name}_memory` table, appending only the new items on each write.
         """
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
@@ -58,6 +61,10 @@ class S2AssistantStorage(AssistantStorage):
         # Database table for storage
         self.table: Table = self.get_table()
 
+        # Database table for the memory items when storing the memory incrementally
+        self.incremental: bool = incremental
+        self.memory_table: Table = self.get_memory_table()
+
     def get_table(self) -> Table:
         return Table(
             self.table_name,
@@ -89,6 +96,23 @@ class S2AssistantStorage(AssistantStorage):
             extend_existing=True,
         )
 
+    def get_memory_table(self) -> Table:
+        return Table(
+            f"{self.table_name}_memory",
+            self.metadata,
+            # ID of the run this item belongs to
+            Column("run_id", mysql.VARCHAR(255), primary_key=True),
+            # Memory list this item belongs to, e.g. chat_history
+            Column("memory_key", mysql.VARCHAR(255), primary_key=True),
+            # Position of this item in the memory list
+            Column("idx", Integer, primary_key=True),
+            # The item, e.g. a message
+            Column("item", mysql.JSON),
+            # The timestamp of when this item was created.
+            Column("created_at", DateTime(timezone=True), server_default=text("now()")),
+            extend_existing=True,
+        )
+
     def table_exists(self) -> bool:
         logger.debug(f"Checking if table exists: {self.table.name}")
         try:
@@ -105,6 +129,8 @@ class S2AssistantStorage(AssistantStorage):
             #         sess.execute(text(f"create schema if not exists {self.schema};"))
             logger.info(f"Creating table: {self.table_name}")
             self.table.create(self.db_engine)
+        if self.incremental:
+            self.memory_table.create(self.db_engine, checkfirst=True)
 
     def _read(self, session: Session, run_id: str) -> Optional[Row[Any]]:
         stmt = select(self.table).where(self.table.c.run_id == run_id)
@@ -116,10 +142,88 @@ class S2AssistantStorage(AssistantStorage):
             self.create()
         return None
 
-    def read(self, run_id: str) -> Optional[AssistantRun]:
+    def _get_memory_item_starts(self, session: Session, run_id: str, limits: Dict[str, int]) -> Dict[str, int]:
+        """Returns the position of the first of the last limits[key] items, for each memory list with stored items"""
+        stmt = (
+            select(self.memory_table.c.memory_key, func.max(self.memory_table.c.idx).label("max_idx"))
+            .where(self.memory_table.c.run_id == run_id, self.memory_table.c.memory_key.in_(list(limits.keys())))
+            .group_by(self.memory_table.c.memory_key)
+        )
+        try:
+            return {
+                item_row.memory_key: max(item_row.max_idx + 1 - limits[item_row.memory_key], 0)
+                for item_row in session.execute(stmt)
+            }
+        except Exception:
+            logger.debug(f"Table does not exist: {self.memory_table.name}")
+        return {}
+
+    def _read_memory_items(
+        self, session: Session, run_ids: List[str], starts: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Dict[str, List[Any]]]:
+        """Returns the memory items for each run, ordered by their position in the memory list.
+        Only the memory lists with stored items are returned, so they override the lists in the memory column.
+
+        :param starts: Only return the items from these positions of the memory lists, see _get_memory_item_starts()
+        """
+        memory_items: Dict[str, Dict[str, List[Any]]] = {
+            run_id: {key: [] for key in (starts or {})} for run_id in run_ids
+        }
+        stmt = (
+            select(self.memory_table.c.run_id, self.memory_table.c.memory_key, self.memory_table.c.item)
+            .where(self.memory_table.c.run_id.in_(run_ids))
+            .order_by(self.memory_table.c.run_id, self.memory_table.c.memory_key, self.memory_table.c.idx)
+        )
+        if starts:
+            stmt = stmt.where(
+                or_(
+                    self.memory_table.c.memory_key.not_in(list(starts.keys())),
+                    *[
+                        and_(self.memory_table.c.memory_key == key, self.memory_table.c.idx >= start)
+                        for key, start in starts.items()
+                    ],
+                )
+            )
+        try:
+            for item_row in session.execute(stmt):
+                memory_items[item_row.run_id].setdefault(item_row.memory_key, []).append(item_row.item)
+        except Exception:
+            logger.debug(f"Table does not exist: {self.memory_table.name}")
+        return memory_items
+
+    def _to_assistant_run(
+        self,
+        row: Row[Any],
+        memory_items: Optional[Dict[str, List[Any]]] = None,
+        memory_item_starts: Optional[Dict[str, int]] = None,
+    ) -> AssistantRun:
+        assistant_run = AssistantRun.model_validate(row)
+        if memory_items is not None:
+            assistant_run.memory = {**(assistant_run.memory or {}), **memory_items}
+        assistant_run.memory_item_starts = memory_item_starts
+        return assistant_run
+
+    def read(
+        self, run_id: str, include_memory_items: bool = True, memory_item_limits: Optional[Dict[str, int]] = None
+    ) -> Optional[AssistantRun]:
+        """
+        Read the assistant run.
+
+        :param run_id: The run to read.
+        :param include_memory_items: If False, do not load the incrementally stored memory items.
+            Only used if the storage is incremental.
+        :param memory_item_limits: Only load the last items of these memory lists, e.g. {"chat_history": 6}.
+            The position of the first item loaded is set in memory_item_starts. Only used if the storage is incremental.
+        """
         with self.Session.begin() as sess:
             existing_row: Optional[Row[Any]] = self._read(session=sess, run_id=run_id)
-            return AssistantRun.model_validate(existing_row) if existing_row is not None else None
+            if existing_row is None:
+                return None
+            if self.incremental and include_memory_items:
+                starts = self._get_memory_item_starts(sess, run_id, memory_item_limits) if memory_item_limits else None
+                memory_items = self._read_memory_items(sess, [run_id], starts=starts)[run_id]
+                return self._to_assistant_run(existing_row, memory_items, memory_item_starts=starts)
+            return self._to_assistant_run(existing_row)
 
     def get_all_run_ids(self, user_id: Optional[str] = None) -> List[str]:
         run_ids: List[str] = []
@@ -151,77 +255,132 @@ class S2AssistantStorage(AssistantStorage):
                 # order by created_at desc
                 stmt = stmt.order_by(self.table.c.created_at.desc())
                 # execute query
-                rows = sess.execute(stmt).fetchall()
-                for row in rows:
-                    if row.run_id is not None:
-                        runs.append(AssistantRun.model_validate(row))
+                rows = [row for row in sess.execute(stmt).fetchall() if row.run_id is not None]
+                if self.incremental:
+                    memory_items = self._read_memory_items(sess, [row.run_id for row in rows])
+                    runs = [self._to_assistant_run(row, memory_items[row.run_id]) for row in rows]
+                else:
+                    runs = [self._to_assistant_run(row) for row in rows]
         except Exception:
             logger.debug(f"Table does not exist: {self.table.name}")
         return runs
 
+    def get_upsert_sql(self):
+        # Create an insert statement using SingleStore's ON DUPLICATE KEY UPDATE syntax
+        return text(
+            f"""
+        INSERT INTO {self.schema}.{self.table_name}
+        (run_id, name, run_name, user_id, llm, memory, assistant_data, run_data, user_data, task_data)
+        VALUES
+        (:run_id, :name, :run_name, :user_id, :llm, :memory, :assistant_data, :run_data, :user_data, :task_data)
+        ON DUPLICATE KEY UPDATE
+            name = VALUES(name),
+            run_name = VALUES(run_name),
+            user_id = VALUES(user_id),
+            llm = VALUES(llm),
+            memory = VALUES(memory),
+            assistant_data = VALUES(assistant_data),
+            run_data = VALUES(run_data),
+            user_data = VALUES(user_data),
+            task_data = VALUES(task_data);
+        """
+        )
+
+    def get_upsert_params(self, row: AssistantRun) -> Dict[str, Any]:
+        return {
+            "run_id": row.run_id,
+            "name": row.name,
+            "run_name": row.run_name,
+            "user_id": row.user_id,
+            "llm": json.dumps(row.llm) if row.llm is not None else None,
+            "memory": json.dumps(row.memory) if row.memory is not None else None,
+            "assistant_data": json.dumps(row.assistant_data) if row.assistant_data is not None else None,
+            "run_data": json.dumps(row.run_data) if row.run_data is not None else None,
+            "user_data": json.dumps(row.user_data) if row.user_data is not None else None,
+            "task_data": json.dumps(row.task_data) if row.task_data is not None else None,
+        }
+
     def upsert(self, row: AssistantRun) -> Optional[AssistantRun]:
         """
         Create a new assistant run if it does not exist, otherwise update the existing assistant.
         """
 
         with self.Session.begin() as sess:
-            # Create an insert statement using SingleStore's ON DUPLICATE KEY UPDATE syntax
-            upsert_sql = text(
-                f"""
-            INSERT INTO {self.schema}.{self.table_name}
-            (run_id, name, run_name, user_id, llm, memory, assistant_data, run_data, user_data, task_data)
-            VALUES
-            (:run_id, :name, :run_name, :user_id, :llm, :memory, :assistant_data, :run_data, :user_data, :task_data)
-            ON DUPLICATE KEY UPDATE
-                name = VALUES(name),
-                run_name = VALUES(run_name),
-                user_id = VALUES(user_id),
-                llm = VALUES(llm),
-                memory = VALUES(memory),
-                assistant_data = VALUES(assistant_data),
-                run_data = VALUES(run_data),
-                user_data = VALUES(user_data),
-                task_data = VALUES(task_data);
-            """
-            )
-
+            upsert_sql = self.get_upsert_sql()
             try:
-                sess.execute(
-                    upsert_sql,
-                    {
-                        "run_id": row.run_id,
-                        "name": row.name,
-                        "run_name": row.run_name,
-                        "user_id": row.user_id,
-                        "llm": json.dumps(row.llm) if row.llm is not None else None,
-                        "memory": json.dumps(row.memory) if row.memory is not None else None,
-                        "assistant_data": json.dumps(row.assistant_data) if row.assistant_data is not None else None,
-                        "run_data": json.dumps(row.run_data) if row.run_data is not None else None,
-                        "user_data": json.dumps(row.user_data) if row.user_data is not None else None,
-                        "task_data": json.dumps(row.task_data) if row.task_data is not None else None,
-                    },
-                )
+                sess.execute(upsert_sql, self.get_upsert_params(row))
             except Exception:
                 # Create table and try again
                 self.create()
+                sess.execute(upsert_sql, self.get_upsert_params(row))
+        return self.read(run_id=row.run_id)
+
+    def _migrate_memory_lists(self, session: Session, run_id: str) -> None:
+        """
+        Moves the memory lists in the memory column of a run to the memory table.
+        Runs written before the storage was incremental keep their lists in the memory column,
+        which upsert_incremental() writes without them.
+        """
+        existing_row = session.execute(select(self.table.c.memory).where(self.table.c.run_id == run_id)).first()
+        if existing_row is None or not existing_row.memory:
+            return
+        for memory_key in self.incremental_memory_keys:
+            items = existing_row.memory.get(memory_key)
+            if not items:
+                continue
+            logger.debug(f"Moving {len(items)} {memory_key} items of run {run_id} to {self.memory_table.name}")
+            session.execute(
+                self.memory_table.delete().where(
+                    self.memory_table.c.run_id == run_id, self.memory_table.c.memory_key == memory_key
+                )
+            )
+            session.execute(
+                self.memory_table.insert(),
+                [{"run_id": run_id, "memory_key": memory_key, "idx": i, "item": item} for i, item in enumerate(items)],
+            )
+
+    def _upsert_incremental(
+        self, row: AssistantRun, memory_items: Dict[str, List[Dict[str, Any]]], memory_offsets: Dict[str, int]
+    ) -> None:
+        with self.Session.begin() as sess:
+            self._migrate_memory_lists(session=sess, run_id=row.run_id)
+            for memory_key, items in memory_items.items():
+                offset = memory_offsets.get(memory_key, 0)
+                # Remove stored items which are being replaced, e.g. if the memory list was cleared
                 sess.execute(
-                    upsert_sql,
-                    {
-                        "run_id": row.run_id,
-                        "name": row.name,
-                        "run_name": row.run_name,
-                        "user_id": row.user_id,
-                        "llm": json.dumps(row.llm) if row.llm is not None else None,
-                        "memory": json.dumps(row.memory) if row.memory is not None else None,
-                        "assistant_data": json.dumps(row.assistant_data) if row.assistant_data is not None else None,
-                        "run_data": json.dumps(row.run_data) if row.run_data is not None else None,
-                        "user_data": json.dumps(row.user_data) if row.user_data is not None else None,
-                        "task_data": json.dumps(row.task_data) if row.task_data is not None else None,
-                    },
+                    self.memory_table.delete().where(
+                        self.memory_table.c.run_id == row.run_id,
+                        self.memory_table.c.memory_key == memory_key,
+                        self.memory_table.c.idx >= offset,
+                    )
                 )
-        return self.read(run_id=row.run_id)
+                if len(items) > 0:
+                    sess.execute(
+                        self.memory_table.insert(),
+                        [
+                            {"run_id": row.run_id, "memory_key": memory_key, "idx": offset + i, "item": item}
+                            for i, item in enumerate(items)
+                        ],
+                    )
+            sess.execute(self.get_upsert_sql(), self.get_upsert_params(row))
+
+    def upsert_incremental(
+        self, row: AssistantRun, memory_items: Dict[str, List[Dict[str, Any]]], memory_offsets: Dict[str, int]
+    ) -> Optional[AssistantRun]:
+        """
+        Upsert the run and append the new memory items in one transaction, without reading the run back.
+        """
+        try:
+            self._upsert_incremental(row=row, memory_items=memory_items, memory_offsets=memory_offsets)
+        except Exception:
+            # Create tables and try again
+            self.create()
+            self._upsert_incremental(row=row, memory_items=memory_items, memory_offsets=memory_offsets)
+        return row
 
     def delete(self) -> None:
         if self.table_exists():
             logger.info(f"Deleting table: {self.table_name}")
             self.table.drop(self.db_engine)
+        if self.incremental:
+            self.memory_table.drop(self.db_engine, checkfirst=True)
@@ -23,6 +23,13 @@ class Function(BaseModel):
     def to_dict(self) -> Dict[str, Any]:
         return self.model_dump(exclude_none=True, include={"name", "description", "parameters"})
 
+    @property
+    def is_async(self) -> bool:
+        """Returns True if the entrypoint is a coroutine function."""
+        from inspect import iscoroutinefunction
+
+        return self.entrypoint is not None and iscoroutinefunction(self.entrypoint)
+
     @classmethod
     def from_callable(cls, c: Callable) -> "Function":
         from inspect import getdoc
@@ -154,3 +161,30 @@ class FunctionCall(BaseModel):
             logger.exception(e)
             self.result = str(e)
             return False
+
+    async def aexecute(self) -> bool:
+        """Runs the function call, awaiting the result if the entrypoint is a coroutine function.
+
+        @return: True if the function call was successful, False otherwise.
+        """
+        from inspect import isawaitable
+
+        if self.function.entrypoint is None:
+            return False
+
+        logger.debug(f"Running: {self.get_call_str()}")
+
+        try:
+            if self.arguments is None:
+                result = self.function.entrypoint()
+            else:
+                result = self.function.entrypoint(**self.arguments)
+            if isawaitable(result):
+                result = await result
+            self.result = result
+            return True
+        except Exception as e:
+            logger.warning(f"Could not run function {self.get_call_str()}")
+            logger.exception(e)
+            self.result = str(e)
+            return False
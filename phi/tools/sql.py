@@ -9,13 +9,15 @@ except ImportError:
     raise ImportError("`simplejson` not installed")
 
 try:
-    from sqlalchemy import create_engine, Engine, Row
+    from sqlalchemy import Engine, Row
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.inspection import inspect
     from sqlalchemy.sql.expression import text
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
 
+from phi.utils.engine import get_engine
+
 
 class SQLTools(Toolkit):
     def __init__(
@@ -38,12 +40,12 @@ class SQLTools(Toolkit):
         # Get the database engine
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url)
         elif user and password and host and port and dialect:
             if schema is not None:
-                _engine = create_engine(f"{dialect}://{user}:{password}@{host}:{port}/{schema}")
+                _engine = get_engine(f"{dialect}://{user}:{password}@{host}:{port}/{schema}")
             else:
-                _engine = create_engine(f"{dialect}://{user}:{password}@{host}:{port}")
+                _engine = get_engine(f"{dialect}://{user}:{password}@{host}:{port}")
 
         if _engine is None:
             raise ValueError("Could not build the database connection")
@@ -1,4 +1,6 @@
-from typing import Any, List, Optional, Type
+from typing import Any, Iterable, Iterator, List, Optional, Type, TypeVar
+
+T = TypeVar("T")
 
 
 def isinstanceany(obj: Any, class_list: List[Type]) -> bool:
@@ -36,3 +38,15 @@ def is_empty(val: Any) -> bool:
 
 def get_image_str(repo: str, tag: str) -> str:
     return f"{repo}:{tag}"
+
+
+def batched(iterable: Iterable[T], batch_size: int) -> Iterator[List[T]]:
+    """Yields lists of at most batch_size items from iterable"""
+    batch: List[T] = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if len(batch) > 0:
+        yield batch
@@ -0,0 +1,161 @@
+from threading import Lock
+from typing import Optional, Dict, List, Any
+
+try:
+    from sqlalchemy import event
+    from sqlalchemy.engine import create_engine, make_url, Engine
+except ImportError:
+    raise ImportError("`sqlalchemy` not installed")
+
+from pydantic import BaseModel
+
+from phi.utils.log import logger
+
+
+class PoolConfig(BaseModel):
+    """Connection pool settings for the engines created by the EngineRegistry"""
+
+    # Number of connections kept open in the pool
+    pool_size: int = 5
+    # Number of connections opened above pool_size when the pool is exhausted, closed when returned
+    max_overflow: int = 10
+    # Seconds to wait for a connection before raising an error
+    pool_timeout: float = 30
+    # Check connections are alive before using them, so connections closed by the server are replaced
+    pool_pre_ping: bool = True
+    # Seconds after which a connection is replaced, -1 to keep connections open
+    pool_recycle: int = 1800
+
+
+class PoolMetrics(BaseModel):
+    """Connection usage of an engine's pool"""
+
+    # The database url, without the password
+    url: str
+    pool_size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    # Connections currently in the pool and in use
+    checked_in: Optional[int] = None
+    checked_out: int = 0
+    # The most connections in use at once
+    max_checked_out: int = 0
+    # Total number of connections opened and handed out
+    num_connects: int = 0
+    num_checkouts: int = 0
+
+
+class EngineRegistry:
+    """Shares one engine, and so one connection pool, per database url across the process.
+
+    The Postgres backed components (PgVector2, PgVector, PgAssistantStorage, PgMemoryDb and SQLTools)
+    get their engine from here when given a db_url, so an Assistant with knowledge, storage and memory
+    in the same database uses a single pool. Pass a db_engine to a component to use a separate pool.
+    """
+
+    def __init__(self, pool_config: Optional[PoolConfig] = None):
+        """
+        :param pool_config: The pool settings used for new engines, unless get_engine() is given its own.
+        """
+        self.pool_config: PoolConfig = pool_config or PoolConfig()
+
+        self._engines: Dict[str, Engine] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+        self._lock: Lock = Lock()
+
+    def get_engine(self, db_url: str, pool_config: Optional[PoolConfig] = None, **kwargs: Any) -> Engine:
+        """
+        Returns the engine for the db_url, creating it on first use.
+
+        :param db_url: The database url.
+        :param pool_config: The pool settings, only used when the engine is created.
+        :param kwargs: Other arguments for sqlalchemy.create_engine, only used when the engine is created.
+        """
+        url = make_url(db_url)
+        key = url.render_as_string(hide_password=False)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                if pool_config is not None:
+                    logger.debug(f"Using the existing engine for {url}, pool_config is ignored")
+                return engine
+
+            _pool_config = pool_config or self.pool_config
+            pool_kwargs: Dict[str, Any] = {}
+            # sqlite uses a pool per thread or a single connection to a local file,
+            # which are not sized and are not closed by a server, so the pool settings are skipped
+            if url.get_backend_name() != "sqlite":
+                pool_kwargs.update(
+                    pool_size=_pool_config.pool_size,
+                    max_overflow=_pool_config.max_overflow,
+                    pool_timeout=_pool_config.pool_timeout,
+                    pool_pre_ping=_pool_config.pool_pre_ping,
+                    pool_recycle=_pool_config.pool_recycle,
+                )
+            pool_kwargs.update(kwargs)
+
+            logger.debug(f"Creating engine for {url} with {pool_kwargs}")
+            engine = create_engine(db_url, **pool_kwargs)
+            self._metrics[key] = self._track(
+                engine,
+                PoolMetrics(
+                    url=str(url), pool_size=pool_kwargs.get("pool_size"), max_overflow=pool_kwargs.get("max_overflow")
+                ),
+            )
+            self._engines[key] = engine
+            return engine
+
+    def _track(self, engine: Engine, metrics: PoolMetrics) -> PoolMetrics:
+        """Updates the metrics from the pool events of the engine"""
+        lock = Lock()
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            with lock:
+                metrics.num_connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with lock:
+                metrics.num_checkouts += 1
+                metrics.checked_out += 1
+                metrics.max_checked_out = max(metrics.max_checked_out, metrics.checked_out)
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            with lock:
+                metrics.checked_out = max(metrics.checked_out - 1, 0)
+
+        return metrics
+
+    def get_metrics(self) -> List[PoolMetrics]:
+        """Returns the connection usage of each engine"""
+        with self._lock:
+            engines = [(engine, self._metrics[key].model_copy()) for key, engine in self._engines.items()]
+        all_metrics: List[PoolMetrics] = []
+        for engine, metrics in engines:
+            checkedin = getattr(engine.pool, "checkedin", None)
+            if callable(checkedin):
+                metrics.checked_in = checkedin()
+            all_metrics.append(metrics)
+        return all_metrics
+
+    def dispose(self, db_url: Optional[str] = None) -> None:
+        """Closes the pooled connections and removes the engine for the db_url, or all engines if None"""
+        with self._lock:
+            if db_url is None:
+                keys = list(self._engines.keys())
+            else:
+                keys = [make_url(db_url).render_as_string(hide_password=False)]
+            for key in keys:
+                engine = self._engines.pop(key, None)
+                self._metrics.pop(key, None)
+                if engine is not None:
+                    engine.dispose()
+
+
+engine_registry = EngineRegistry()
+
+
+def get_engine(db_url: str, pool_config: Optional[PoolConfig] = None, **kwargs: Any) -> Engine:
+    """Returns the shared engine for the db_url, see EngineRegistry.get_engine()"""
+    return engine_registry.get_engine(db_url, pool_config=pool_config, **kwargs)
@@ -0,0 +1,46 @@
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: Optional[str] = None) -> Optional[Any]:
+    """Returns the tiktoken encoding for the model, or None if tiktoken is not installed"""
+
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    if model is not None:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Return the number of tokens in the text.
+
+    Uses the tiktoken encoding for the model if tiktoken is installed,
+    otherwise estimates 4 characters per token.
+    """
+
+    if not text:
+        return 0
+
+    encoding = get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: Optional[str] = None) -> Callable[[str], int]:
+    """Returns a function counting the tokens in a text for the model.
+
+    The same function is returned for each model, so token counts can be cached per counter,
+    see Message.get_num_tokens()
+    """
+
+    return partial(count_tokens, model=model)
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Set, Dict, Any, Optional
 
 from phi.document import Document
 
@@ -15,6 +15,16 @@ class VectorDb(ABC):
     def doc_exists(self, document: Document) -> bool:
         raise NotImplementedError
 
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """Returns the content hashes which already exist in the vector db.
+        Vector dbs which can check many documents in one request should override this.
+        """
+        raise NotImplementedError
+
+    def delete_hashes(self, hashes: List[str]) -> None:
+        """Deletes the documents with these content hashes from the vector db"""
+        raise NotImplementedError
+
     @abstractmethod
     def name_exists(self, name: str) -> bool:
         raise NotImplementedError
@@ -31,9 +41,44 @@ class VectorDb(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
+        """Returns the documents most similar to the query.
+
+        filters restricts the search to documents whose meta_data has these values, e.g. {"user_id": "u1"}.
+        A document matches if meta_data[key] == value for every key. Vector dbs apply the filters in the
+        database, before the limit, so filtered searches still return up to limit documents.
+
+        Stored embeddings are only read from the vector db if include_embedding is True.
+        If include_score is True, document.score is set to the score returned by the vector db, e.g. the distance
+        to the query, where lower is better, or a similarity, where higher is better.
+        """
         raise NotImplementedError
 
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the documents most similar to each query, in the order of the queries. See search().
+        Vector dbs which can embed and search many queries in one request should override this.
+        """
+        return [
+            self.search(
+                query, limit=limit, filters=filters, include_embedding=include_embedding, include_score=include_score
+            )
+            for query in queries
+        ]
+
     @abstractmethod
     def delete(self) -> None:
         raise NotImplementedError
@@ -1,10 +1,12 @@
+from datetime import timedelta
 from hashlib import md5
-from typing import List, Optional
+from typing import List, Optional, Set, Dict, Any, Union, Iterator, Literal, cast
 import json
 
 try:
     import lancedb
     import pyarrow as pa
+    from lancedb.query import LanceVectorQueryBuilder
 except ImportError:
     raise ImportError("`lancedb` not installed.")
 
@@ -25,8 +27,19 @@ class LanceDb(VectorDb):
         uri: Optional[str] = "/tmp/lancedb",
         table_name: Optional[str] = "phi",
         nprobes: Optional[int] = 20,
+        index_min_rows: int = 256,
+        num_partitions: Optional[int] = None,
+        num_sub_vectors: Optional[int] = None,
+        cleanup_older_than: Optional[timedelta] = None,
         **kwargs,
     ):
+        """
+        :param index_min_rows: optimize() creates the IVF-PQ index once the table has this many rows.
+            Training the PQ codebook needs at least 256 rows.
+        :param num_partitions: The number of IVF partitions, defaults to the lancedb default for the table size.
+        :param num_sub_vectors: The number of PQ sub-vectors, defaults to the lancedb default for the dimensions.
+        :param cleanup_older_than: optimize() removes table versions older than this, defaults to 7 days.
+        """
         # Embedder for embedding the document contents
         self.embedder: Embedder = embedder
         self.dimensions: int = self.embedder.dimensions
@@ -39,16 +52,24 @@ class LanceDb(VectorDb):
         self.client = lancedb.connect(self.uri)
         self.nprobes = nprobes
 
+        # Index and table maintenance, see optimize()
+        self.index_min_rows: int = index_min_rows
+        self.num_partitions: Optional[int] = num_partitions
+        self.num_sub_vectors: Optional[int] = num_sub_vectors
+        self.cleanup_older_than: Optional[timedelta] = cleanup_older_than
+
         if connection:
             if not isinstance(connection, lancedb.db.LanceTable):
                 raise ValueError(
                     "connection should be an instance of lancedb.db.LanceTable, ",
                     f"got {type(connection)}",
                 )
-            self.connection = connection
+            self.connection: lancedb.table.Table = connection
             self.table_name = self.connection.name
             self._vector_col = self.connection.schema.names[0]
-            self._id = self.tbl.schema.names[1]  # type: ignore
+            self._id = self.connection.schema.names[1]
+            if self.is_legacy_table():
+                self.migrate()
 
         else:
             self.table_name = table_name
@@ -57,30 +78,78 @@ class LanceDb(VectorDb):
         # Lancedb kwargs
         self.kwargs = kwargs
 
-    def create(self) -> lancedb.db.LanceTable:
-        return self._init_table()
+    def create(self) -> lancedb.table.Table:
+        self.connection = self._init_table()
+        return self.connection
 
-    def _init_table(self) -> lancedb.db.LanceTable:
-        self._id = "id"
-        self._vector_col = "vector"
-        schema = pa.schema(
+    def get_schema(self, dimensions: int) -> pa.Schema:
+        return pa.schema(
             [
-                pa.field(
-                    self._vector_col,
-                    pa.list_(
-                        pa.float32(),
-                        len(self.embedder.get_embedding("test")),  # type: ignore
-                    ),
-                ),
+                pa.field(self._vector_col, pa.list_(pa.float32(), dimensions)),
                 pa.field(self._id, pa.string()),
-                pa.field("payload", pa.string()),
+                pa.field("name", pa.string()),
+                # meta_data and usage have no fixed fields, so they are stored as json strings
+                pa.field("meta_data", pa.string()),
+                pa.field("content", pa.string()),
+                pa.field("usage", pa.string()),
             ]
         )
 
+    def _init_table(self) -> lancedb.table.Table:
+        self._id = "id"
+        self._vector_col = "vector"
+
+        if self.table_name in self.client.table_names():
+            logger.debug(f"Opening table: {self.table_name}")
+            self.connection = self.client.open_table(self.table_name)
+            if self.is_legacy_table():
+                self.migrate()
+            return self.connection
+
+        schema = self.get_schema(len(self.embedder.get_embedding("test")))  # type: ignore
         logger.info(f"Creating table: {self.table_name}")
         tbl = self.client.create_table(self.table_name, schema=schema, mode="overwrite")
         return tbl
 
+    def is_legacy_table(self) -> bool:
+        """Returns True if the table stores the documents in a single json payload column"""
+        names = self.connection.schema.names
+        return "payload" in names and "content" not in names
+
+    def migrate(self, batch_size: int = 10000) -> None:
+        """
+        Migrates a table which stores the documents in a json payload column to one column per field.
+        The table is rewritten in place, keeping the ids and vectors.
+        """
+        logger.info(f"Migrating table to native columns: {self.table_name}")
+        vector_field = self.connection.schema.field(self._vector_col)
+        schema = self.get_schema(vector_field.type.list_size)
+
+        # Stream the legacy table in batches, so it is never loaded in memory at once.
+        # The table is read at its current version, so the batches are not affected by the overwrite.
+        legacy_batches = self.connection.search().limit(None).to_batches(batch_size)
+
+        def migrated_batches() -> Iterator[pa.RecordBatch]:
+            for batch in legacy_batches:
+                payloads = [json.loads(payload) for payload in batch.column("payload").to_pylist()]
+                columns = {
+                    self._vector_col: batch.column(self._vector_col),
+                    self._id: batch.column(self._id),
+                    "name": [payload.get("name") for payload in payloads],
+                    "meta_data": [json.dumps(payload.get("meta_data")) for payload in payloads],
+                    "content": [payload.get("content") for payload in payloads],
+                    "usage": [json.dumps(payload.get("usage")) for payload in payloads],
+                }
+                yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+        self.connection = self.client.create_table(
+            self.table_name,
+            data=pa.RecordBatchReader.from_batches(schema, migrated_batches()),
+            schema=schema,
+            mode="overwrite",
+        )
+        logger.info(f"Migrated {self.connection.count_rows()} documents")
+
     def doc_exists(self, document: Document) -> bool:
         """
         Validating if the document exists or not
@@ -95,83 +164,271 @@ class LanceDb(VectorDb):
             return len(result) > 0
         return False
 
+    def existing_hashes(self, hashes: List[str], batch_size: int = 1000) -> Set[str]:
+        """
+        Returns the content hashes which already exist in the table.
+        Rows are stored with the content hash as id.
+
+        Args:
+            hashes (List[str]): Content hashes to check
+            batch_size (int): Number of hashes to check per query
+        """
+        existing: Set[str] = set()
+        if self.client:
+            for i in range(0, len(hashes), batch_size):
+                batch = hashes[i : i + batch_size]
+                ids = ", ".join(f"'{doc_id}'" for doc_id in batch)
+                result = self.connection.search().where(f"{self._id} IN ({ids})").limit(len(batch)).to_arrow()
+                existing.update(result[self._id].to_pylist())
+        return existing
+
+    def delete_hashes(self, hashes: List[str], batch_size: int = 1000) -> None:
+        """
+        Deletes the rows with these content hashes as id
+
+        Args:
+            hashes (List[str]): Content hashes to delete
+            batch_size (int): Number of rows to delete per query
+        """
+        for i in range(0, len(hashes), batch_size):
+            ids = ", ".join(f"'{doc_id}'" for doc_id in hashes[i : i + batch_size])
+            self.connection.delete(f"{self._id} IN ({ids})")
+        logger.debug(f"Deleted {len(hashes)} documents")
+
+    def get_rows(self, documents: List[Document]) -> pa.Table:
+        """Returns the documents as an arrow table, built column by column. Documents must already be embedded"""
+        contents = [document.content.replace("\x00", "\ufffd") for document in documents]
+        return pa.Table.from_pydict(
+            {
+                self._vector_col: [document.embedding for document in documents],
+                self._id: [md5(content.encode()).hexdigest() for content in contents],
+                "name": [document.name for document in documents],
+                "meta_data": [json.dumps(document.meta_data) for document in documents],
+                "content": contents,
+                "usage": [json.dumps(document.usage) for document in documents],
+            },
+            schema=self.connection.schema,
+        )
+
     def insert(self, documents: List[Document]) -> None:
         logger.debug(f"Inserting {len(documents)} documents")
-        data = []
-        for document in documents:
-            document.embed(embedder=self.embedder)
-            cleaned_content = document.content.replace("\x00", "\ufffd")
-            doc_id = str(md5(cleaned_content.encode()).hexdigest())
-            payload = {
-                "name": document.name,
-                "meta_data": document.meta_data,
-                "content": cleaned_content,
-                "usage": document.usage,
-            }
-            data.append(
-                {
-                    "id": doc_id,
-                    "vector": document.embedding,
-                    "payload": json.dumps(payload),
-                }
-            )
-            logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
+        Document.embed_documents(documents, embedder=self.embedder)
+        rows = self.get_rows(documents)
+        self.connection.add(rows)
+        logger.debug(f"Inserted {rows.num_rows} documents")
 
-        self.connection.add(data)
-        logger.debug(f"Upsert {len(data)} documents")
+    def upsert_available(self) -> bool:
+        return True
 
     def upsert(self, documents: List[Document]) -> None:
         """
-        Upsert documents into the database.
+        Upsert documents into the database using a merge insert on the id, which is the content hash.
 
         Args:
             documents (List[Document]): List of documents to upsert
         """
-        logger.debug("Redirecting the request to insert")
-        self.insert(documents)
+        logger.debug(f"Upserting {len(documents)} documents")
+        Document.embed_documents(documents, embedder=self.embedder)
+        # A merge insert can only match each row once, so keep the last document for each id
+        documents_by_id = {
+            md5(document.content.replace("\x00", "\ufffd").encode()).hexdigest(): document for document in documents
+        }
+        rows = self.get_rows(list(documents_by_id.values()))
+        self.connection.merge_insert(self._id).when_matched_update_all().when_not_matched_insert_all().execute(rows)
+        logger.debug(f"Upserted {rows.num_rows} documents")
+
+    def get_metric(self) -> Literal["l2", "cosine", "dot"]:
+        if self.distance == Distance.l2:
+            return "l2"
+        if self.distance == Distance.max_inner_product:
+            return "dot"
+        return "cosine"
+
+    def get_where(self, filters: Dict[str, Any]) -> str:
+        """
+        Returns a where clause matching the filters against the json meta_data column.
+        The clause can match more rows than the filters, e.g. a nested value, so results are checked again
+        with matches_filters().
+        """
+        clauses = []
+        for key, value in filters.items():
+            # The "key": value pair as it is written by json.dumps in get_rows()
+            pair = json.dumps({key: value})[1:-1]
+            # Escape the LIKE wildcards in the pair, and the quotes of the sql string
+            pattern = pair.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("'", "''")
+            clauses.append(f"meta_data LIKE '%{pattern}%' ESCAPE '\\'")
+        return " AND ".join(clauses)
+
+    def matches_filters(self, meta_data: Optional[Dict[str, Any]], filters: Dict[str, Any]) -> bool:
+        if meta_data is None:
+            return False
+        return all(key in meta_data and meta_data[key] == value for key, value in filters.items())
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
-        results = (
+        return self.query_documents(
+            [query_embedding],
+            limit=limit,
+            filters=filters,
+            include_embedding=include_embedding,
+            include_score=include_score,
+        )[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the documents most similar to each query, using one embedding request and one multi-vector query"""
+        if len(queries) == 0:
+            return []
+
+        embeddings, _ = self.embedder.get_embeddings_and_usage(queries)
+        query_indexes: List[int] = []
+        query_embeddings: List[List[float]] = []
+        for i, (query, embedding) in enumerate(zip(queries, embeddings)):
+            if not embedding:
+                logger.error(f"Error getting embedding for Query: {query}")
+                continue
+            query_indexes.append(i)
+            query_embeddings.append(embedding)
+
+        search_results: List[List[Document]] = [[] for _ in queries]
+        if len(query_embeddings) == 0:
+            return search_results
+
+        documents = self.query_documents(
+            query_embeddings,
+            limit=limit,
+            filters=filters,
+            include_embedding=include_embedding,
+            include_score=include_score,
+        )
+        for query_index, query_documents in zip(query_indexes, documents):
+            search_results[query_index] = query_documents
+        return search_results
+
+    def query_documents(
+        self,
+        query_embeddings: List[List[float]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """
+        Returns the documents nearest to each query embedding, using one multi-vector query.
+        The where clause of filtered queries can match more rows than the filters, so more rows are fetched
+        until limit documents of each query match the filters, or all the rows matching the where clause are fetched.
+        """
+        fetch_limit = limit
+        while True:
+            results = self.query(
+                query_embeddings, limit=fetch_limit, filters=filters, include_embedding=include_embedding
+            )
+            # Results have a query_index column with the position of the query embedding
+            if "query_index" in results.schema.names:
+                positions = results.column("query_index").to_pylist()
+            else:
+                positions = [0] * results.num_rows
+
+            documents: List[List[Document]] = []
+            complete = True
+            for position in range(len(query_embeddings)):
+                mask = [p == position for p in positions]
+                query_documents = self.get_search_results(
+                    results.filter(pa.array(mask)),
+                    filters=filters,
+                    include_embedding=include_embedding,
+                    include_score=include_score,
+                )
+                if len(query_documents) < limit and sum(mask) >= fetch_limit:
+                    complete = False
+                documents.append(query_documents[:limit])
+            if not filters or complete:
+                return documents
+            fetch_limit *= 2
+            logger.debug(f"Fetching {fetch_limit} rows per query to find {limit} documents matching the filters")
+
+    def query(
+        self,
+        query_embedding: Union[List[float], List[List[float]]],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+    ) -> pa.Table:
+        """Runs a vector query, for one embedding or a list of embeddings, and returns the results as an arrow table"""
+        # Searching with a query vector returns a vector query builder
+        vector_query = cast(
+            LanceVectorQueryBuilder,
             self.connection.search(
                 query=query_embedding,
                 vector_column_name=self._vector_col,
-            )
-            .limit(limit)
-            .nprobes(self.nprobes)
-            .to_pandas()
+            ),
         )
+        results = vector_query.metric(self.get_metric()).nprobes(self.nprobes)
+        if filters:
+            results = results.where(self.get_where(filters), prefilter=True)
+        # The distance is computed by the search anyway, so it is always selected
+        columns = ["name", "meta_data", "content", "usage", "_distance"]
+        if include_embedding:
+            columns.append(self._vector_col)
+        return results.select(columns).limit(limit).to_arrow()
 
-        # Build search results
-        search_results: List[Document] = []
+    def get_search_results(
+        self,
+        results: pa.Table,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
+        # Build search results, decoding the arrow columns at once instead of row by row
+        names = results.column("name").to_pylist()
+        meta_datas = [json.loads(meta_data) for meta_data in results.column("meta_data").to_pylist()]
+        contents = results.column("content").to_pylist()
+        usages = [json.loads(usage) for usage in results.column("usage").to_pylist()]
+        num_results = results.num_rows
+        embeddings = results.column(self._vector_col).to_pylist() if include_embedding else [None] * num_results
+        scores = results.column("_distance").to_pylist() if include_score else [None] * num_results
 
-        try:
-            for _, item in results.iterrows():
-                payload = json.loads(item["payload"])
-                search_results.append(
-                    Document(
-                        name=payload["name"],
-                        meta_data=payload["meta_data"],
-                        content=payload["content"],
-                        embedder=self.embedder,
-                        embedding=item["vector"],
-                        usage=payload["usage"],
-                    )
+        search_results: List[Document] = []
+        for name, meta_data, content, usage, embedding, score in zip(
+            names, meta_datas, contents, usages, embeddings, scores
+        ):
+            if filters and not self.matches_filters(meta_data, filters):
+                continue
+            search_results.append(
+                Document.from_search_result(
+                    name=name,
+                    meta_data=meta_data,
+                    content=content,
+                    embedder=self.embedder,
+                    embedding=embedding,
+                    usage=usage,
+                    score=score,
                 )
-
-        except Exception as e:
-            logger.error(f"Error building search results: {e}")
+            )
 
         return search_results
 
     def delete(self) -> None:
         if self.exists():
             logger.debug(f"Deleting collection: {self.table_name}")
-            self.client.drop(self.table_name)
+            self.client.drop_table(self.table_name)
 
     def exists(self) -> bool:
         if self.client:
@@ -181,14 +438,41 @@ class LanceDb(VectorDb):
 
     def get_count(self) -> int:
         if self.exists():
-            return self.client.table(self.table_name).count_rows()
+            return self.connection.count_rows()
         return 0
 
+    def index_exists(self) -> bool:
+        return any(self._vector_col in index.columns for index in self.connection.list_indices())
+
     def optimize(self) -> None:
-        pass
+        """
+        Creates the IVF-PQ index once the table is large enough, then compacts the table files,
+        adds new rows to the index and removes old table versions.
+        """
+        logger.debug("==== Optimizing Vector DB ====")
+        num_rows = self.get_count()
+        if num_rows >= self.index_min_rows and not self.index_exists():
+            logger.debug(f"Creating IVF-PQ index on {num_rows} rows with metric: {self.get_metric()}")
+            self.connection.create_index(
+                metric=self.get_metric(),
+                num_partitions=self.num_partitions,
+                num_sub_vectors=self.num_sub_vectors,
+                vector_column_name=self._vector_col,
+            )
+
+        self.connection.optimize(cleanup_older_than=self.cleanup_older_than)
+        logger.debug("==== Optimized Vector DB ====")
 
     def clear(self) -> bool:
-        return False
+        self.connection.delete("true")
+        return True
 
     def name_exists(self, name: str) -> bool:
-        raise NotImplementedError
+        """
+        Validate if a row with this name exists or not
+
+        Args:
+            name (str): Name to check
+        """
+        escaped_name = name.replace("'", "''")
+        return self.connection.count_rows(f"name = '{escaped_name}'") > 0
@@ -0,0 +1,497 @@
+import json
+import os
+from collections import Counter
+from hashlib import md5
+from pathlib import Path
+from threading import RLock
+from typing import Optional, List, Set, Dict, Any, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("`numpy` not installed")
+
+from phi.document import Document
+from phi.embedder import Embedder
+from phi.vectordb.base import VectorDb
+from phi.vectordb.distance import Distance
+from phi.utils.log import logger
+
+
+class NumpyDb(VectorDb):
+    """In-process vector db which keeps the embeddings in a contiguous float32 NumPy matrix.
+
+    Searches are exact by default. Set hnsw_min_rows to build an approximate HNSW index using `hnswlib`
+    in optimize() once the collection is large enough.
+    If a path is provided the collection is persisted to it, and the embeddings are memory-mapped from disk.
+    """
+
+    vectors_file = "vectors.f32"
+    documents_file = "documents.jsonl"
+    hnsw_file = "hnsw.bin"
+
+    def __init__(
+        self,
+        embedder: Optional[Embedder] = None,
+        distance: Distance = Distance.cosine,
+        path: Optional[Union[str, Path]] = None,
+        hnsw_min_rows: Optional[int] = None,
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_search: int = 64,
+    ):
+        """
+        :param path: Directory to persist the collection to. None to keep the collection in memory only.
+        :param hnsw_min_rows: optimize() builds the HNSW index once the collection has this many rows.
+            None to always search exactly.
+        :param hnsw_m: The number of links per node in the HNSW graph.
+        :param hnsw_ef_construction: The size of the candidate list when building the HNSW graph.
+        :param hnsw_ef_search: The size of the candidate list when searching the HNSW graph, at least the limit.
+        """
+        # Embedder for embedding the document contents
+        _embedder = embedder
+        if _embedder is None:
+            from phi.embedder.openai import OpenAIEmbedder
+
+            _embedder = OpenAIEmbedder()
+        self.embedder: Embedder = _embedder
+        self.dimensions: int = self.embedder.dimensions
+
+        # Distance metric
+        self.distance: Distance = distance
+
+        # Directory the collection is persisted to
+        self.path: Optional[Path] = Path(path) if path is not None else None
+
+        # HNSW index
+        self.hnsw_min_rows: Optional[int] = hnsw_min_rows
+        self.hnsw_m: int = hnsw_m
+        self.hnsw_ef_construction: int = hnsw_ef_construction
+        self.hnsw_ef_search: int = hnsw_ef_search
+
+        # Embeddings, row i of the matrix is the embedding of document i.
+        # In memory the matrix has spare capacity for appends, on disk it is a read-only memory map of the vectors file.
+        self._matrix: np.ndarray = np.empty((0, self.dimensions), dtype=np.float32)
+        self._count: int = 0
+        # Norms of the embeddings, used by the cosine and l2 distances
+        self._norms: np.ndarray = np.empty(0, dtype=np.float32)
+        # Documents, without their embeddings
+        self._documents: List[Dict[str, Any]] = []
+        self._id_index: Dict[str, int] = {}
+        self._hash_counts: Counter = Counter()
+        # hnswlib index, with the row numbers as labels
+        self._hnsw: Optional[Any] = None
+        self._lock: RLock = RLock()
+
+        if self.path is not None and self.exists():
+            self.load()
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[: self._count]
+
+    # -*- Persistence
+    def create(self) -> None:
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for file_name in (self.vectors_file, self.documents_file):
+                (self.path / file_name).touch(exist_ok=True)
+
+    def exists(self) -> bool:
+        if self.path is None:
+            return True
+        return (self.path / self.vectors_file).exists() and (self.path / self.documents_file).exists()
+
+    def load(self) -> None:
+        """Loads the collection from the path, memory-mapping the embeddings"""
+        if self.path is None:
+            return
+
+        with self._lock:
+            with open(self.path / self.documents_file, "r") as f:
+                documents = [json.loads(line) for line in f if line.strip()]
+            num_vectors = os.path.getsize(self.path / self.vectors_file) // (4 * self.dimensions)
+            if num_vectors != len(documents):
+                logger.warning(
+                    f"Found {num_vectors} vectors and {len(documents)} documents in {self.path}, "
+                    "keeping the rows which have both"
+                )
+            self._set_documents(documents[: min(num_vectors, len(documents))])
+            self._map_vectors()
+            self._norms = np.linalg.norm(self.vectors, axis=1).astype(np.float32)
+
+            hnsw_path = self.path / self.hnsw_file
+            if hnsw_path.exists():
+                hnsw = self._new_hnsw_index()
+                hnsw.load_index(str(hnsw_path), max_elements=max(self._count, 1))
+                if hnsw.get_current_count() == self._count:
+                    self._hnsw = hnsw
+                else:
+                    logger.debug("HNSW index is out of date, it will be rebuilt by optimize()")
+        logger.debug(f"Loaded {self._count} documents from {self.path}")
+
+    def _set_documents(self, documents: List[Dict[str, Any]]) -> None:
+        self._documents = documents
+        self._count = len(documents)
+        self._id_index = {document["id"]: i for i, document in enumerate(documents)}
+        self._hash_counts = Counter(document["content_hash"] for document in documents)
+
+    def _map_vectors(self) -> None:
+        """Memory-maps the vectors file. numpy can not map an empty file, so an empty matrix is used instead"""
+        if self.path is None:
+            return
+        if self._count == 0:
+            self._matrix = np.empty((0, self.dimensions), dtype=np.float32)
+        else:
+            self._matrix = np.memmap(
+                self.path / self.vectors_file, dtype=np.float32, mode="r", shape=(self._count, self.dimensions)
+            )
+
+    def _write_all(self, vectors: np.ndarray) -> None:
+        """Rewrites the vectors and documents files, replacing them atomically"""
+        if self.path is None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        vectors_path = self.path / self.vectors_file
+        tmp_vectors_path = vectors_path.with_suffix(".tmp")
+        with open(tmp_vectors_path, "wb") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        # Drop the memory map before replacing the file it maps
+        self._matrix = np.empty((0, self.dimensions), dtype=np.float32)
+        os.replace(tmp_vectors_path, vectors_path)
+        self._write_documents()
+        self._map_vectors()
+
+    def _write_documents(self) -> None:
+        """Rewrites the documents file, replacing it atomically"""
+        if self.path is None:
+            return
+        documents_path = self.path / self.documents_file
+        tmp_documents_path = documents_path.with_suffix(".tmp")
+        with open(tmp_documents_path, "w") as f:
+            for document in self._documents:
+                f.write(json.dumps(document) + "\n")
+        os.replace(tmp_documents_path, documents_path)
+
+    # -*- Rows
+    def _append(self, vectors: np.ndarray, documents: List[Dict[str, Any]]) -> None:
+        if self.path is not None:
+            # Append to the files, then map the longer vectors file
+            self.create()
+            with open(self.path / self.vectors_file, "ab") as f:
+                f.write(vectors.tobytes())
+            with open(self.path / self.documents_file, "a") as f:
+                for document in documents:
+                    f.write(json.dumps(document) + "\n")
+        else:
+            # Grow the matrix by doubling, so appends are amortized O(1) per row
+            required = self._count + len(vectors)
+            if required > self._matrix.shape[0]:
+                capacity = max(required, 2 * self._matrix.shape[0], 1024)
+                matrix = np.empty((capacity, self.dimensions), dtype=np.float32)
+                matrix[: self._count] = self.vectors
+                self._matrix = matrix
+            self._matrix[self._count : required] = vectors
+
+        start = self._count
+        for i, document in enumerate(documents):
+            self._id_index[document["id"]] = start + i
+            self._hash_counts[document["content_hash"]] += 1
+        self._documents.extend(documents)
+        self._count += len(documents)
+        self._map_vectors()
+        self._norms = np.concatenate([self._norms, np.linalg.norm(vectors, axis=1).astype(np.float32)])
+
+        if self._hnsw is not None:
+            self._hnsw.resize_index(max(self._count, self._hnsw.get_max_elements()))
+            self._hnsw.add_items(vectors, np.arange(start, self._count))
+
+    def _update(self, rows: List[int], vectors: np.ndarray, documents: List[Dict[str, Any]]) -> None:
+        for row, document in zip(rows, documents):
+            self._hash_counts[self._documents[row]["content_hash"]] -= 1
+            self._hash_counts[document["content_hash"]] += 1
+            self._documents[row] = document
+        self._hash_counts += Counter()  # Remove zero counts
+
+        if self.path is not None:
+            # Write the updated rows in place in the vectors file, which the read-only memory map shares
+            vectors_file = np.memmap(
+                self.path / self.vectors_file, dtype=np.float32, mode="r+", shape=(self._count, self.dimensions)
+            )
+            vectors_file[rows] = vectors
+            vectors_file.flush()
+            del vectors_file
+            self._write_documents()
+        else:
+            self._matrix[rows] = vectors
+        self._norms[rows] = np.linalg.norm(vectors, axis=1)
+
+        if self._hnsw is not None:
+            self._hnsw.add_items(vectors, np.array(rows))
+
+    def _delete_rows(self, rows: Set[int]) -> None:
+        if len(rows) == 0:
+            return
+        keep = np.array([i not in rows for i in range(self._count)], dtype=bool)
+        vectors = self.vectors[keep]
+        self._set_documents([document for i, document in enumerate(self._documents) if i not in rows])
+        self._norms = self._norms[keep]
+        if self.path is not None:
+            self._write_all(vectors)
+        else:
+            self._matrix = np.ascontiguousarray(vectors)
+        # The rows were renumbered, so the HNSW index is rebuilt by the next optimize()
+        self._drop_hnsw()
+
+    def get_row(self, document: Document) -> Dict[str, Any]:
+        """Returns the stored fields of a document"""
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        content_hash = md5(cleaned_content.encode()).hexdigest()
+        return dict(
+            id=document.id or content_hash,
+            name=document.name,
+            meta_data=document.meta_data,
+            content=cleaned_content,
+            usage=document.usage,
+            content_hash=content_hash,
+        )
+
+    def _write(self, documents: List[Document], update: bool) -> None:
+        Document.embed_documents(documents, embedder=self.embedder)
+        with self._lock:
+            rows_by_id: Dict[str, Tuple[Dict[str, Any], List[float]]] = {}
+            for document in documents:
+                row = self.get_row(document)
+                rows_by_id[row["id"]] = (row, document.embedding)  # type: ignore
+
+            new_rows = [(row, embedding) for id, (row, embedding) in rows_by_id.items() if id not in self._id_index]
+            if update:
+                updated_rows = [(row, embedding) for id, (row, embedding) in rows_by_id.items() if id in self._id_index]
+                if len(updated_rows) > 0:
+                    self._update(
+                        [self._id_index[row["id"]] for row, _ in updated_rows],
+                        np.array([embedding for _, embedding in updated_rows], dtype=np.float32),
+                        [row for row, _ in updated_rows],
+                    )
+            if len(new_rows) > 0:
+                self._append(
+                    np.array([embedding for _, embedding in new_rows], dtype=np.float32),
+                    [row for row, _ in new_rows],
+                )
+        logger.debug(f"Wrote {len(rows_by_id)} documents")
+
+    # -*- VectorDb
+    def doc_exists(self, document: Document) -> bool:
+        return self.get_row(document)["content_hash"] in self._hash_counts
+
+    def existing_hashes(self, hashes: List[str]) -> Set[str]:
+        return {content_hash for content_hash in hashes if content_hash in self._hash_counts}
+
+    def delete_hashes(self, hashes: List[str]) -> None:
+        hashes_to_delete = set(hashes)
+        with self._lock:
+            self._delete_rows(
+                {i for i, document in enumerate(self._documents) if document["content_hash"] in hashes_to_delete}
+            )
+        logger.debug(f"Deleted documents with {len(hashes)} content hashes")
+
+    def name_exists(self, name: str) -> bool:
+        return any(document["name"] == name for document in self._documents)
+
+    def id_exists(self, id: str) -> bool:
+        return id in self._id_index
+
+    def insert(self, documents: List[Document]) -> None:
+        """Inserts the documents, skipping documents whose id already exists"""
+        self._write(documents, update=False)
+
+    def upsert_available(self) -> bool:
+        return True
+
+    def upsert(self, documents: List[Document]) -> None:
+        """Inserts new documents and replaces the documents whose id already exists"""
+        self._write(documents, update=True)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
+        """
+        Returns the documents most similar to the query, see VectorDb.search().
+        The score is the distance to the query: 1 - cosine similarity, the l2 distance or the negative inner product.
+        """
+        return self.search_batch(
+            [query], limit=limit, filters=filters, include_embedding=include_embedding, include_score=include_score
+        )[0]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the documents most similar to each query, computing the distances of all the queries at once"""
+        if len(queries) == 0:
+            return []
+
+        embeddings, _ = self.embedder.get_embeddings_and_usage(queries)
+        search_results: List[List[Document]] = [[] for _ in queries]
+        query_indexes = [i for i, embedding in enumerate(embeddings) if embedding]
+        for i in set(range(len(queries))) - set(query_indexes):
+            logger.error(f"Error getting embedding for Query: {queries[i]}")
+        if len(query_indexes) == 0:
+            return search_results
+
+        query_vectors = np.array([embeddings[i] for i in query_indexes], dtype=np.float32)
+        with self._lock:
+            for i, (rows, distances) in zip(query_indexes, self.search_vectors(query_vectors, limit, filters)):
+                search_results[i] = [
+                    self.get_search_result(row, distance, include_embedding, include_score)
+                    for row, distance in zip(rows, distances)
+                ]
+        return search_results
+
+    def search_vectors(
+        self, query_vectors: np.ndarray, limit: int, filters: Optional[Dict[str, Any]] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Returns the rows nearest to each query vector and their distances, nearest first"""
+        if self._count == 0 or limit <= 0:
+            return [(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)) for _ in query_vectors]
+
+        # Filtered searches are exact, over the matching rows only
+        if filters:
+            candidates = np.array(
+                [i for i, document in enumerate(self._documents) if self.matches_filters(document, filters)],
+                dtype=np.int64,
+            )
+            if len(candidates) == 0:
+                return [(candidates, np.empty(0, dtype=np.float32)) for _ in query_vectors]
+            distances = self.get_distances(self.vectors[candidates], self._norms[candidates], query_vectors)
+            return [(candidates[rows], d) for rows, d in self.get_top_k(distances, limit)]
+
+        if self._hnsw is not None:
+            k = min(limit, self._count)
+            self._hnsw.set_ef(max(self.hnsw_ef_search, k))
+            labels, distances = self._hnsw.knn_query(query_vectors, k=k)
+            return [
+                (labels[i].astype(np.int64), self.from_hnsw_distances(distances[i])) for i in range(len(query_vectors))
+            ]
+
+        distances = self.get_distances(self.vectors, self._norms, query_vectors)
+        return self.get_top_k(distances, limit)
+
+    def get_distances(self, vectors: np.ndarray, norms: np.ndarray, query_vectors: np.ndarray) -> np.ndarray:
+        """Returns the (num_queries, num_vectors) matrix of distances, using one matrix multiplication"""
+        dot_products = query_vectors @ vectors.T
+        if self.distance == Distance.max_inner_product:
+            return -dot_products
+        query_norms = np.linalg.norm(query_vectors, axis=1)[:, np.newaxis]
+        if self.distance == Distance.l2:
+            squared = query_norms**2 - 2 * dot_products + norms[np.newaxis, :] ** 2
+            return np.sqrt(np.maximum(squared, 0))
+        return 1 - dot_products / np.maximum(query_norms * norms[np.newaxis, :], np.finfo(np.float32).tiny)
+
+    def get_top_k(self, distances: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Returns the k smallest distances in each row of the matrix, using argpartition instead of a full sort"""
+        k = min(k, distances.shape[1])
+        if k < distances.shape[1]:
+            top_k = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top_k = np.broadcast_to(np.arange(distances.shape[1]), distances.shape)
+        results: List[Tuple[np.ndarray, np.ndarray]] = []
+        for query_distances, rows in zip(distances, top_k):
+            order = np.argsort(query_distances[rows], kind="stable")
+            results.append((rows[order], query_distances[rows[order]]))
+        return results
+
+    def matches_filters(self, document: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+        meta_data = document.get("meta_data") or {}
+        return all(key in meta_data and meta_data[key] == value for key, value in filters.items())
+
+    def get_search_result(
+        self, row: int, distance: float, include_embedding: bool = False, include_score: bool = False
+    ) -> Document:
+        document = self._documents[row]
+        return Document.from_search_result(
+            id=document["id"],
+            name=document["name"],
+            meta_data=document["meta_data"],
+            content=document["content"],
+            embedder=self.embedder,
+            embedding=self.vectors[row].tolist() if include_embedding else None,
+            usage=document["usage"],
+            score=float(distance) if include_score else None,
+        )
+
+    # -*- HNSW index
+    def get_hnsw_space(self) -> str:
+        if self.distance == Distance.l2:
+            return "l2"
+        if self.distance == Distance.max_inner_product:
+            return "ip"
+        return "cosine"
+
+    def from_hnsw_distances(self, distances: np.ndarray) -> np.ndarray:
+        """Converts hnswlib distances to the distances returned by exact search"""
+        if self.distance == Distance.l2:
+            # hnswlib returns the squared l2 distance
+            return np.sqrt(distances)
+        if self.distance == Distance.max_inner_product:
+            # hnswlib returns 1 - inner product
+            return distances - 1
+        return distances
+
+    def _new_hnsw_index(self) -> Any:
+        try:
+            import hnswlib
+        except ImportError:
+            raise ImportError("`hnswlib` not installed")
+
+        return hnswlib.Index(space=self.get_hnsw_space(), dim=self.dimensions)
+
+    def _drop_hnsw(self) -> None:
+        self._hnsw = None
+        if self.path is not None and (self.path / self.hnsw_file).exists():
+            (self.path / self.hnsw_file).unlink()
+
+    def optimize(self) -> None:
+        """Builds the HNSW index once the collection has hnsw_min_rows rows, and persists it"""
+        if self.hnsw_min_rows is None or self._count < self.hnsw_min_rows:
+            return
+
+        with self._lock:
+            if self._hnsw is None:
+                logger.debug(f"Building HNSW index on {self._count} rows with m: {self.hnsw_m}")
+                hnsw = self._new_hnsw_index()
+                hnsw.init_index(max_elements=self._count, M=self.hnsw_m, ef_construction=self.hnsw_ef_construction)
+                hnsw.add_items(self.vectors, np.arange(self._count))
+                self._hnsw = hnsw
+            if self.path is not None:
+                self._hnsw.save_index(str(self.path / self.hnsw_file))
+
+    def delete(self) -> None:
+        with self._lock:
+            self.clear()
+            if self.path is not None:
+                for file_name in (self.vectors_file, self.documents_file):
+                    if (self.path / file_name).exists():
+                        (self.path / file_name).unlink()
+
+    def get_count(self) -> int:
+        return self._count
+
+    def clear(self) -> bool:
+        with self._lock:
+            self._set_documents([])
+            self._norms = np.empty(0, dtype=np.float32)
+            self._matrix = np.empty((0, self.dimensions), dtype=np.float32)
+            self._drop_hnsw()
+            if self.path is not None and self.exists():
+                self._write_all(self._matrix)
+        return True
@@ -2,3 +2,4 @@ from phi.vectordb.distance import Distance
 from phi.vectordb.pgvector.index import Ivfflat, HNSW
 from phi.vectordb.pgvector.pgvector import PgVector
 from phi.vectordb.pgvector.pgvector2 import PgVector2
+from phi.vectordb.pgvector.tuning import IndexTuner, IndexTuningResult
@@ -1,13 +1,13 @@
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Set, Dict, Any
 from hashlib import md5
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
-    from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
+    from sqlalchemy.schema import MetaData, Table, Column, Index
+    from sqlalchemy.sql.expression import text, func, select, bindparam, any_
     from sqlalchemy.types import DateTime, String
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
@@ -22,6 +22,7 @@ from phi.embedder import Embedder
 from phi.vectordb.base import VectorDb
 from phi.vectordb.distance import Distance
 from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.utils.engine import get_engine
 from phi.utils.log import logger
 
 
@@ -38,7 +39,7 @@ class PgVector(VectorDb):
     ):
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
@@ -85,6 +86,13 @@ class PgVector(VectorDb):
             Column("created_at", DateTime(timezone=True), server_default=text("now()")),
             Column("updated_at", DateTime(timezone=True), onupdate=text("now()")),
             Column("content_hash", String),
+            # Index for the meta_data containment (@>) queries used by search filters
+            Index(
+                f"{self.collection}_meta_data_index",
+                "meta_data",
+                postgresql_using="gin",
+                postgresql_ops={"meta_data": "jsonb_path_ops"},
+            ),
             extend_existing=True,
         )
 
@@ -123,6 +131,45 @@ class PgVector(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
+    def existing_hashes(self, hashes: List[str], batch_size: int = 10000) -> Set[str]:
+        """
+        Returns the content hashes which already exist in the table
+
+        Args:
+            hashes (List[str]): Content hashes to check
+            batch_size (int): Number of hashes to check per query
+        """
+        existing: Set[str] = set()
+        with self.Session() as sess:
+            with sess.begin():
+                for i in range(0, len(hashes), batch_size):
+                    stmt = select(self.table.c.content_hash).where(
+                        self.table.c.content_hash
+                        == any_(bindparam("hashes", value=hashes[i : i + batch_size], type_=postgresql.ARRAY(String)))
+                    )
+                    existing.update(row.content_hash for row in sess.execute(stmt))
+        return existing
+
+    def delete_hashes(self, hashes: List[str], batch_size: int = 10000) -> None:
+        """
+        Deletes the rows with these content hashes
+
+        Args:
+            hashes (List[str]): Content hashes to delete
+            batch_size (int): Number of hashes to delete per query
+        """
+        from sqlalchemy import delete
+
+        with self.Session() as sess:
+            with sess.begin():
+                for i in range(0, len(hashes), batch_size):
+                    stmt = delete(self.table).where(
+                        self.table.c.content_hash
+                        == any_(bindparam("hashes", value=hashes[i : i + batch_size], type_=postgresql.ARRAY(String)))
+                    )
+                    sess.execute(stmt)
+        logger.debug(f"Deleted documents with {len(hashes)} content hashes")
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -136,88 +183,102 @@ class PgVector(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
-    def insert(self, documents: List[Document], batch_size: int = 10) -> None:
-        with self.Session() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                stmt = postgresql.insert(self.table).values(
-                    name=document.name,
-                    meta_data=document.meta_data,
-                    content=cleaned_content,
-                    embedding=document.embedding,
-                    usage=document.usage,
-                    content_hash=md5(cleaned_content.encode()).hexdigest(),
-                )
-                sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
+    def get_row(self, document: Document) -> Dict[str, Any]:
+        """
+        Returns the table row for a document
 
-                # Commit every `batch_size` documents
-                if counter >= batch_size:
-                    sess.commit()
-                    logger.debug(f"Committed {counter} documents")
-                    counter = 0
+        Args:
+            document (Document): Document to convert, must already be embedded
+        """
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        return dict(
+            name=document.name,
+            meta_data=document.meta_data,
+            content=cleaned_content,
+            embedding=document.embedding,
+            usage=document.usage,
+            content_hash=md5(cleaned_content.encode()).hexdigest(),
+        )
 
-            # Commit any remaining documents
-            if counter > 0:
+    def insert(self, documents: List[Document], batch_size: int = 100) -> None:
+        """
+        Insert documents into the database using multi-row INSERT statements.
+
+        Args:
+            documents (List[Document]): List of documents to insert
+            batch_size (int): Number of documents to insert per statement and commit
+        """
+        Document.embed_documents(documents, embedder=self.embedder)
+        with self.Session() as sess:
+            for i in range(0, len(documents), batch_size):
+                rows = [self.get_row(document) for document in documents[i : i + batch_size]]
+                sess.execute(postgresql.insert(self.table).values(rows))
                 sess.commit()
-                logger.debug(f"Committed {counter} documents")
+                logger.debug(f"Committed {len(rows)} documents")
 
-    def upsert(self, documents: List[Document]) -> None:
+    def upsert(self, documents: List[Document], batch_size: int = 100) -> None:
         """
-        Upsert documents into the database.
+        Upsert documents into the database using multi-row INSERT ... ON CONFLICT statements.
 
         Args:
             documents (List[Document]): List of documents to upsert
+            batch_size (int): Number of documents to upsert per statement
         """
+        Document.embed_documents(documents, embedder=self.embedder)
         with self.Session() as sess:
             with sess.begin():
-                for document in documents:
-                    document.embed(embedder=self.embedder)
-                    cleaned_content = document.content.replace("\x00", "\ufffd")
-                    stmt = postgresql.insert(self.table).values(
-                        name=document.name,
-                        meta_data=document.meta_data,
-                        content=cleaned_content,
-                        embedding=document.embedding,
-                        usage=document.usage,
-                        content_hash=md5(cleaned_content.encode()).hexdigest(),
-                    )
+                for i in range(0, len(documents), batch_size):
+                    # A statement can only update each row once, so keep the last document for each conflict key
+                    rows_by_key = {
+                        (row["name"], row["content_hash"]): row
+                        for row in map(self.get_row, documents[i : i + batch_size])
+                    }
+                    rows = list(rows_by_key.values())
+                    stmt = postgresql.insert(self.table).values(rows)
                     stmt = stmt.on_conflict_do_update(
                         index_elements=["name", "content_hash"],
                         set_=dict(
-                            meta_data=document.meta_data,
+                            meta_data=stmt.excluded.meta_data,
                             content=stmt.excluded.content,
                             embedding=stmt.excluded.embedding,
                             usage=stmt.excluded.usage,
                         ),
                     )
                     sess.execute(stmt)
-                    logger.debug(f"Upserted document: {document.name} ({document.meta_data})")
+                    logger.debug(f"Upserted {len(rows)} documents")
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
+        if self.distance == Distance.cosine:
+            distance = self.table.c.embedding.cosine_distance(query_embedding)
+        else:
+            distance = self.table.c.embedding.max_inner_product(query_embedding)
+
         columns = [
             self.table.c.name,
             self.table.c.meta_data,
             self.table.c.content,
-            self.table.c.embedding,
             self.table.c.usage,
+            distance.label("score"),
         ]
+        if include_embedding:
+            columns.append(self.table.c.embedding)
 
         stmt = select(*columns)
-        if self.distance == Distance.l2:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
-        if self.distance == Distance.cosine:
-            stmt = stmt.order_by(self.table.c.embedding.cosine_distance(query_embedding))
-        if self.distance == Distance.max_inner_product:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+        if filters is not None:
+            stmt = stmt.where(self.table.c.meta_data.contains(filters))
+        stmt = stmt.order_by(distance)
 
         stmt = stmt.limit(limit=limit)
         logger.debug(f"Query: {stmt}")
@@ -235,14 +296,18 @@ class PgVector(VectorDb):
         # Build search results
         search_results: List[Document] = []
         for neighbor in neighbors:
+            embedding = None
+            if include_embedding and neighbor.embedding is not None:
+                embedding = list(neighbor.embedding)
             search_results.append(
-                Document(
+                Document.from_search_result(
                     name=neighbor.name,
                     meta_data=neighbor.meta_data,
                     content=neighbor.content,
                     embedder=self.embedder,
-                    embedding=neighbor.embedding,
+                    embedding=embedding,
                     usage=neighbor.usage,
+                    score=float(neighbor.score) if include_score else None,
                 )
             )
 
@@ -269,6 +334,16 @@ class PgVector(VectorDb):
         from math import sqrt
 
         logger.debug("==== Optimizing Vector DB ====")
+        with self.Session() as sess:
+            with sess.begin():
+                logger.debug(f"Creating meta_data index on: {self.collection}")
+                sess.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {self.collection}_meta_data_index ON {self.table} "
+                        f"USING gin (meta_data jsonb_path_ops);"
+                    )
+                )
+
         if self.index is None:
             return
 
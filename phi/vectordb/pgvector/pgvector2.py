@@ -1,14 +1,26 @@
-from typing import Optional, List, Union, Dict, Any
+from typing import Optional, List, Union, Set, Dict, Any, Tuple
 from hashlib import md5
 
 try:
     from sqlalchemy.dialects import postgresql
-    from sqlalchemy.engine import create_engine, Engine
+    from sqlalchemy.engine import Engine
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
-    from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
-    from sqlalchemy.types import DateTime, String
+    from sqlalchemy.schema import MetaData, Table, Column, Computed, Index
+    from sqlalchemy.sql.expression import (
+        text,
+        func,
+        select,
+        bindparam,
+        any_,
+        cast,
+        literal,
+        column,
+        values,
+        true,
+        union_all,
+    )
+    from sqlalchemy.types import DateTime, String, Integer
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
 
@@ -22,6 +34,8 @@ from phi.embedder import Embedder
 from phi.vectordb.base import VectorDb
 from phi.vectordb.distance import Distance
 from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.vectordb.search import SearchType
+from phi.utils.engine import get_engine
 from phi.utils.log import logger
 
 
@@ -35,10 +49,21 @@ class PgVector2(VectorDb):
         embedder: Optional[Embedder] = None,
         distance: Distance = Distance.cosine,
         index: Optional[Union[Ivfflat, HNSW]] = HNSW(),
+        search_type: SearchType = SearchType.vector,
+        text_search_config: str = "english",
+        num_candidates: Optional[int] = None,
+        rrf_k: int = 60,
     ):
+        """
+        :param search_type: vector orders documents by embedding distance, keyword by full-text rank,
+            and hybrid fuses both rankings. keyword and hybrid search need the content_tsv column.
+        :param text_search_config: The postgres text search configuration used to parse the content and query.
+        :param num_candidates: The number of documents taken from each ranking before fusing, defaults to 4 * limit.
+        :param rrf_k: The constant k in the reciprocal rank fusion score: sum(1 / (k + rank)).
+        """
         _engine: Optional[Engine] = db_engine
         if _engine is None and db_url is not None:
-            _engine = create_engine(db_url)
+            _engine = get_engine(db_url)
 
         if _engine is None:
             raise ValueError("Must provide either db_url or db_engine")
@@ -67,16 +92,27 @@ class PgVector2(VectorDb):
         # Index for the collection
         self.index: Optional[Union[Ivfflat, HNSW]] = index
 
+        # Full-text search
+        self.search_type: SearchType = search_type
+        self.text_search_config: str = text_search_config
+        self.num_candidates: Optional[int] = num_candidates
+        self.rrf_k: int = rrf_k
+
         # Database session
         self.Session: sessionmaker[Session] = sessionmaker(bind=self.db_engine)
 
         # Database table for the collection
         self.table: Table = self.get_table()
 
+    @property
+    def full_text_search(self) -> bool:
+        return self.search_type in (SearchType.keyword, SearchType.hybrid)
+
+    def get_tsvector_expression(self) -> str:
+        return f"to_tsvector('{self.text_search_config}', coalesce(content, ''))"
+
     def get_table(self) -> Table:
-        return Table(
-            self.collection,
-            self.metadata,
+        columns = [
             Column("id", String, primary_key=True),
             Column("name", String),
             Column("meta_data", postgresql.JSONB, server_default=text("'{}'::jsonb")),
@@ -86,6 +122,23 @@ class PgVector2(VectorDb):
             Column("created_at", DateTime(timezone=True), server_default=text("now()")),
             Column("updated_at", DateTime(timezone=True), onupdate=text("now()")),
             Column("content_hash", String),
+        ]
+        if self.full_text_search:
+            # Generated column, so postgres keeps it up to date on every insert and update
+            columns.append(
+                Column("content_tsv", postgresql.TSVECTOR, Computed(self.get_tsvector_expression(), persisted=True))
+            )
+        return Table(
+            self.collection,
+            self.metadata,
+            *columns,
+            # Index for the meta_data containment (@>) queries used by search filters
+            Index(
+                f"{self.collection}_meta_data_index",
+                "meta_data",
+                postgresql_using="gin",
+                postgresql_ops={"meta_data": "jsonb_path_ops"},
+            ),
             extend_existing=True,
         )
 
@@ -108,6 +161,26 @@ class PgVector2(VectorDb):
                         sess.execute(text(f"create schema if not exists {self.schema};"))
             logger.debug(f"Creating table: {self.collection}")
             self.table.create(self.db_engine)
+        if self.full_text_search:
+            self.create_full_text_index()
+
+    def create_full_text_index(self) -> None:
+        """Adds the content_tsv column to tables created without it, and the GIN index used by keyword search"""
+        with self.Session() as sess:
+            with sess.begin():
+                logger.debug(f"Creating full-text index on: {self.collection}")
+                sess.execute(
+                    text(
+                        f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+                        f"GENERATED ALWAYS AS ({self.get_tsvector_expression()}) STORED;"
+                    )
+                )
+                sess.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {self.collection}_content_tsv_index ON {self.table} "
+                        f"USING gin (content_tsv);"
+                    )
+                )
 
     def doc_exists(self, document: Document) -> bool:
         """
@@ -124,6 +197,45 @@ class PgVector2(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
+    def existing_hashes(self, hashes: List[str], batch_size: int = 10000) -> Set[str]:
+        """
+        Returns the content hashes which already exist in the table
+
+        Args:
+            hashes (List[str]): Content hashes to check
+            batch_size (int): Number of hashes to check per query
+        """
+        existing: Set[str] = set()
+        with self.Session() as sess:
+            with sess.begin():
+                for i in range(0, len(hashes), batch_size):
+                    stmt = select(self.table.c.content_hash).where(
+                        self.table.c.content_hash
+                        == any_(bindparam("hashes", value=hashes[i : i + batch_size], type_=postgresql.ARRAY(String)))
+                    )
+                    existing.update(row.content_hash for row in sess.execute(stmt))
+        return existing
+
+    def delete_hashes(self, hashes: List[str], batch_size: int = 10000) -> None:
+        """
+        Deletes the rows with these content hashes
+
+        Args:
+            hashes (List[str]): Content hashes to delete
+            batch_size (int): Number of hashes to delete per query
+        """
+        from sqlalchemy import delete
+
+        with self.Session() as sess:
+            with sess.begin():
+                for i in range(0, len(hashes), batch_size):
+                    stmt = delete(self.table).where(
+                        self.table.c.content_hash
+                        == any_(bindparam("hashes", value=hashes[i : i + batch_size], type_=postgresql.ARRAY(String)))
+                    )
+                    sess.execute(stmt)
+        logger.debug(f"Deleted documents with {len(hashes)} content hashes")
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -150,65 +262,59 @@ class PgVector2(VectorDb):
                 result = sess.execute(stmt).first()
                 return result is not None
 
-    def insert(self, documents: List[Document], batch_size: int = 10) -> None:
-        with self.Session() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                content_hash = md5(cleaned_content.encode()).hexdigest()
-                _id = document.id or content_hash
-                stmt = postgresql.insert(self.table).values(
-                    id=_id,
-                    name=document.name,
-                    meta_data=document.meta_data,
-                    content=cleaned_content,
-                    embedding=document.embedding,
-                    usage=document.usage,
-                    content_hash=content_hash,
-                )
-                sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Inserted document: {document.name} ({document.meta_data})")
+    def get_row(self, document: Document) -> Dict[str, Any]:
+        """
+        Returns the table row for a document
 
-                # Commit every `batch_size` documents
-                if counter >= batch_size:
-                    sess.commit()
-                    logger.info(f"Committed {counter} documents")
-                    counter = 0
+        Args:
+            document (Document): Document to convert, must already be embedded
+        """
+        cleaned_content = document.content.replace("\x00", "\ufffd")
+        content_hash = md5(cleaned_content.encode()).hexdigest()
+        return dict(
+            id=document.id or content_hash,
+            name=document.name,
+            meta_data=document.meta_data,
+            content=cleaned_content,
+            embedding=document.embedding,
+            usage=document.usage,
+            content_hash=content_hash,
+        )
+
+    def insert(self, documents: List[Document], batch_size: int = 100) -> None:
+        """
+        Insert documents into the database using multi-row INSERT statements.
 
-            # Commit any remaining documents
-            if counter > 0:
+        Args:
+            documents (List[Document]): List of documents to insert
+            batch_size (int): Number of documents to insert per statement and commit
+        """
+        Document.embed_documents(documents, embedder=self.embedder)
+        with self.Session() as sess:
+            for i in range(0, len(documents), batch_size):
+                rows = [self.get_row(document) for document in documents[i : i + batch_size]]
+                sess.execute(postgresql.insert(self.table).values(rows))
                 sess.commit()
-                logger.info(f"Committed {counter} documents")
+                logger.info(f"Committed {len(rows)} documents")
 
     def upsert_available(self) -> bool:
         return True
 
-    def upsert(self, documents: List[Document], batch_size: int = 20) -> None:
+    def upsert(self, documents: List[Document], batch_size: int = 100) -> None:
         """
-        Upsert documents into the database.
+        Upsert documents into the database using multi-row INSERT ... ON CONFLICT statements.
 
         Args:
             documents (List[Document]): List of documents to upsert
-            batch_size (int): Batch size for upserting documents
+            batch_size (int): Number of documents to upsert per statement and commit
         """
+        Document.embed_documents(documents, embedder=self.embedder)
         with self.Session() as sess:
-            counter = 0
-            for document in documents:
-                document.embed(embedder=self.embedder)
-                cleaned_content = document.content.replace("\x00", "\ufffd")
-                content_hash = md5(cleaned_content.encode()).hexdigest()
-                _id = document.id or content_hash
-                stmt = postgresql.insert(self.table).values(
-                    id=_id,
-                    name=document.name,
-                    meta_data=document.meta_data,
-                    content=cleaned_content,
-                    embedding=document.embedding,
-                    usage=document.usage,
-                    content_hash=content_hash,
-                )
+            for i in range(0, len(documents), batch_size):
+                # A statement can only update each row once, so keep the last document for each id
+                rows_by_id = {row["id"]: row for row in map(self.get_row, documents[i : i + batch_size])}
+                rows = list(rows_by_id.values())
+                stmt = postgresql.insert(self.table).values(rows)
                 # Update row when id matches but 'content_hash' is different
                 stmt = stmt.on_conflict_do_update(
                     index_elements=["id"],
@@ -222,82 +328,297 @@ class PgVector2(VectorDb):
                     ),
                 )
                 sess.execute(stmt)
-                counter += 1
-                logger.debug(f"Upserted document: {document.id} | {document.name} | {document.meta_data}")
+                sess.commit()
+                logger.info(f"Committed {len(rows)} documents")
 
-                # Commit every `batch_size` documents
-                if counter >= batch_size:
-                    sess.commit()
-                    logger.info(f"Committed {counter} documents")
-                    counter = 0
+    def get_distance(self, query_embedding: Any) -> Any:
+        if self.distance == Distance.l2:
+            return self.table.c.embedding.l2_distance(query_embedding)
+        if self.distance == Distance.max_inner_product:
+            return self.table.c.embedding.max_inner_product(query_embedding)
+        return self.table.c.embedding.cosine_distance(query_embedding)
 
-            # Commit any remaining documents
-            if counter > 0:
-                sess.commit()
-                logger.info(f"Committed {counter} documents")
+    def get_filters(self, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """
+        Returns the where clauses for the search filters. Keys which are columns, e.g. name, match the column,
+        all other keys match the meta_data using jsonb containment so the GIN index on meta_data is used.
+        """
+        conditions: List[Any] = []
+        if filters is not None:
+            meta_data_filters: Dict[str, Any] = {}
+            for key, value in filters.items():
+                if key in self.table.c:
+                    conditions.append(self.table.c[key] == value)
+                else:
+                    meta_data_filters[key] = value
+            if len(meta_data_filters) > 0:
+                conditions.append(self.table.c.meta_data.contains(meta_data_filters))
+        return conditions
+
+    def get_vector_search_statement(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+    ) -> Any:
+        distance = self.get_distance(query_embedding)
+        return (
+            select(*self.get_search_columns(include_embedding), distance.label("score"))
+            .where(*self.get_filters(filters))
+            .order_by(distance)
+            .limit(limit)
+        )
 
-    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
-        if query_embedding is None:
-            logger.error(f"Error getting embedding for Query: {query}")
-            return []
+    def get_ts_query(self, query: str) -> Any:
+        # websearch_to_tsquery accepts any user input, e.g. quoted phrases and -exclusions, without syntax errors
+        return func.websearch_to_tsquery(cast(literal(self.text_search_config), postgresql.REGCONFIG), query)
 
-        columns = [
+    def get_keyword_search_statement(
+        self,
+        query: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        query_index: Optional[int] = None,
+    ) -> Any:
+        ts_query = self.get_ts_query(query)
+        ts_rank = func.ts_rank_cd(self.table.c.content_tsv, ts_query)
+        return (
+            select(*self.get_search_columns(include_embedding, query_index), ts_rank.label("score"))
+            .where(self.table.c.content_tsv.bool_op("@@")(ts_query), *self.get_filters(filters))
+            .order_by(ts_rank.desc())
+            .limit(limit)
+        )
+
+    def get_hybrid_search_statement(
+        self,
+        query: str,
+        query_embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        query_index: Optional[int] = None,
+    ) -> Any:
+        """
+        Returns a single statement which ranks the nearest neighbors using the ANN index and the full-text matches
+        using the GIN index, then fuses both rankings with reciprocal rank fusion.
+        """
+        # The CTEs of the statements combined by search_batch() need unique names
+        suffix = f"_{query_index}" if query_index is not None else ""
+        num_candidates = max(self.num_candidates or 4 * limit, limit)
+        conditions = self.get_filters(filters)
+
+        distance = self.get_distance(query_embedding)
+        vector_results = (
+            select(self.table.c.id, func.row_number().over(order_by=distance).label("rank"))
+            .where(*conditions)
+            .order_by(distance)
+            .limit(num_candidates)
+            .cte(f"vector_results{suffix}")
+        )
+
+        ts_query = self.get_ts_query(query)
+        ts_rank = func.ts_rank_cd(self.table.c.content_tsv, ts_query)
+        keyword_results = (
+            select(self.table.c.id, func.row_number().over(order_by=ts_rank.desc()).label("rank"))
+            .where(self.table.c.content_tsv.bool_op("@@")(ts_query), *conditions)
+            .order_by(ts_rank.desc())
+            .limit(num_candidates)
+            .cte(f"keyword_results{suffix}")
+        )
+
+        # A document missing from one ranking gets no score from it
+        score = func.coalesce(1.0 / (self.rrf_k + vector_results.c.rank), 0.0) + func.coalesce(
+            1.0 / (self.rrf_k + keyword_results.c.rank), 0.0
+        )
+        fused_results = (
+            select(func.coalesce(vector_results.c.id, keyword_results.c.id).label("id"), score.label("score"))
+            .select_from(vector_results.join(keyword_results, vector_results.c.id == keyword_results.c.id, full=True))
+            .cte(f"fused_results{suffix}")
+        )
+        return (
+            select(*self.get_search_columns(include_embedding, query_index), fused_results.c.score)
+            .join(fused_results, self.table.c.id == fused_results.c.id)
+            .order_by(fused_results.c.score.desc())
+            .limit(limit)
+        )
+
+    def get_vector_search_batch_statement(
+        self,
+        query_embeddings: List[Tuple[int, List[float]]],
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+    ) -> Any:
+        """
+        Returns a single statement which finds the nearest neighbors of each (query_index, query_embedding),
+        by joining the query embeddings to a LATERAL subquery which uses the ANN index for each query.
+        """
+        queries = values(
+            column("query_index", Integer), column("query_embedding", Vector(self.dimensions)), name="queries"
+        ).data(query_embeddings)
+        # Postgres infers the type of VALUES columns from the rows, which are bound as text
+        distance = self.get_distance(cast(queries.c.query_embedding, Vector(self.dimensions)))
+        neighbors = (
+            select(*self.get_search_columns(include_embedding), distance.label("score"))
+            .where(*self.get_filters(filters))
+            .order_by(distance)
+            .limit(limit)
+            .lateral("neighbors")
+        )
+        return (
+            select(queries.c.query_index, *neighbors.c)
+            .select_from(queries.join(neighbors, true()))
+            .order_by(queries.c.query_index, neighbors.c.score)
+        )
+
+    def get_search_columns(self, include_embedding: bool = False, query_index: Optional[int] = None) -> List[Any]:
+        columns: List[Any] = [
             self.table.c.name,
             self.table.c.meta_data,
             self.table.c.content,
-            self.table.c.embedding,
             self.table.c.usage,
         ]
+        if include_embedding:
+            columns.append(self.table.c.embedding)
+        if query_index is not None:
+            columns.append(literal(query_index).label("query_index"))
+        return columns
 
-        stmt = select(*columns)
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
+        """
+        Returns the documents most similar to the query, see VectorDb.search().
+        The score is the distance for vector search, the ts_rank_cd rank for keyword search
+        and the reciprocal rank fusion score for hybrid search.
+        """
+        if self.search_type == SearchType.keyword:
+            stmt = self.get_keyword_search_statement(
+                query, limit=limit, filters=filters, include_embedding=include_embedding
+            )
+        else:
+            query_embedding = self.embedder.get_embedding(query)
+            if query_embedding is None:
+                logger.error(f"Error getting embedding for Query: {query}")
+                return []
+
+            if self.search_type == SearchType.hybrid:
+                stmt = self.get_hybrid_search_statement(
+                    query, query_embedding, limit=limit, filters=filters, include_embedding=include_embedding
+                )
+            else:
+                stmt = self.get_vector_search_statement(
+                    query_embedding, limit=limit, filters=filters, include_embedding=include_embedding
+                )
+        # Build search results
+        return [
+            self.get_search_result(neighbor, include_embedding=include_embedding, include_score=include_score)
+            for neighbor in self.get_neighbors(stmt)
+        ]
 
-        if filters is not None:
-            for key, value in filters.items():
-                if hasattr(self.table.c, key):
-                    stmt = stmt.where(getattr(self.table.c, key) == value)
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """
+        Returns the documents most similar to each query, using one embedding request and one statement.
+        Vector searches join the queries to a LATERAL subquery, keyword and hybrid searches UNION ALL
+        the statement for each query.
+        """
+        if len(queries) == 0:
+            return []
 
-        if self.distance == Distance.l2:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
-        if self.distance == Distance.cosine:
-            stmt = stmt.order_by(self.table.c.embedding.cosine_distance(query_embedding))
-        if self.distance == Distance.max_inner_product:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+        if self.search_type == SearchType.keyword:
+            statements = [
+                self.get_keyword_search_statement(
+                    query, limit=limit, filters=filters, include_embedding=include_embedding, query_index=i
+                )
+                for i, query in enumerate(queries)
+            ]
+            results = union_all(*statements).subquery()
+            stmt = select(*results.c).order_by(results.c.query_index, results.c.score.desc())
+        else:
+            embeddings, _ = self.embedder.get_embeddings_and_usage(queries)
+            query_embeddings: List[Tuple[int, List[float]]] = []
+            for i, (query, embedding) in enumerate(zip(queries, embeddings)):
+                if not embedding:
+                    logger.error(f"Error getting embedding for Query: {query}")
+                    continue
+                query_embeddings.append((i, embedding))
+            if len(query_embeddings) == 0:
+                return [[] for _ in queries]
+
+            if self.search_type == SearchType.hybrid:
+                statements = [
+                    self.get_hybrid_search_statement(
+                        queries[i],
+                        embedding,
+                        limit=limit,
+                        filters=filters,
+                        include_embedding=include_embedding,
+                        query_index=i,
+                    )
+                    for i, embedding in query_embeddings
+                ]
+                results = union_all(*statements).subquery()
+                stmt = select(*results.c).order_by(results.c.query_index, results.c.score.desc())
+            else:
+                stmt = self.get_vector_search_batch_statement(
+                    query_embeddings, limit=limit, filters=filters, include_embedding=include_embedding
+                )
 
-        stmt = stmt.limit(limit=limit)
-        logger.debug(f"Query: {stmt}")
+        # Build search results, in the order of the queries
+        search_results: List[List[Document]] = [[] for _ in queries]
+        for neighbor in self.get_neighbors(stmt):
+            search_results[neighbor.query_index].append(
+                self.get_search_result(neighbor, include_embedding=include_embedding, include_score=include_score)
+            )
+        return search_results
 
-        # Get neighbors
+    def get_neighbors(self, stmt: Any) -> List[Any]:
+        """Runs a search statement, using the index search parameters"""
+        logger.debug(f"Query: {stmt}")
         try:
             with self.Session() as sess:
                 with sess.begin():
-                    if self.index is not None:
+                    if self.index is not None and self.search_type != SearchType.keyword:
                         if isinstance(self.index, Ivfflat):
                             sess.execute(text(f"SET LOCAL ivfflat.probes = {self.index.probes}"))
                         elif isinstance(self.index, HNSW):
                             sess.execute(text(f"SET LOCAL hnsw.ef_search  = {self.index.ef_search}"))
-                    neighbors = sess.execute(stmt).fetchall() or []
+                    return list(sess.execute(stmt).fetchall())
         except Exception as e:
             logger.error(f"Error searching for documents: {e}")
             logger.error("Table might not exist, creating for future use")
             self.create()
             return []
 
-        # Build search results
-        search_results: List[Document] = []
-        for neighbor in neighbors:
-            search_results.append(
-                Document(
-                    name=neighbor.name,
-                    meta_data=neighbor.meta_data,
-                    content=neighbor.content,
-                    embedder=self.embedder,
-                    embedding=neighbor.embedding,
-                    usage=neighbor.usage,
-                )
-            )
-
-        return search_results
+    def get_search_result(
+        self, neighbor: Any, include_embedding: bool = False, include_score: bool = False
+    ) -> Document:
+        embedding = None
+        if include_embedding and neighbor.embedding is not None:
+            embedding = list(neighbor.embedding)
+        return Document.from_search_result(
+            name=neighbor.name,
+            meta_data=neighbor.meta_data,
+            content=neighbor.content,
+            embedder=self.embedder,
+            embedding=embedding,
+            usage=neighbor.usage,
+            score=float(neighbor.score) if include_score else None,
+        )
 
     def delete(self) -> None:
         if self.table_exists():
@@ -317,30 +638,55 @@ class PgVector2(VectorDb):
                 return 0
 
     def optimize(self) -> None:
-        from math import sqrt
-
         logger.debug("==== Optimizing Vector DB ====")
-        if self.index is None:
-            return
+        with self.Session() as sess:
+            with sess.begin():
+                logger.debug(f"Creating meta_data index on: {self.collection}")
+                sess.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS {self.collection}_meta_data_index ON {self.table} "
+                        f"USING gin (meta_data jsonb_path_ops);"
+                    )
+                )
 
+        if self.full_text_search:
+            self.create_full_text_index()
+
+        self.create_index()
+        logger.debug("==== Optimized Vector DB ====")
+
+    def get_index_name(self) -> Optional[str]:
+        if self.index is None:
+            return None
         if self.index.name is None:
             _type = "ivfflat" if isinstance(self.index, Ivfflat) else "hnsw"
             self.index.name = f"{self.collection}_{_type}_index"
+        return self.index.name
 
-        index_distance = "vector_cosine_ops"
+    def get_index_ops(self) -> str:
         if self.distance == Distance.l2:
-            index_distance = "vector_l2_ops"
+            return "vector_l2_ops"
         if self.distance == Distance.max_inner_product:
-            index_distance = "vector_ip_ops"
+            return "vector_ip_ops"
+        return "vector_cosine_ops"
+
+    def create_index(self) -> None:
+        """Creates the ANN index for the embeddings, if it does not exist"""
+        from math import sqrt
 
+        if self.index is None:
+            return
+
+        index_name = self.get_index_name()
+        index_distance = self.get_index_ops()
         if isinstance(self.index, Ivfflat):
             num_lists = self.index.lists
             if self.index.dynamic_lists:
                 total_records = self.get_count()
                 logger.debug(f"Number of records: {total_records}")
                 if total_records < 1000000:
-                    num_lists = int(total_records / 1000)
-                elif total_records > 1000000:
+                    num_lists = max(int(total_records / 1000), 1)
+                else:
                     num_lists = int(sqrt(total_records))
 
             with self.Session() as sess:
@@ -355,7 +701,7 @@ class PgVector2(VectorDb):
                     sess.execute(text(f"SET ivfflat.probes = {self.index.probes};"))
                     sess.execute(
                         text(
-                            f"CREATE INDEX IF NOT EXISTS {self.index.name} ON {self.table} "
+                            f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} "
                             f"USING ivfflat (embedding {index_distance}) "
                             f"WITH (lists = {num_lists});"
                         )
@@ -372,12 +718,23 @@ class PgVector2(VectorDb):
                     )
                     sess.execute(
                         text(
-                            f"CREATE INDEX IF NOT EXISTS {self.index.name} ON {self.table} "
+                            f"CREATE INDEX IF NOT EXISTS {index_name} ON {self.table} "
                             f"USING hnsw (embedding {index_distance}) "
                             f"WITH (m = {self.index.m}, ef_construction = {self.index.ef_construction});"
                         )
                     )
-        logger.debug("==== Optimized Vector DB ====")
+
+    def drop_index(self) -> None:
+        """Drops the ANN index, e.g. to rebuild it with new parameters"""
+        index_name = self.get_index_name()
+        if index_name is None:
+            return
+        if self.schema is not None:
+            index_name = f"{self.schema}.{index_name}"
+        with self.Session() as sess:
+            with sess.begin():
+                logger.debug(f"Dropping index: {index_name}")
+                sess.execute(text(f"DROP INDEX IF EXISTS {index_name};"))
 
     def clear(self) -> bool:
         from sqlalchemy import delete
@@ -0,0 +1,267 @@
+from time import perf_counter
+from typing import Optional, List, Union, Dict, Any
+
+try:
+    from sqlalchemy.sql.expression import text, func, select
+except ImportError:
+    raise ImportError("`sqlalchemy` not installed")
+
+from pydantic import BaseModel
+
+from phi.vectordb.pgvector.index import Ivfflat, HNSW
+from phi.vectordb.pgvector.pgvector2 import PgVector2
+from phi.utils.log import logger
+
+
+class IndexTuningResult(BaseModel):
+    """The recall and latency of the ANN index for one set of index parameters"""
+
+    # Build parameters: lists for Ivfflat, m and ef_construction for HNSW
+    lists: Optional[int] = None
+    m: Optional[int] = None
+    ef_construction: Optional[int] = None
+    # Search parameters: probes for Ivfflat, ef_search for HNSW
+    probes: Optional[int] = None
+    ef_search: Optional[int] = None
+
+    # Mean fraction of the exact k nearest neighbors returned by the index
+    recall: float
+    # Query latency in milliseconds
+    p50_latency_ms: float
+    p99_latency_ms: float
+    num_queries: int
+    k: int
+
+
+class IndexTuner:
+    def __init__(
+        self,
+        vector_db: PgVector2,
+        sample_size: int = 100,
+        k: int = 10,
+        probes: Optional[List[int]] = None,
+        ef_search: Optional[List[int]] = None,
+        lists: Optional[List[int]] = None,
+        m: Optional[List[int]] = None,
+        target_recall: float = 0.95,
+    ):
+        """
+        Measures the recall@k and latency of the PgVector2 ANN index over a sweep of index parameters,
+        using stored vectors as queries and an exact scan as the ground truth.
+
+        :param vector_db: The PgVector2 to tune. Its index must be an Ivfflat or HNSW config.
+        :param sample_size: The number of stored vectors sampled as queries.
+        :param k: The number of neighbors used to compute recall@k.
+        :param probes: The ivfflat.probes values to try, defaults to 1 to 100.
+        :param ef_search: The hnsw.ef_search values to try, defaults to k to 400.
+        :param lists: The Ivfflat lists to try. Each value rebuilds the index, defaults to the current lists only.
+        :param m: The HNSW m values to try. Each value rebuilds the index, defaults to the current m only.
+        :param target_recall: The recall the chosen settings must reach, see choose().
+        """
+        if not isinstance(vector_db.index, (Ivfflat, HNSW)):
+            raise ValueError("vector_db must have an Ivfflat or HNSW index to tune")
+
+        self.vector_db: PgVector2 = vector_db
+        self.sample_size: int = sample_size
+        self.k: int = k
+        self.probes: List[int] = probes or [1, 2, 5, 10, 20, 50, 100]
+        self.ef_search: List[int] = ef_search or sorted({k, 20, 40, 80, 160, 400})
+        self.lists: Optional[List[int]] = lists
+        self.m: Optional[List[int]] = m
+        self.target_recall: float = target_recall
+
+    @property
+    def index(self) -> Union[Ivfflat, HNSW]:
+        return self.vector_db.index  # type: ignore
+
+    def sample_queries(self) -> List[List[float]]:
+        """Returns a random sample of the stored vectors"""
+        table = self.vector_db.table
+        stmt = (
+            select(table.c.embedding)
+            .where(table.c.embedding.isnot(None))
+            .order_by(func.random())
+            .limit(self.sample_size)
+        )
+        with self.vector_db.Session() as sess:
+            with sess.begin():
+                return [list(row.embedding) for row in sess.execute(stmt)]
+
+    def get_neighbor_ids(self, sess: Any, query_embedding: List[float]) -> List[str]:
+        table = self.vector_db.table
+        distance = self.vector_db.get_distance(query_embedding)
+        stmt = select(table.c.id).order_by(distance).limit(self.k)
+        return [row.id for row in sess.execute(stmt)]
+
+    def get_ground_truth(self, queries: List[List[float]]) -> List[List[str]]:
+        """Returns the exact k nearest neighbors of each query, by disabling index scans"""
+        ground_truth: List[List[str]] = []
+        with self.vector_db.Session() as sess:
+            with sess.begin():
+                sess.execute(text("SET LOCAL enable_indexscan = off"))
+                for query_embedding in queries:
+                    ground_truth.append(self.get_neighbor_ids(sess, query_embedding))
+        return ground_truth
+
+    def get_search_settings(self) -> List[Dict[str, int]]:
+        if isinstance(self.index, Ivfflat):
+            return [{"probes": probes} for probes in self.probes]
+        return [{"ef_search": ef_search} for ef_search in self.ef_search]
+
+    def measure(
+        self, queries: List[List[float]], ground_truth: List[List[str]], probes: int = 1, ef_search: int = 40
+    ) -> IndexTuningResult:
+        """Runs the queries using the ANN index and compares the neighbors to the ground truth"""
+        latencies: List[float] = []
+        recalls: List[float] = []
+        with self.vector_db.Session() as sess:
+            for query_embedding, expected in zip(queries, ground_truth):
+                with sess.begin():
+                    if isinstance(self.index, Ivfflat):
+                        sess.execute(text(f"SET LOCAL ivfflat.probes = {probes}"))
+                    else:
+                        sess.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+                    start = perf_counter()
+                    neighbor_ids = self.get_neighbor_ids(sess, query_embedding)
+                    latencies.append((perf_counter() - start) * 1000)
+                if len(expected) > 0:
+                    recalls.append(len(set(neighbor_ids) & set(expected)) / len(expected))
+
+        if isinstance(self.index, Ivfflat):
+            # With dynamic_lists the lists are picked from the number of rows when the index is built
+            lists = None if self.index.dynamic_lists else self.index.lists
+            settings: Dict[str, Any] = {"lists": lists, "probes": probes}
+        else:
+            settings = {"m": self.index.m, "ef_construction": self.index.ef_construction, "ef_search": ef_search}
+        return IndexTuningResult(
+            **settings,
+            recall=sum(recalls) / len(recalls) if len(recalls) > 0 else 0.0,
+            p50_latency_ms=percentile(latencies, 50),
+            p99_latency_ms=percentile(latencies, 99),
+            num_queries=len(queries),
+            k=self.k,
+        )
+
+    def get_built_lists(self) -> Optional[int]:
+        """Returns the lists of the built Ivfflat index, from its storage parameters, or None if it is not built"""
+        index_name = self.vector_db.get_index_name()
+        if self.vector_db.schema is not None:
+            index_name = f"{self.vector_db.schema}.{index_name}"
+        with self.vector_db.Session() as sess:
+            reloptions = sess.execute(
+                text("SELECT reloptions FROM pg_class WHERE oid = to_regclass(:index_name)"), {"index_name": index_name}
+            ).scalar()
+        for option in reloptions or []:
+            key, _, value = option.partition("=")
+            if key == "lists":
+                return int(value)
+        return None
+
+    def build_index(self, lists: Optional[int] = None, m: Optional[int] = None) -> None:
+        """Rebuilds the ANN index with the build parameters"""
+        if isinstance(self.index, Ivfflat) and lists is not None:
+            self.index.lists = lists
+            self.index.dynamic_lists = False
+        elif isinstance(self.index, HNSW) and m is not None:
+            self.index.m = m
+        logger.info(f"Building index: {self.index.model_dump(exclude={'configuration'})}")
+        self.vector_db.drop_index()
+        self.vector_db.create_index()
+
+    def run(self) -> List[IndexTuningResult]:
+        """
+        Sweeps the index parameters and returns the recall and latency of each setting.
+
+        When lists or m are given, the index is rebuilt for each value and then rebuilt with the original
+        parameters. apply() rebuilds it with the chosen ones.
+        """
+        queries = self.sample_queries()
+        if len(queries) == 0:
+            logger.warning("No vectors to sample, insert documents before tuning the index")
+            return []
+        logger.debug(f"Computing exact neighbors for {len(queries)} queries")
+        ground_truth = self.get_ground_truth(queries)
+
+        build_key = "lists" if isinstance(self.index, Ivfflat) else "m"
+        build_values: List[Optional[int]] = [None]
+        if build_key == "lists" and self.lists:
+            build_values = list(self.lists)
+        elif build_key == "m" and self.m:
+            build_values = list(self.m)
+
+        original = self.index.model_copy()
+        results: List[IndexTuningResult] = []
+        try:
+            for build_value in build_values:
+                if build_value is not None:
+                    self.build_index(**{build_key: build_value})
+                else:
+                    self.vector_db.create_index()
+                for settings in self.get_search_settings():
+                    result = self.measure(queries, ground_truth, **settings)
+                    params = result.model_dump(
+                        include={"lists", "m", "ef_construction", "probes", "ef_search"}, exclude_none=True
+                    )
+                    logger.info(
+                        f"recall@{self.k}: {result.recall:.3f}, p50: {result.p50_latency_ms:.2f}ms, "
+                        f"p99: {result.p99_latency_ms:.2f}ms, {params}"
+                    )
+                    results.append(result)
+        finally:
+            if build_values != [None]:
+                for key, value in original:
+                    setattr(self.index, key, value)
+                self.build_index()
+        return results
+
+    def choose(self, results: List[IndexTuningResult]) -> Optional[IndexTuningResult]:
+        """
+        Returns the setting with the lowest p99 latency which reaches the target recall,
+        or the setting with the highest recall if none reach it.
+        """
+        if len(results) == 0:
+            return None
+        reached = [r for r in results if r.recall >= self.target_recall]
+        if len(reached) > 0:
+            return min(reached, key=lambda r: (r.p99_latency_ms, r.p50_latency_ms))
+        logger.warning(f"No setting reached recall@{self.k} of {self.target_recall}")
+        return max(results, key=lambda r: (r.recall, -r.p99_latency_ms))
+
+    def apply(self, result: IndexTuningResult) -> Union[Ivfflat, HNSW]:
+        """Sets the chosen parameters on the index config, rebuilding the index if the build parameters changed"""
+        if isinstance(self.index, Ivfflat):
+            # With dynamic_lists the built index can have other lists than index.lists
+            rebuild = result.lists is not None and result.lists != self.get_built_lists()
+            if result.lists is not None:
+                self.index.lists = result.lists
+                self.index.dynamic_lists = False
+            if result.probes is not None:
+                self.index.probes = result.probes
+            if rebuild:
+                self.build_index(lists=result.lists)
+        else:
+            rebuild = result.m is not None and result.m != self.index.m
+            if result.ef_search is not None:
+                self.index.ef_search = result.ef_search
+            if rebuild:
+                self.build_index(m=result.m)
+        logger.info(f"Index settings: {self.index.model_dump(exclude={'configuration'})}")
+        return self.index
+
+    def tune(self, apply: bool = False) -> Optional[IndexTuningResult]:
+        """Runs the sweep and returns the chosen setting. If apply is True, the setting is saved on the index."""
+        chosen = self.choose(self.run())
+        if chosen is not None and apply:
+            self.apply(chosen)
+        return chosen
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Returns the q-th percentile of the values, using linear interpolation"""
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
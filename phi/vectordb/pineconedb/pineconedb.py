@@ -1,4 +1,6 @@
-from typing import Optional, Dict, Union, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Union, List, Set, Any
+from hashlib import md5
 
 try:
     from pinecone import Pinecone
@@ -167,6 +169,81 @@ class PineconeDB(VectorDb):
         response = self.index.fetch(ids=[document.id])
         return len(response.vectors) > 0
 
+    def existing_hashes(self, hashes: List[str], batch_size: int = 100) -> Set[str]:
+        """Returns the content hashes which already exist in the index.
+
+        Args:
+            hashes (List[str]): The content hashes to check.
+            batch_size (int, optional): The number of hashes to look up per request. Defaults to 100.
+
+        Returns:
+            Set[str]: The content hashes which exist in the index.
+
+        """
+        return set(self.get_hash_ids(hashes, batch_size=batch_size).keys())
+
+    def get_hash_ids(self, hashes: List[str], batch_size: int = 100) -> Dict[str, Set[str]]:
+        """Returns the ids of the vectors stored for each content hash.
+
+        Documents without an id are upserted with their content hash as id, so they are fetched by id.
+        Documents with an id store their content hash in the metadata, so they are found with a metadata filter.
+        Documents with an id upserted before the content hash was stored in the metadata are not found.
+
+        Args:
+            hashes (List[str]): The content hashes to look up.
+            batch_size (int, optional): The number of hashes to look up per request. Defaults to 100.
+
+        Returns:
+            Dict[str, Set[str]]: The ids for each content hash which exists in the index.
+
+        """
+        hash_ids: Dict[str, Set[str]] = {}
+        # The query needs a vector, the filter selects the matches
+        query_vector = [1.0] + [0.0] * (self.dimension - 1)
+        for i in range(0, len(hashes), batch_size):
+            batch = hashes[i : i + batch_size]
+            response = self.index.fetch(ids=batch, namespace=self.namespace)
+            for vector_id in response.vectors.keys():
+                hash_ids.setdefault(vector_id, set()).add(vector_id)
+
+            remaining = batch
+            while len(remaining) > 0:
+                response = self.index.query(
+                    vector=query_vector,
+                    top_k=1000,
+                    namespace=self.namespace,
+                    filter={"content_hash": {"$in": remaining}},
+                    include_metadata=True,
+                )
+                if len(response.matches) == 0:
+                    break
+                found: Set[str] = set()
+                for result in response.matches:
+                    content_hash = (result.metadata or {}).get("content_hash")
+                    if content_hash is not None:
+                        hash_ids.setdefault(content_hash, set()).add(result.id)
+                        found.add(content_hash)
+                if len(found) == 0:
+                    break
+                remaining = [content_hash for content_hash in remaining if content_hash not in found]
+        return hash_ids
+
+    def delete_hashes(self, hashes: List[str], batch_size: int = 100) -> None:
+        """Deletes the documents with these content hashes from the index.
+
+        Args:
+            hashes (List[str]): The content hashes to delete.
+            batch_size (int, optional): The number of hashes to look up per request. Defaults to 100.
+
+        """
+        ids: List[str] = []
+        for hash_ids in self.get_hash_ids(hashes, batch_size=batch_size).values():
+            ids.extend(hash_ids)
+        # Pinecone deletes at most 1000 ids per request
+        for i in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[i : i + 1000], namespace=self.namespace)
+        logger.debug(f"Deleted {len(ids)} vectors")
+
     def name_exists(self, name: str) -> bool:
         """Check if an index with the given name exists.
 
@@ -201,14 +278,14 @@ class PineconeDB(VectorDb):
         """
 
         vectors = []
+        Document.embed_documents(documents, embedder=self.embedder)
         for document in documents:
-            document.embed(embedder=self.embedder)
             document.meta_data["text"] = document.content
             vectors.append(
                 Vector(
-                    id=document.id,
+                    id=document.id or md5(document.content.replace("\x00", "\ufffd").encode()).hexdigest(),
                     values=document.embedding,
-                    metadata=document.meta_data,
+                    metadata={**document.meta_data, "content_hash": document.content_hash},
                 )
             )
         self.index.upsert(
@@ -245,6 +322,10 @@ class PineconeDB(VectorDb):
         self,
         query: str,
         limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+        *,
         namespace: Optional[str] = None,
         filter: Optional[Dict[str, Union[str, float, int, bool, List, dict]]] = None,
         include_values: Optional[bool] = None,
@@ -254,9 +335,12 @@ class PineconeDB(VectorDb):
         Args:
             query (str): The query to search for.
             limit (int, optional): The maximum number of results to return. Defaults to 5.
+            filters (Optional[Dict[str, Any]], optional): Metadata values the documents must have. Defaults to None.
+            include_embedding (bool, optional): Whether to include the embeddings. Defaults to False.
+            include_score (bool, optional): Whether to set the score of the search results. Defaults to False.
             namespace (Optional[str], optional): The namespace to search in. Defaults to None.
             filter (Optional[Dict[str, Union[str, float, int, bool, List, dict]]], optional): The filter for the search. Defaults to None.
-            include_values (Optional[bool], optional): Whether to include values in the search results. Defaults to None.
+            include_values (Optional[bool], optional): Same as include_embedding. Defaults to None.
             include_metadata (Optional[bool], optional): Whether to include metadata in the search results. Defaults to None.
 
         Returns:
@@ -269,6 +353,82 @@ class PineconeDB(VectorDb):
             logger.error(f"Error getting embedding for Query: {query}")
             return []
 
+        return self.query(
+            query_embedding,
+            limit=limit,
+            namespace=namespace,
+            filter=self.get_filter(filter, filters),
+            include_values=include_values or include_embedding,
+            include_score=include_score,
+        )
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+        *,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict[str, Union[str, float, int, bool, List, dict]]] = None,
+        include_values: Optional[bool] = None,
+        max_workers: int = 8,
+    ) -> List[List[Document]]:
+        """Search for similar documents for each query, using one embedding request and concurrent queries.
+        The other arguments are the same as for search().
+
+        Args:
+            queries (List[str]): The queries to search for.
+            max_workers (int, optional): The maximum number of concurrent queries. Defaults to 8.
+
+        Returns:
+            List[List[Document]]: The list of matching documents for each query, in the order of the queries.
+
+        """
+        if len(queries) == 0:
+            return []
+
+        embeddings, _ = self.embedder.get_embeddings_and_usage(queries)
+        query_filter = self.get_filter(filter, filters)
+
+        def query(query_embedding: List[float]) -> List[Document]:
+            if not query_embedding:
+                logger.error("Error getting embedding for Query")
+                return []
+            return self.query(
+                query_embedding,
+                limit=limit,
+                namespace=namespace,
+                filter=query_filter,
+                include_values=include_values or include_embedding,
+                include_score=include_score,
+            )
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queries))) as executor:
+            return list(executor.map(query, embeddings))
+
+    def get_filter(
+        self, filter: Optional[Dict[str, Any]] = None, filters: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the pinecone filter, combined with the metadata values in filters"""
+        if not filters:
+            return filter
+
+        # Documents are upserted with their meta_data as the metadata
+        metadata_filter: Dict[str, Any] = {key: {"$eq": value} for key, value in filters.items()}
+        return {"$and": [filter, metadata_filter]} if filter else metadata_filter
+
+    def query(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict[str, Any]] = None,
+        include_values: Optional[bool] = None,
+        include_score: bool = False,
+    ) -> List[Document]:
+        """Queries the index with an embedding and returns the matches as documents"""
         response = self.index.query(
             vector=query_embedding,
             top_k=limit,
@@ -278,11 +438,12 @@ class PineconeDB(VectorDb):
             include_metadata=True,
         )
         return [
-            Document(
+            Document.from_search_result(
                 content=(result.metadata.get("text", "") if result.metadata is not None else ""),
                 id=result.id,
-                embedding=result.values,
-                meta_data=result.metadata,
+                embedding=result.values or None,
+                meta_data={key: value for key, value in (result.metadata or {}).items() if key != "content_hash"},
+                score=result.score if include_score else None,
             )
             for result in response.matches
         ]
@@ -1,5 +1,5 @@
 from hashlib import md5
-from typing import List, Optional
+from typing import List, Optional, Set, Dict, Any
 
 try:
     from qdrant_client import QdrantClient  # noqa: F401
@@ -118,6 +118,43 @@ class Qdrant(VectorDb):
             return len(collection_points) > 0
         return False
 
+    def existing_hashes(self, hashes: List[str], batch_size: int = 1000) -> Set[str]:
+        """
+        Returns the content hashes which already exist in the collection.
+        Points are stored with the content hash as id, so they are retrieved in batches by id.
+
+        Args:
+            hashes (List[str]): Content hashes to check
+            batch_size (int): Number of points to retrieve per request
+        """
+        existing: Set[str] = set()
+        if self.client:
+            for i in range(0, len(hashes), batch_size):
+                collection_points = self.client.retrieve(
+                    collection_name=self.collection,
+                    ids=hashes[i : i + batch_size],
+                    with_payload=False,
+                    with_vectors=False,
+                )
+                # Qdrant returns md5 hex ids formatted as UUIDs
+                existing.update(str(point.id).replace("-", "") for point in collection_points)
+        return existing
+
+    def delete_hashes(self, hashes: List[str], batch_size: int = 1000) -> None:
+        """
+        Deletes the points with these content hashes as id
+
+        Args:
+            hashes (List[str]): Content hashes to delete
+            batch_size (int): Number of points to delete per request
+        """
+        for i in range(0, len(hashes), batch_size):
+            self.client.delete(
+                collection_name=self.collection,
+                points_selector=models.PointIdsList(points=hashes[i : i + batch_size]),  # type: ignore
+            )
+        logger.debug(f"Deleted {len(hashes)} points")
+
     def name_exists(self, name: str) -> bool:
         """
         Validates if a document with the given name exists in the collection.
@@ -142,8 +179,8 @@ class Qdrant(VectorDb):
     def insert(self, documents: List[Document], batch_size: int = 10) -> None:
         logger.debug(f"Inserting {len(documents)} documents")
         points = []
+        Document.embed_documents(documents, embedder=self.embedder)
         for document in documents:
-            document.embed(embedder=self.embedder)
             cleaned_content = document.content.replace("\x00", "\ufffd")
             doc_id = md5(cleaned_content.encode()).hexdigest()
             points.append(
@@ -173,7 +210,29 @@ class Qdrant(VectorDb):
         logger.debug("Redirecting the request to insert")
         self.insert(documents)
 
-    def search(self, query: str, limit: int = 5) -> List[Document]:
+    def get_filter(self, filters: Optional[Dict[str, Any]] = None) -> Optional[models.Filter]:
+        """Returns a payload filter matching the meta_data values in filters"""
+        if not filters:
+            return None
+
+        conditions: List[models.FieldCondition] = []
+        for key, value in filters.items():
+            if isinstance(value, float):
+                # MatchValue only matches keywords, integers and booleans
+                condition = models.FieldCondition(key=f"meta_data.{key}", range=models.Range(gte=value, lte=value))
+            else:
+                condition = models.FieldCondition(key=f"meta_data.{key}", match=models.MatchValue(value=value))
+            conditions.append(condition)
+        return models.Filter(must=conditions)  # type: ignore
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
         query_embedding = self.embedder.get_embedding(query)
         if query_embedding is None:
             logger.error(f"Error getting embedding for Query: {query}")
@@ -182,27 +241,73 @@ class Qdrant(VectorDb):
         results = self.client.search(
             collection_name=self.collection,
             query_vector=query_embedding,
-            with_vectors=True,
+            query_filter=self.get_filter(filters),
+            with_vectors=include_embedding,
             with_payload=True,
             limit=limit,
         )
+        return self.get_search_results(results, include_embedding=include_embedding, include_score=include_score)
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the documents most similar to each query, using one embedding request and one search_batch request"""
+        if len(queries) == 0:
+            return []
+
+        embeddings, _ = self.embedder.get_embeddings_and_usage(queries)
+        query_filter = self.get_filter(filters)
+        requests: List[models.SearchRequest] = []
+        query_indexes: List[int] = []
+        for i, (query, embedding) in enumerate(zip(queries, embeddings)):
+            if not embedding:
+                logger.error(f"Error getting embedding for Query: {query}")
+                continue
+            requests.append(
+                models.SearchRequest(
+                    vector=embedding,
+                    filter=query_filter,
+                    limit=limit,
+                    with_vector=include_embedding,
+                    with_payload=True,
+                )
+            )
+            query_indexes.append(i)
 
-        # Build search results
+        search_results: List[List[Document]] = [[] for _ in queries]
+        if len(requests) == 0:
+            return search_results
+
+        batch_results = self.client.search_batch(collection_name=self.collection, requests=requests)
+        for i, results in zip(query_indexes, batch_results):
+            search_results[i] = self.get_search_results(
+                results, include_embedding=include_embedding, include_score=include_score
+            )
+        return search_results
+
+    def get_search_results(
+        self, results: List[models.ScoredPoint], include_embedding: bool = False, include_score: bool = False
+    ) -> List[Document]:
         search_results: List[Document] = []
         for result in results:
             if result.payload is None:
                 continue
             search_results.append(
-                Document(
+                Document.from_search_result(
                     name=result.payload["name"],
                     meta_data=result.payload["meta_data"],
                     content=result.payload["content"],
                     embedder=self.embedder,
-                    embedding=result.vector,
+                    embedding=result.vector if include_embedding else None,  # type: ignore
                     usage=result.payload["usage"],
+                    score=result.score if include_score else None,
                 )
             )
-
         return search_results
 
     def delete(self) -> None:
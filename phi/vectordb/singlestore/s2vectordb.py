@@ -1,5 +1,5 @@
 import json
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from hashlib import md5
 
 try:
@@ -8,7 +8,7 @@ try:
     from sqlalchemy.inspection import inspect
     from sqlalchemy.orm import Session, sessionmaker
     from sqlalchemy.schema import MetaData, Table, Column
-    from sqlalchemy.sql.expression import text, func, select
+    from sqlalchemy.sql.expression import text, func, select, bindparam, literal, union_all
     from sqlalchemy.types import DateTime
 except ImportError:
     raise ImportError("`sqlalchemy` not installed")
@@ -98,6 +98,37 @@ class S2VectorDb(VectorDb):
             result = sess.execute(stmt).first()
             return result is not None
 
+    def existing_hashes(self, hashes: List[str], batch_size: int = 1000) -> Set[str]:
+        """
+        Returns the content hashes which already exist in the table
+
+        Args:
+            hashes (List[str]): Content hashes to check
+            batch_size (int): Number of hashes to check per query
+        """
+        existing: Set[str] = set()
+        with self.Session.begin() as sess:
+            for i in range(0, len(hashes), batch_size):
+                stmt = select(self.table.c.content_hash).where(
+                    self.table.c.content_hash.in_(hashes[i : i + batch_size])
+                )
+                existing.update(row.content_hash for row in sess.execute(stmt))
+        return existing
+
+    def delete_hashes(self, hashes: List[str], batch_size: int = 1000) -> None:
+        """
+        Deletes the rows with these content hashes
+
+        Args:
+            hashes (List[str]): Content hashes to delete
+            batch_size (int): Number of hashes to delete per query
+        """
+        with self.Session.begin() as sess:
+            for i in range(0, len(hashes), batch_size):
+                stmt = self.table.delete().where(self.table.c.content_hash.in_(hashes[i : i + batch_size]))
+                sess.execute(stmt)
+        logger.debug(f"Deleted documents with {len(hashes)} content hashes")
+
     def name_exists(self, name: str) -> bool:
         """
         Validate if a row with this name exists or not
@@ -125,8 +156,8 @@ class S2VectorDb(VectorDb):
     def insert(self, documents: List[Document], batch_size: int = 10) -> None:
         with self.Session.begin() as sess:
             counter = 0
+            Document.embed_documents(documents, embedder=self.embedder)
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 content_hash = md5(cleaned_content.encode()).hexdigest()
                 _id = document.id or content_hash
@@ -166,8 +197,8 @@ class S2VectorDb(VectorDb):
         """
         with self.Session.begin() as sess:
             counter = 0
+            Document.embed_documents(documents, embedder=self.embedder)
             for document in documents:
-                document.embed(embedder=self.embedder)
                 cleaned_content = document.content.replace("\x00", "\ufffd")
                 content_hash = md5(cleaned_content.encode()).hexdigest()
                 _id = document.id or content_hash
@@ -194,41 +225,120 @@ class S2VectorDb(VectorDb):
             sess.commit()
             logger.debug(f"Committed {counter} documents")
 
-    def search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
-        query_embedding = self.embedder.get_embedding(query)
-        if query_embedding is None:
-            logger.error(f"Error getting embedding for Query: {query}")
-            return []
+    def get_meta_data_filter(self, key: str, value: Any) -> Any:
+        """Returns a where clause matching a meta_data key, using the SingleStore JSON extract functions"""
+        if isinstance(value, str):
+            return func.JSON_EXTRACT_STRING(self.table.c.meta_data, key) == value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return func.JSON_EXTRACT_DOUBLE(self.table.c.meta_data, key) == value
+        return func.JSON_EXTRACT_JSON(self.table.c.meta_data, key) == json.dumps(value, separators=(",", ":"))
 
-        columns = [
+    def get_search_statement(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        query_index: Optional[int] = None,
+    ) -> Any:
+        columns: List[Any] = [
             self.table.c.name,
             self.table.c.meta_data,
             self.table.c.content,
-            func.json_array_unpack(self.table.c.embedding).label(
-                "embedding"
-            ),  # Unpack embedding here # self.table.c.embedding,
             self.table.c.usage,
         ]
+        if include_embedding:
+            columns.append(func.json_array_unpack(self.table.c.embedding).label("embedding"))
+        if query_index is not None:
+            columns.append(literal(query_index).label("query_index"))
 
         stmt = select(*columns)
 
         if filters is not None:
             for key, value in filters.items():
-                if hasattr(self.table.c, key):
-                    stmt = stmt.where(getattr(self.table.c, key) == value)
+                if key in self.table.c:
+                    stmt = stmt.where(self.table.c[key] == value)
+                else:
+                    stmt = stmt.where(self.get_meta_data_filter(key, value))
 
         if self.distance == Distance.l2:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+            score = self.table.c.embedding.max_inner_product(query_embedding)
+            stmt = stmt.add_columns(score.label("score")).order_by(score)
         if self.distance == Distance.cosine:
             embedding_json = json.dumps(query_embedding)
-            dot_product_expr = func.dot_product(self.table.c.embedding, text("JSON_ARRAY_PACK(:embedding)"))
-            stmt = stmt.order_by(dot_product_expr.desc())
-            stmt = stmt.params(embedding=embedding_json)
+            # The statements combined by search_batch() need unique parameter names
+            embedding_param: Any = bindparam(f"embedding_{query_index or 0}", value=embedding_json)
+            dot_product_expr = func.dot_product(self.table.c.embedding, func.JSON_ARRAY_PACK(embedding_param))
+            stmt = stmt.add_columns(dot_product_expr.label("score")).order_by(dot_product_expr.desc())
             # stmt = stmt.order_by(self.table.c.embedding.cosine_distance(query_embedding))
         if self.distance == Distance.max_inner_product:
-            stmt = stmt.order_by(self.table.c.embedding.max_inner_product(query_embedding))
+            score = self.table.c.embedding.max_inner_product(query_embedding)
+            stmt = stmt.add_columns(score.label("score")).order_by(score)
+
+        return stmt.limit(limit=limit)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[Document]:
+        query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+
+        stmt = self.get_search_statement(
+            query_embedding, limit=limit, filters=filters, include_embedding=include_embedding
+        )
+
+        # Build search results
+        return [
+            self.get_search_result(neighbor, include_embedding=include_embedding, include_score=include_score)
+            for neighbor in self.get_neighbors(stmt)
+        ]
+
+    def search_batch(
+        self,
+        queries: List[str],
+        limit: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embedding: bool = False,
+        include_score: bool = False,
+    ) -> List[List[Document]]:
+        """Returns the documents most similar to each query, using one embedding request and one UNION ALL statement"""
+        if len(queries) == 0:
+            return []
 
-        stmt = stmt.limit(limit=limit)
+        embeddings, _ = self.embedder.get_embeddings_and_usage(queries)
+        statements = []
+        for i, (query, embedding) in enumerate(zip(queries, embeddings)):
+            if not embedding:
+                logger.error(f"Error getting embedding for Query: {query}")
+                continue
+            statements.append(
+                self.get_search_statement(
+                    embedding, limit=limit, filters=filters, include_embedding=include_embedding, query_index=i
+                )
+            )
+        if len(statements) == 0:
+            return [[] for _ in queries]
+
+        results = union_all(*statements).subquery()
+        score_order = results.c.score.desc() if self.distance == Distance.cosine else results.c.score
+        stmt = select(*results.c).order_by(results.c.query_index, score_order)
+
+        # Build search results, in the order of the queries
+        search_results: List[List[Document]] = [[] for _ in queries]
+        for neighbor in self.get_neighbors(stmt):
+            search_results[neighbor.query_index].append(
+                self.get_search_result(neighbor, include_embedding=include_embedding, include_score=include_score)
+            )
+        return search_results
+
+    def get_neighbors(self, stmt: Any) -> List[Any]:
         logger.debug(f"Query: {stmt}")
 
         # Get neighbors
@@ -244,27 +354,27 @@ class S2VectorDb(VectorDb):
             #                 # Assuming 'ef_search' is a relevant parameter to be set for the session
             #                 # Update the session settings based on the HNSW index configuration
             #                 sess.execute(text(f"SET SESSION ef_search = {self.index.ef_search}"))
-
-        # Build search results
-        search_results: List[Document] = []
-        for neighbor in neighbors:
-            meta_data_dict = json.loads(neighbor.meta_data) if neighbor.meta_data else {}
-            usage_dict = json.loads(neighbor.usage) if neighbor.usage else {}
+        return list(neighbors)
+
+    def get_search_result(
+        self, neighbor: Any, include_embedding: bool = False, include_score: bool = False
+    ) -> Document:
+        meta_data_dict = json.loads(neighbor.meta_data) if neighbor.meta_data else {}
+        usage_dict = json.loads(neighbor.usage) if neighbor.usage else {}
+        embedding_list = None
+        if include_embedding:
             # Convert the embedding mysql.TEXT back into a list
             embedding_list = json.loads(neighbor.embedding) if neighbor.embedding else []
 
-            search_results.append(
-                Document(
-                    name=neighbor.name,
-                    meta_data=meta_data_dict,
-                    content=neighbor.content,
-                    embedder=self.embedder,
-                    embedding=embedding_list,
-                    usage=usage_dict,
-                )
-            )
-
-        return search_results
+        return Document.from_search_result(
+            name=neighbor.name,
+            meta_data=meta_data_dict,
+            content=neighbor.content,
+            embedder=self.embedder,
+            embedding=embedding_list,
+            usage=usage_dict,
+            score=float(neighbor.score) if include_score else None,
+        )
 
     def delete(self) -> None:
         if self.table_exists():
@@ -0,0 +1,53 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from phi.document.reader.text import TextReader
+from phi.embedder.base import Embedder
+from phi.knowledge.text import TextKnowledgeBase
+from phi.vectordb.numpydb import NumpyDb
+
+
+class HashEmbedder(Embedder):
+    dimensions: int = 8
+
+    def get_embedding(self, text: str) -> List[float]:
+        digest = hashlib.md5(text.encode()).digest()
+        return [float(byte) for byte in digest[: self.dimensions]]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+def get_contents(vector_db: NumpyDb) -> List[Tuple[str, str]]:
+    return sorted((document["id"], document["content"]) for document in vector_db._documents)
+
+
+def test_sync_keeps_shifted_chunks(tmp_path: Path):
+    source = tmp_path / "docs" / "a.txt"
+    source.parent.mkdir()
+    source.write_text("alpha paragraph\n\nbeta paragraph")
+    vector_db = NumpyDb(embedder=HashEmbedder())
+    knowledge_base = TextKnowledgeBase(
+        path=source.parent,
+        reader=TextReader(chunk_size=20, chunk_strategy="recursive"),
+        vector_db=vector_db,
+        manifest_file=tmp_path / "manifest.json",
+    )
+
+    knowledge_base.sync()
+    assert get_contents(vector_db) == [("a_1", "alpha paragraph"), ("a_2", "beta paragraph")]
+
+    # Inserting a paragraph at the front shifts the content of every chunk id
+    source.write_text("new first paragraph\n\nalpha paragraph\n\nbeta paragraph")
+    knowledge_base.sync()
+    assert get_contents(vector_db) == [
+        ("a_1", "new first paragraph"),
+        ("a_2", "alpha paragraph"),
+        ("a_3", "beta paragraph"),
+    ]
+
+    # Removing it shifts them back, without leaving the old last chunk behind
+    source.write_text("alpha paragraph\n\nbeta paragraph")
+    knowledge_base.sync()
+    assert get_contents(vector_db) == [("a_1", "alpha paragraph"), ("a_2", "beta paragraph")]